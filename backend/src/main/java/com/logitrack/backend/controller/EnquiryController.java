@@ -9,6 +9,7 @@ import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.*;
 
 import java.util.List;
+import java.util.UUID;
 
 @RestController
 @RequestMapping("/api/enquiries")
@@ -33,7 +34,7 @@ public class EnquiryController {
      * GET /api/enquiries/{id} - Get enquiry by ID
      */
     @GetMapping("/{id}")
-    public ResponseEntity<EnquiryRecord> getEnquiryById(@PathVariable String id) {
+    public ResponseEntity<EnquiryRecord> getEnquiryById(@PathVariable UUID id) {
         log.info("GET /api/enquiries/{} - Fetching enquiry", id);
         return enquiryService.getEnquiryById(id)
             .map(ResponseEntity::ok)
@@ -60,7 +61,7 @@ public class EnquiryController {
      */
     @PutMapping("/{id}")
     public ResponseEntity<EnquiryRecord> updateEnquiry(
-            @PathVariable String id, 
+            @PathVariable UUID id, 
             @RequestBody EnquiryRecord enquiryRecord) {
         log.info("PUT /api/enquiries/{} - Updating enquiry", id);
         try {
@@ -76,7 +77,7 @@ public class EnquiryController {
      * DELETE /api/enquiries/{id} - Delete enquiry record
      */
     @DeleteMapping("/{id}")
-    public ResponseEntity<Void> deleteEnquiry(@PathVariable String id) {
+    public ResponseEntity<Void> deleteEnquiry(@PathVariable UUID id) {
         log.info("DELETE /api/enquiries/{} - Deleting enquiry", id);
         try {
             enquiryService.deleteEnquiry(id);
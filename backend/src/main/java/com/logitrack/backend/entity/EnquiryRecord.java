@@ -1,12 +1,16 @@
 package com.logitrack.backend.entity;
 
+import com.logitrack.backend.util.TimeOrderedUuid;
 import jakarta.persistence.*;
 import lombok.AllArgsConstructor;
 import lombok.Data;
 import lombok.NoArgsConstructor;
+import org.hibernate.annotations.JdbcTypeCode;
+import org.hibernate.type.SqlTypes;
 
 import java.time.LocalDate;
 import java.time.LocalDateTime;
+import java.util.UUID;
 
 /**
  * 询价记录实体类 - 完全匹配 MySQL 表结构和 CSV 字段
@@ -18,9 +22,11 @@ import java.time.LocalDateTime;
 @AllArgsConstructor
 public class EnquiryRecord {
     
+    // BINARY(16) 存储，JSON 和 URL 中仍为标准 UUID 字符串
     @Id
-    @Column(name = "id", length = 36)
-    private String id;
+    @JdbcTypeCode(SqlTypes.BINARY)
+    @Column(name = "id", columnDefinition = "BINARY(16)")
+    private UUID id;
     
     // 日期字段
     @Column(name = "enquiry_received_date")
@@ -141,8 +147,8 @@ public class EnquiryRecord {
     protected void onCreate() {
         createdAt = LocalDateTime.now();
         updatedAt = LocalDateTime.now();
-        if (id == null || id.isEmpty()) {
-            id = java.util.UUID.randomUUID().toString();
+        if (id == null) {
+            id = TimeOrderedUuid.next();
         }
     }
     
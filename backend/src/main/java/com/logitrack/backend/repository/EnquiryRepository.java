@@ -6,9 +6,10 @@ import org.springframework.stereotype.Repository;
 
 import java.util.List;
 import java.util.Optional;
+import java.util.UUID;
 
 @Repository
-public interface EnquiryRepository extends JpaRepository<EnquiryRecord, String> {
+public interface EnquiryRepository extends JpaRepository<EnquiryRecord, UUID> {
     
     Optional<EnquiryRecord> findByReferenceNumber(String referenceNumber);
     
@@ -9,6 +9,7 @@ import org.springframework.transaction.annotation.Transactional;
 
 import java.util.List;
 import java.util.Optional;
+import java.util.UUID;
 
 @Service
 @RequiredArgsConstructor
@@ -28,7 +29,7 @@ public class EnquiryService {
     /**
      * Get enquiry by ID
      */
-    public Optional<EnquiryRecord> getEnquiryById(String id) {
+    public Optional<EnquiryRecord> getEnquiryById(UUID id) {
         log.debug("Fetching enquiry with id: {}", id);
         return enquiryRepository.findById(id);
     }
@@ -55,7 +56,7 @@ public class EnquiryService {
      * Update existing enquiry record
      */
     @Transactional
-    public EnquiryRecord updateEnquiry(String id, EnquiryRecord enquiryRecord) {
+    public EnquiryRecord updateEnquiry(UUID id, EnquiryRecord enquiryRecord) {
         log.info("Updating enquiry record with id: {}", id);
         
         return enquiryRepository.findById(id)
@@ -70,7 +71,7 @@ public class EnquiryService {
      * Delete enquiry record
      */
     @Transactional
-    public void deleteEnquiry(String id) {
+    public void deleteEnquiry(UUID id) {
         log.info("Deleting enquiry record with id: {}", id);
         
         if (!enquiryRepository.existsById(id)) {
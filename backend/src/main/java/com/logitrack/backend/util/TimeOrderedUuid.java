@@ -0,0 +1,38 @@
+package com.logitrack.backend.util;
+
+import java.security.SecureRandom;
+import java.util.UUID;
+
+/**
+ * 时间有序的 UUID（UUIDv7），格式与 database/ids.py 一致
+ * 前 48 位为毫秒时间戳，同一毫秒内 12 位计数器递增，新记录总是追加在主键索引末尾
+ */
+public final class TimeOrderedUuid {
+
+    private static final SecureRandom RANDOM = new SecureRandom();
+
+    private static long lastMillis = 0;
+    private static long counter = 0;
+
+    private TimeOrderedUuid() {
+    }
+
+    public static synchronized UUID next() {
+        long millis = Math.max(System.currentTimeMillis(), lastMillis);
+        if (millis == lastMillis) {
+            counter++;
+            if (counter > 0xFFF) {
+                // 计数器用尽，借用下一毫秒
+                millis++;
+                counter = RANDOM.nextInt(0x800);
+            }
+        } else {
+            counter = RANDOM.nextInt(0x800);
+        }
+        lastMillis = millis;
+
+        long msb = (millis << 16) | 0x7000L | counter;
+        long lsb = (RANDOM.nextLong() & 0x3FFFFFFFFFFFFFFFL) | 0x8000000000000000L;
+        return new UUID(msb, lsb);
+    }
+}
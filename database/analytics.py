@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 成交率与航线分析
+
+在本地列式快照（snapshot.py）上按维度统计:
+    询价数、成交 (Yes) / 拒绝 (Rejected) / 待定 (Pending) / 其他（Invalid、空）
+    成交率 = 成交 / (成交 + 拒绝)
+    报价周期 = first_quotation_sent - enquiry_received_date（天）的均值、中位数、P90
+    报价日期早于询价日期的行单独计数（negative），不计入报价周期
+
+维度: sales_office、航线 (pol → pod)、product、core_non_core、category、月份。
+
+全部计算都是整列的 NumPy 运算，没有逐行循环，也不查询数据库:
+    - 字符串列在快照里已是字典编号，先把编号映射为不区分大小写的分组号
+      （与 MySQL 的 utf8mb4_unicode_ci 一致，"Origin charges & EXW" 与
+      "Origin Charges & EXW" 归为一组）
+    - 每行预先算出 (结果, 报价周期天数) 的格号，每个维度只做一次
+      np.bincount(分组号 * 格数 + 格号)，得到 分组 × 结果 × 天数 的计数，
+      各结果的行数、报价周期的均值 / 中位数 / P90 都由它累加得出；只有超过
+      一年的少数行按实际天数排序，分位数落在其中时直接取值
+
+用法:
+    python analytics.py [快照目录] [--since 2025-01-01] [--until 2025-06-30] [--top 15]
+    python analytics.py --refresh      先刷新快照（连接数据库）
+"""
+
+import argparse
+import json
+import sys
+import time
+import unicodedata
+from datetime import date
+
+import numpy as np
+
+from snapshot import DEFAULT_SNAPSHOT_DIR, EPOCH_DAY, NULL_CODE, NULL_DATE, Snapshot
+
+# booking_confirmed 的取值（不区分大小写）-> 结果；其余取值和 NULL 为 OTHER
+BOOKED, REJECTED, PENDING, OTHER = range(4)
+OUTCOMES = {'yes': BOOKED, 'rejected': REJECTED, 'pending': PENDING}
+
+# 报价周期直方图的天数上限，更长的计入溢出格，落在溢出格的分位数按实际天数另行计算
+MAX_TURNAROUND_DAYS = 365
+
+# 每个结果的直方图格数: 0..MAX_TURNAROUND_DAYS 天、溢出、报价早于询价、没有报价
+OVERFLOW = MAX_TURNAROUND_DAYS + 1
+NEGATIVE = MAX_TURNAROUND_DAYS + 2
+UNQUOTED = MAX_TURNAROUND_DAYS + 3
+BUCKETS = MAX_TURNAROUND_DAYS + 4
+
+# 报表的维度: (名称, 快照列)；航线和月份为派生维度
+DIMENSIONS = (
+    ('sales_office', 'sales_office'),
+    ('航线', ('pol', 'pod')),
+    ('product', 'product'),
+    ('core_non_core', 'core_non_core'),
+    ('category', 'category'),
+    ('月份', 'enquiry_received_date'),
+)
+
+def string_groups(snap, name, rows):
+    """
+    字符串列的分组: 返回 (每行的分组号, 各组标签)
+
+    取值去首尾空白、不区分大小写地合并，标签取先出现的写法；NULL 为最后一组 "(空)"。
+    """
+    values = snap.values(name)
+    groups = {}
+    labels = []
+    lut = np.empty(len(values) + 1, dtype=np.int32)
+    for code, value in enumerate(values):
+        key = value.strip().lower()
+        if key not in groups:
+            groups[key] = len(labels)
+            labels.append(value.strip())
+        lut[code] = groups[key]
+    lut[NULL_CODE] = len(labels)
+    labels.append('(空)')
+    return lut[snap[name][rows]], labels
+
+def compact(keys, size):
+    """把 0..size-1 中实际出现的键重新编为连续的组号，返回 (组号, 出现的键)"""
+    present = np.flatnonzero(np.bincount(keys, minlength=size))
+    lut = np.zeros(size, dtype=np.int32)
+    lut[present] = np.arange(len(present), dtype=np.int32)
+    return lut[keys], present
+
+def lane_groups(snap, rows):
+    """航线 pol → pod 的分组，只保留实际出现的组合"""
+    pol, pol_labels = string_groups(snap, 'pol', rows)
+    pod, pod_labels = string_groups(snap, 'pod', rows)
+    width = len(pod_labels)
+    keys, pairs = compact(pol * width + pod, len(pol_labels) * width)
+    labels = [f"{pol_labels[pair // width]} → {pod_labels[pair % width]}" for pair in pairs.tolist()]
+    return keys, labels
+
+def month_groups(days):
+    """日期（天数）按月分组，组号按时间先后；无日期为最后一组"""
+    valid = days != NULL_DATE
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+    first = int(months[valid].min()) if valid.any() else 0
+    offsets = np.where(valid, months - first, 0)
+    keys, present = compact(offsets, int(offsets.max()) + 1 if len(offsets) else 1)
+    labels = [str(np.datetime64(int(month) + first, 'M')) for month in present]
+    if not valid.all():
+        keys[~valid] = len(labels)
+        labels.append('(空)')
+    return keys, labels
+
+def outcomes(snap, rows):
+    """每行的结果（BOOKED / REJECTED / PENDING / OTHER）"""
+    values = snap.values('booking_confirmed')
+    lut = np.full(len(values) + 1, OTHER, dtype=np.int8)
+    for code, value in enumerate(values):
+        lut[code] = OUTCOMES.get(value.strip().lower(), OTHER)
+    return lut[snap['booking_confirmed'][rows]]
+
+class RowCodes:
+    """与维度无关的逐行数据，各维度共用"""
+
+    def __init__(self, outcome, turnaround, known):
+        bucket = np.where(turnaround > MAX_TURNAROUND_DAYS, OVERFLOW, turnaround)
+        bucket = np.where(turnaround < 0, NEGATIVE, bucket)
+        bucket = np.where(known, bucket, UNQUOTED)
+        self.codes = outcome.astype(np.int64) * BUCKETS + bucket
+        # 超过直方图上限的行（通常很少），均值和分位数按实际天数计算
+        self.overflow = np.flatnonzero(known & (turnaround > MAX_TURNAROUND_DAYS))
+        self.overflow_days = turnaround[self.overflow]
+
+def group_report(keys, labels, rows):
+    """
+    一个维度的统计，返回 [{group, enquiries, booked, ..., turnaround_p90}, ...]
+
+    keys 为每行的分组号，rows 为 RowCodes。
+    """
+    n = len(labels)
+    cells = 4 * BUCKETS
+    cube = np.bincount(keys * cells + rows.codes, minlength=n * cells).reshape(n, 4, BUCKETS)
+    counts = cube.sum(axis=2)
+    negative = cube[:, :, NEGATIVE].sum(axis=1)
+    # 0..MAX_TURNAROUND_DAYS 天和溢出格
+    hist = cube[:, :, :OVERFLOW + 1].sum(axis=1)
+    quoted = hist.sum(axis=1)
+    overflow_keys = keys[rows.overflow]
+    total_days = hist[:, :OVERFLOW] @ np.arange(OVERFLOW)
+    total_days = total_days + np.bincount(overflow_keys, weights=rows.overflow_days, minlength=n)
+    cumulative = hist.cumsum(axis=1)
+    # 溢出行按 (分组, 天数) 排序，落在溢出格的分位数直接按位置取
+    order = np.lexsort((rows.overflow_days, overflow_keys))
+    overflow_days = rows.overflow_days[order]
+    overflow_start = np.searchsorted(overflow_keys[order], np.arange(n))
+
+    def percentile(q):
+        # 第 floor(q * (个数 - 1)) 个（从 0 起）所在的天数
+        rank = np.floor(q * np.maximum(quoted - 1, 0)).astype(np.int64)
+        days = (cumulative <= rank[:, None]).sum(axis=1)
+        spilled = np.flatnonzero((quoted > 0) & (days == OVERFLOW))
+        if len(spilled):
+            offset = rank[spilled] - cumulative[spilled, OVERFLOW - 1]
+            days[spilled] = overflow_days[overflow_start[spilled] + offset]
+        return days
+
+    median = percentile(0.5)
+    p90 = percentile(0.9)
+    decided = counts[:, BOOKED] + counts[:, REJECTED]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = counts[:, BOOKED] / decided
+        mean = total_days / quoted
+
+    report = []
+    for g in range(n):
+        enquiries = int(counts[g].sum())
+        if not enquiries:
+            continue
+        report.append({
+            'group': labels[g],
+            'enquiries': enquiries,
+            'booked': int(counts[g, BOOKED]),
+            'rejected': int(counts[g, REJECTED]),
+            'pending': int(counts[g, PENDING]),
+            'other': int(counts[g, OTHER]),
+            'win_rate': None if not decided[g] else round(float(win_rate[g]), 4),
+            'quoted': int(quoted[g]),
+            'negative': int(negative[g]),
+            'turnaround_mean': None if not quoted[g] else round(float(mean[g]), 2),
+            'turnaround_median': None if not quoted[g] else int(median[g]),
+            'turnaround_p90': None if not quoted[g] else int(p90[g]),
+        })
+    return report
+
+def analyze(snap, since=None, until=None):
+    """
+    计算标准报表，返回 {维度名: 统计列表}，另含 '合计'
+
+    since / until 按 enquiry_received_date 过滤（含两端）。
+    """
+    received = np.asarray(snap['enquiry_received_date'])
+    # 不过滤时用切片，列数组保持内存映射、不复制
+    rows = slice(None)
+    if since is not None or until is not None:
+        rows = np.ones(len(received), dtype=bool)
+        if since is not None:
+            rows &= received >= since.toordinal() - EPOCH_DAY
+        if until is not None:
+            rows &= (received <= until.toordinal() - EPOCH_DAY) & (received != NULL_DATE)
+    received = received[rows]
+
+    sent = np.asarray(snap['first_quotation_sent'])[rows]
+    known = (received != NULL_DATE) & (sent != NULL_DATE)
+    turnaround = np.where(known, sent - received, 0)
+    codes = RowCodes(outcomes(snap, rows), turnaround, known)
+
+    report = {'合计': group_report(np.zeros(len(received), dtype=np.int64), ['全部'], codes)}
+    for title, column in DIMENSIONS:
+        if column == ('pol', 'pod'):
+            keys, labels = lane_groups(snap, rows)
+        elif column == 'enquiry_received_date':
+            keys, labels = month_groups(received)
+        else:
+            keys, labels = string_groups(snap, column, rows)
+        report[title] = group_report(keys.astype(np.int64), labels, codes)
+    return report
+
+def format_days(value):
+    return '-' if value is None else f"{value:g}"
+
+def display_width(text):
+    """终端显示宽度（中文占两格）"""
+    return sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)
+
+def pad(text, width):
+    return text + ' ' * max(width - display_width(text), 0)
+
+def print_report(report, top=15):
+    """打印报表；月份按时间顺序全部列出，其余维度按询价数取前 top 组"""
+    for title, groups in report.items():
+        if title != '月份':
+            groups = sorted(groups, key=lambda g: -g['enquiries'])[:top]
+        width = max([display_width(title)] + [display_width(str(g['group'])) for g in groups]) + 2
+        print(f"\n   {pad(title, width)}{'询价':>8}{'成交':>8}{'拒绝':>8}{'待定':>8}{'成交率':>8}"
+              f"{'周期均值':>8}{'中位数':>8}{'P90':>6}")
+        for g in groups:
+            rate = '-' if g['win_rate'] is None else f"{g['win_rate']:.1%}"
+            print(f"   {pad(str(g['group']), width)}{g['enquiries']:>10}{g['booked']:>10}{g['rejected']:>10}"
+                  f"{g['pending']:>10}{rate:>11}{format_days(g['turnaround_mean']):>12}"
+                  f"{format_days(g['turnaround_median']):>11}{format_days(g['turnaround_p90']):>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 成交率与航线分析')
+    parser.add_argument('path', nargs='?', default=DEFAULT_SNAPSHOT_DIR,
+                        help=f'快照目录 (默认 {DEFAULT_SNAPSHOT_DIR})')
+    parser.add_argument('--refresh', action='store_true', help='先刷新快照（连接数据库）')
+    parser.add_argument('--since', type=date.fromisoformat, help='询价日期起 YYYY-MM-DD（含）')
+    parser.add_argument('--until', type=date.fromisoformat, help='询价日期止 YYYY-MM-DD（含）')
+    parser.add_argument('--top', type=int, default=15, help='每个维度显示询价最多的前 N 组 (默认 15)')
+    parser.add_argument('--json', metavar='PATH', help='同时把完整报表写入 JSON 文件')
+    args = parser.parse_args()
+
+    if args.refresh:
+        import db
+        import snapshot
+
+        conn = db.connect('pymysql', autocommit=True)
+        try:
+            manifest, pulled = snapshot.refresh(conn, args.path)
+        finally:
+            conn.close()
+        print(f"   ✅ 快照已刷新: 拉取 {pulled} 条，共 {manifest['rows']} 条")
+
+    try:
+        snap = Snapshot.open(args.path)
+    except FileNotFoundError:
+        print(f"\n❌ 找不到快照: {args.path}")
+        print("   请先运行: python snapshot.py（或加 --refresh）")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    report = analyze(snap, args.since, args.until)
+    elapsed = time.perf_counter() - start
+    print(f"\n成交率与报价周期 ({len(snap)} 条，水位 {snap.manifest['watermark']}，计算 {elapsed * 1000:.0f} 毫秒)")
+    print_report(report, args.top)
+    negative = report['合计'][0]['negative'] if report['合计'] else 0
+    if negative:
+        print(f"\n   ⚠️  {negative} 条的首次报价日期早于询价日期，未计入报价周期")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n   ✅ 已写入 {args.json}")
+
+if __name__ == '__main__':
+    main()
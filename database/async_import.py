@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - asyncio 导入引擎（import_csv_pymysql.py --mode async）
+
+远程 MySQL（如 WSL 访问 Windows 主机，见 WINDOWS_MYSQL_SETUP.md）上，
+导入时间主要花在网络往返上: 单个同步连接发出一批后就空等结果。
+
+这里在事件循环中解析转换，批次放入有界队列，由 writers 个 aiomysql
+连接并发写入，多批的 INSERT 同时在途:
+    - 队列满时解析暂停（背压），内存只与 队列长度 × 批大小 有关
+    - 各批 INSERT 可以乱序完成，但 COMMIT 严格按文件顺序进行
+      （CommitSequencer），中断时已提交的总是文件的一段前缀
+    - 批次失败时与同步导入一样二分隔离坏行（见 quarantine.py）
+    - 连接断开时换新连接重试该批一次
+
+按顺序提交要求同一参考编号不能同时出现在两个未提交的批次里（否则后面
+的批次持有锁、前面的批次等锁，形成互相等待），因此本模式必须开启预校验，
+文件内重复的参考编号在进入队列前就被剔除。
+
+依赖 aiomysql（pip install aiomysql），接口与 pymysql 相同、错误类型共用。
+"""
+
+import asyncio
+import time
+
+import pymysql
+
+import bulk_load
+import db
+from dictionary import DICTIONARY
+from import_csv_pymysql import (
+    build_insert_sql, batched, new_stats, quarantine_rows, transform_records, validate_records,
+)
+from instrumentation import METRICS, ProgressReporter
+from quarantine import SAVEPOINT
+from schema_tools import TABLE_NAME
+
+# 每个写入连接在队列中最多预取多少批
+QUEUE_BATCHES_PER_WRITER = 2
+
+class CommitSequencer:
+    """让各批按序号依次提交"""
+
+    def __init__(self):
+        self.next = 0
+        self.cond = asyncio.Condition()
+
+    async def wait_turn(self, seq):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.next == seq)
+
+    async def done(self, seq):
+        async with self.cond:
+            self.next = seq + 1
+            self.cond.notify_all()
+
+async def open_connection(bulk=False):
+    """建立一个写入连接，bulk 为 True 时使用批量装载会话设置"""
+    conn = await db.connect_async()
+    if bulk:
+        async with conn.cursor() as cursor:
+            for sql in bulk_load.BULK_SESSION_SQL:
+                await cursor.execute(sql)
+    return conn
+
+async def bisect_write(cursor, sql, batch):
+    """quarantine.bisect_write 的异步版本，返回 (成功行数, [(行号, 参数元组, 错误), ...])"""
+    written = 0
+    rejected = []
+    mid = len(batch) // 2
+    stack = [batch[mid:], batch[:mid]] if mid else [batch]
+    while stack:
+        part = stack.pop()
+        await cursor.execute(f"SAVEPOINT {SAVEPOINT}")
+        try:
+            await cursor.executemany(sql, [data for _, data in part])
+            written += len(part)
+        except pymysql.Error as e:
+            if db.is_disconnect(e):
+                raise
+            await cursor.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+            if len(part) == 1:
+                idx, data = part[0]
+                rejected.append((idx, data, e))
+            else:
+                mid = len(part) // 2
+                stack.append(part[mid:])
+                stack.append(part[:mid])
+    return written, rejected
+
+async def write_batch(conn, sql, seq, batch, sequencer):
+    """
+    写入一批，轮到该批时提交
+
+    整批失败时回滚并二分隔离坏行。返回 (成功数, 失败数)。出错时抛出
+    异常且不推进提交顺序（由调用方重试，或放弃该批后推进）。
+    """
+    start = time.perf_counter()
+    async with conn.cursor() as cursor:
+        rejected = []
+        try:
+            await cursor.executemany(sql, [data for _, data in batch])
+            written = len(batch)
+        except pymysql.Error as e:
+            if db.is_disconnect(e):
+                raise
+            await conn.rollback()
+            written, rejected = await bisect_write(cursor, sql, batch)
+    METRICS.add('write', time.perf_counter() - start, 0.0)
+
+    start = time.perf_counter()
+    await sequencer.wait_turn(seq)
+    METRICS.add('commit_wait', time.perf_counter() - start, 0.0)
+    start = time.perf_counter()
+    await conn.commit()
+    METRICS.add('commit', time.perf_counter() - start, 0.0)
+    await sequencer.done(seq)
+    return written, quarantine_rows(rejected)
+
+async def writer(conn, jobs, sql, sequencer, stats, bulk):
+    """写入任务: 从队列取批次写入；断线时换新连接重试一次，仍失败则整批计为失败"""
+    try:
+        while True:
+            item = await jobs.get()
+            if item is None:
+                break
+            seq, batch = item
+            for attempt in (1, 2):
+                try:
+                    ok, bad = await write_batch(conn, sql, seq, batch, sequencer)
+                    break
+                except pymysql.Error as e:
+                    conn.close()
+                    conn = None
+                    if attempt == 2 or not db.is_disconnect(e):
+                        print(f"   ❌ 第 {batch[0][0]}-{batch[-1][0]} 行所在批次写入失败: {e}")
+                        ok, bad = 0, len(batch)
+                        # 放弃的批次也要轮到后让出提交顺序，后面的批次才能提交
+                        await sequencer.wait_turn(seq)
+                        await sequencer.done(seq)
+                        conn = await open_connection(bulk)
+                        break
+                    print(f"   ⚠️  写入连接断开，换新连接重试本批: {e}")
+                    conn = await open_connection(bulk)
+            stats['imported'] += ok
+            stats['failed'] += bad
+    finally:
+        if conn is not None:
+            conn.close()
+
+async def put_job(jobs, item, tasks):
+    """放入队列；队列满时等待，期间某个写入任务异常退出则抛出其异常（否则会永远等下去）"""
+    if not jobs.full():
+        jobs.put_nowait(item)
+        return
+    put = asyncio.ensure_future(jobs.put(item))
+    done, _ = await asyncio.wait([put, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if put in done:
+        return
+    put.cancel()
+    for task in done:
+        task.result()
+    raise RuntimeError("写入任务意外结束")
+
+async def run(rows, plan, batch_size, writers, table, validator, progress, bulk):
+    stats = new_stats()
+    sql = build_insert_sql(table)
+    sequencer = CommitSequencer()
+    # 有界队列: 写入跟不上时 put 等待，解析随之暂停
+    jobs = asyncio.Queue(maxsize=writers * QUEUE_BATCHES_PER_WRITER)
+    start = time.perf_counter()
+
+    # 写入连接并发建立
+    wall = time.perf_counter()
+    conns = await asyncio.gather(*(open_connection(bulk) for _ in range(writers)), return_exceptions=True)
+    METRICS.add('pool_warmup', time.perf_counter() - wall, 0.0)
+    errors = [conn for conn in conns if isinstance(conn, BaseException)]
+    if errors:
+        for conn in conns:
+            if not isinstance(conn, BaseException):
+                conn.close()
+        raise errors[0]
+    tasks = [asyncio.create_task(writer(conn, jobs, sql, sequencer, stats, bulk)) for conn in conns]
+
+    reporter = ProgressReporter()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        processed = stats['imported'] + stats['failed']
+        rate = processed / elapsed if elapsed > 0 else 0
+        suffix = f" ({progress()})" if progress else ''
+        reporter.update(f"   ✅ [{processed}] 已提交，{rate:,.0f} 条/秒，在途 {jobs.qsize()} 批{suffix}")
+
+    records = DICTIONARY.encode_records(validate_records(transform_records(rows, plan, stats), validator, stats))
+    try:
+        for seq, batch in enumerate(batched(records, batch_size)):
+            wait = time.perf_counter()
+            await put_job(jobs, (seq, batch), tasks)
+            METRICS.add('queue_wait', time.perf_counter() - wait, 0.0)
+            # 每批之后让出事件循环，在途的写入得以收发
+            await asyncio.sleep(0)
+            report()
+        for _ in tasks:
+            await put_job(jobs, None, tasks)
+        await asyncio.gather(*tasks)
+        report()
+    finally:
+        # 出错或中断时，等待提交顺序的写入任务不会再被唤醒，直接取消（未提交的批次随连接关闭回滚）
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    reporter.finish()
+    return stats['imported'], stats['failed'], time.perf_counter() - start
+
+def async_import(rows, plan, batch_size, writers, table=TABLE_NAME, validator=None, progress=None, bulk=False):
+    """
+    asyncio 导入
+
+    validator 必须提供（见模块说明）。返回 (成功数, 失败数, 耗时秒数)。
+    """
+    if validator is None:
+        raise ValueError("async 模式需要预校验来剔除文件内重复的参考编号")
+    return asyncio.run(run(rows, plan, batch_size, writers, table, validator, progress, bulk))
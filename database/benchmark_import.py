@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 导入基准测试
+
+用 generate_enquiries.py 生成的合成数据（10k / 100k / 1M 行），分别测试
+各导入策略的吞吐量:
+    row-by-row  每行一次 INSERT + 一次 commit（最初的导入方式）
+    batched     每批 executemany + 一次 commit（import_records）
+    bulk-load   LOAD DATA LOCAL INFILE（load_data_import，仅 MySQL）
+    parallel    多进程解析 + 写入线程（parallel_import）
+    async       asyncio + 多个 aiomysql 连接并发写入（async_import，仅 MySQL，
+                需安装 aiomysql）
+
+每个策略每次运行前重建独立的测试表 enquiry_records_bench，不影响线上
+数据。没有 MySQL 时可用 --backend sqlite 在本地 SQLite 文件上运行（同一
+套导入代码，经 SqliteConnection 适配 pymysql 的接口）。
+
+数据文件按 (生成器版本, 行数, 种子, 格式) 缓存在 benchmark_data/，
+结果连同当前提交写入 benchmark_results/，可用 --compare 与另一次结果
+对比。
+
+用法:
+    python benchmark_import.py --scales 10k,100k [--strategies batched,parallel]
+                               [--backend mysql|sqlite] [--repeat 3] [--compare old.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+import pymysql
+
+import generate_enquiries
+import ids
+import import_csv_pymysql
+from date_parser import DATE_PARSER
+from import_csv_pymysql import CsvSource, compile_plan, import_records, load_data_import, parallel_import
+from instrumentation import METRICS
+from offer_parser import OFFER_PARSER
+from schema_tools import create_table_sql
+from validation import Validator, rules_from_schema
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'benchmark_data')
+RESULTS_DIR = os.path.join(HERE, 'benchmark_results')
+
+BENCH_TABLE = 'enquiry_records_bench'
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+STRATEGIES = ('row-by-row', 'batched', 'bulk-load', 'parallel', 'async')
+
+class SqliteCursor:
+    """pymysql 风格的 SQLite 游标（只实现导入用到的部分）"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def _run(self, method, sql, args):
+        try:
+            method(sql.replace('%s', '?'), args)
+        except sqlite3.IntegrityError as e:
+            raise pymysql.err.IntegrityError(*e.args) from e
+        except sqlite3.Error as e:
+            raise pymysql.Error(*e.args) from e
+        return self.cursor.rowcount
+
+    def execute(self, sql, args=()):
+        return self._run(self.cursor.execute, sql, args or ())
+
+    def executemany(self, sql, seq):
+        return self._run(self.cursor.executemany, sql, seq)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+class SqliteConnection:
+    """pymysql 风格的 SQLite 连接，写入线程与创建线程不同，因此关闭线程检查"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=60)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+
+    def cursor(self, *args):
+        return SqliteCursor(self.conn.cursor())
+
+    def ping(self, reconnect=False):
+        pass
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+def sqlite_schema(table):
+    """把 schema.sql 的建表语句转换为 SQLite 语句列表（建表 + 建索引）"""
+    create_sql, indexes = create_table_sql(table, defer_indexes=True)
+    create_sql = re.sub(r"\s+COMMENT\s+'[^']*'", '', create_sql)
+    create_sql = re.sub(r"\s+ON UPDATE CURRENT_TIMESTAMP", '', create_sql)
+    create_sql = re.sub(r"\)\s*ENGINE=.*$", ')', create_sql, flags=re.DOTALL)
+    statements = [create_sql]
+    for name, columns in indexes:
+        statements.append(f"CREATE INDEX {table}_{name} ON {table} ({columns})")
+    return statements
+
+class MysqlBackend:
+    name = 'mysql'
+
+    def connect(self):
+        return import_csv_pymysql.connect(local_infile=True)
+
+    def reset_table(self):
+        create_sql, _ = create_table_sql(BENCH_TABLE)
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cursor.execute(create_sql)
+        new_id = ids.ID_FACTORIES[ids.id_format(cursor, BENCH_TABLE)]
+        cursor.close()
+        conn.commit()
+        conn.close()
+        return new_id
+
+    def drop_table(self):
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cursor.close()
+        conn.close()
+
+class SqliteBackend:
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        return SqliteConnection(self.path)
+
+    def reset_table(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        conn = self.connect()
+        for sql in sqlite_schema(BENCH_TABLE):
+            conn.conn.execute(sql)
+        conn.commit()
+        conn.close()
+        return ids.binary_id
+
+    def drop_table(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+def dataset_path(rows, seed, style):
+    """缓存的数据文件，不存在时生成"""
+    name = f"enquiries_v{generate_enquiries.GENERATOR_VERSION}_{rows}_{seed}_{style}.csv"
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"   生成数据 {name} ...")
+        start = time.perf_counter()
+        generate_enquiries.write_csv(path + '.tmp', rows, seed, style)
+        os.replace(path + '.tmp', path)
+        print(f"   ✅ 已生成，耗时 {time.perf_counter() - start:.1f} 秒")
+    return path
+
+def run_strategy(backend, strategy, csv_file, args):
+    """运行一次，返回本次结果 dict"""
+    new_id = backend.reset_table()
+    source = CsvSource(csv_file)
+    source.plan = compile_plan(source.mapping.indices, new_id)
+    # 与 import_csv_pymysql.py 一样先做预校验（测试表每次重建，没有已有值）
+    validator = Validator(rules_from_schema())
+    METRICS.reset()
+    DATE_PARSER.pop_counts()
+    OFFER_PARSER.pop_counts()
+
+    if strategy == 'parallel':
+        imported, failed, elapsed = parallel_import(source, args.batch_size, args.workers, args.writers,
+                                                    connect_fn=backend.connect, table=BENCH_TABLE,
+                                                    validator=validator)
+    elif strategy == 'async':
+        from async_import import async_import
+        imported, failed, elapsed = async_import(source, source.plan, args.batch_size, args.writers,
+                                                 table=BENCH_TABLE, validator=validator)
+    else:
+        conn = backend.connect()
+        try:
+            if strategy == 'bulk-load':
+                imported, failed, elapsed = load_data_import(conn, source, source.plan, table=BENCH_TABLE,
+                                                            validator=validator)
+            else:
+                batch_size = 1 if strategy == 'row-by-row' else args.batch_size
+                imported, failed, elapsed = import_records(conn, source, source.plan, batch_size,
+                                                           table=BENCH_TABLE, validator=validator)
+        finally:
+            conn.close()
+
+    summary = METRICS.summary(rows=imported + failed, elapsed=elapsed)
+    return {
+        'imported': imported,
+        'failed': failed,
+        'elapsed_s': round(elapsed, 4),
+        'rows_per_sec': summary['rows_per_sec'],
+        'stages': summary['stages'],
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_file):
+    """与另一次结果对比各 (规模, 策略) 的中位吞吐量"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(r['rows'], r['strategy']): r['median_rows_per_sec'] for r in baseline['results']}
+    print(f"\n对比 {baseline_file} (提交 {baseline.get('commit')}):")
+    for r in results['results']:
+        old = before.get((r['rows'], r['strategy']))
+        if not old or r['median_rows_per_sec'] is None:
+            continue
+        change = r['median_rows_per_sec'] / old - 1
+        print(f"   {r['rows']:>9} 行  {r['strategy']:<11} {old:>12,.0f} → {r['median_rows_per_sec']:>12,.0f} 条/秒"
+              f"  ({change:+.1%})")
+
+def parse_list(text, choices, label):
+    items = [item.strip().lower() for item in text.split(',') if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的{label}: {', '.join(unknown)}")
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 导入基准测试')
+    parser.add_argument('--scales', default='10k',
+                        type=lambda t: parse_list(t, SCALES, '规模'),
+                        help='数据规模，逗号分隔: 10k,100k,1m (默认 10k)')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES),
+                        type=lambda t: parse_list(t, STRATEGIES, '策略'),
+                        help=f"导入策略，逗号分隔 (默认全部: {','.join(STRATEGIES)})")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql',
+                        help='mysql=import_csv_pymysql 中配置的数据库, sqlite=本地 SQLite 文件 (默认 mysql)')
+    parser.add_argument('--repeat', type=int, default=3, help='每个组合运行次数，取中位数 (默认 3)')
+    parser.add_argument('--seed', type=int, default=generate_enquiries.DEFAULT_SEED, help='数据随机种子')
+    parser.add_argument('--style', choices=['china', 'test'], default='china', help='数据文件格式 (默认 china)')
+    parser.add_argument('--batch-size', type=int, default=import_csv_pymysql.DEFAULT_BATCH_SIZE,
+                        help=f'batched / parallel / async 的每批行数 (默认 {import_csv_pymysql.DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parallel 的解析进程数')
+    parser.add_argument('--writers', type=int, default=2, help='parallel / async 的写入连接数 (SQLite 固定为 1)')
+    parser.add_argument('--output', default=None, help='结果 JSON 路径 (默认 benchmark_results/ 下按提交命名)')
+    parser.add_argument('--compare', default=None, help='与之前的结果 JSON 对比')
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error('--repeat 必须大于 0')
+
+    if args.backend == 'sqlite':
+        os.makedirs(DATA_DIR, exist_ok=True)
+        backend = SqliteBackend(os.path.join(DATA_DIR, 'bench.sqlite'))
+        # SQLite 同一时间只允许一个写入者
+        args.writers = 1
+    else:
+        backend = MysqlBackend()
+
+    commit = git_commit()
+    print("\n" + "="*60)
+    print(f"LogiTrack Pro - 导入基准测试 ({backend.name}, 提交 {commit or '未知'})")
+    print("="*60)
+
+    results = {
+        'commit': commit,
+        'backend': backend.name,
+        'generator_version': generate_enquiries.GENERATOR_VERSION,
+        'seed': args.seed,
+        'style': args.style,
+        'repeat': args.repeat,
+        'batch_size': args.batch_size,
+        'workers': args.workers,
+        'writers': args.writers,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': [],
+    }
+
+    try:
+        for scale in args.scales:
+            rows = SCALES[scale]
+            print(f"\n{scale} ({rows} 行):")
+            csv_file = dataset_path(rows, args.seed, args.style)
+            for strategy in args.strategies:
+                if strategy == 'bulk-load' and backend.name == 'sqlite':
+                    print(f"   ⚠️  {strategy}: SQLite 不支持 LOAD DATA，跳过")
+                    continue
+                if strategy == 'async' and (backend.name == 'sqlite' or importlib.util.find_spec('aiomysql') is None):
+                    print(f"   ⚠️  {strategy}: 需要 MySQL 和 aiomysql（pip install aiomysql），跳过")
+                    continue
+                runs = []
+                for i in range(args.repeat):
+                    print(f"\n   ▶ {strategy} 第 {i + 1}/{args.repeat} 次")
+                    runs.append(run_strategy(backend, strategy, csv_file, args))
+                rates = [run['rows_per_sec'] for run in runs if run['rows_per_sec']]
+                result = {
+                    'rows': rows,
+                    'strategy': strategy,
+                    'median_rows_per_sec': round(statistics.median(rates), 1) if rates else None,
+                    'best_rows_per_sec': max(rates) if rates else None,
+                    'runs': runs,
+                }
+                results['results'].append(result)
+                print(f"   ✅ {strategy}: 中位 {result['median_rows_per_sec'] or 0:,.0f} 条/秒，"
+                      f"最好 {result['best_rows_per_sec'] or 0:,.0f} 条/秒")
+    except pymysql.Error as err:
+        print(f"\n❌ 数据库错误: {err}")
+        sys.exit(1)
+    finally:
+        backend.drop_table()
+
+    print("\n" + "="*60)
+    print(f"{'规模':>10}  {'策略':<12}{'中位 条/秒':>14}{'最好 条/秒':>14}")
+    for r in results['results']:
+        print(f"{r['rows']:>10}  {r['strategy']:<12}{r['median_rows_per_sec'] or 0:>14,.0f}"
+              f"{r['best_rows_per_sec'] or 0:>14,.0f}")
+    print("="*60)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{commit or 'unknown'}_{backend.name}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 结果已写入 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
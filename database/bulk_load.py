@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 批量装载优化
+
+全量装载时每写一行都要维护所有二级索引的 B 树，回填大文件时索引维护
+占了写入的大部分开销。这里提供:
+    - 装载前删除二级索引，装载后按 schema.sql 用一条 ALTER TABLE 重建
+      （InnoDB 对新建索引先排序再批量构建，比逐行插入快得多）
+    - 批量会话设置: 关闭 foreign_key_checks 和自动提交。unique_checks 保持
+      开启: 导出文件里确有重复的 Reference Number，唯一键要继续拦截它们
+    - 核对表上的索引与 schema.sql 是否一致
+
+用法:
+    python bulk_load.py --verify     # 核对 enquiry_records 的索引
+    python bulk_load.py --rebuild    # 补建缺失的索引（装载中断后使用）
+"""
+
+import argparse
+import pymysql
+import sys
+import time
+
+from schema_tools import TABLE_NAME, add_indexes_sql, expected_indexes
+
+# 批量装载的会话设置，只影响当前连接
+BULK_SESSION_SQL = (
+    "SET SESSION foreign_key_checks = 0",
+)
+
+def apply_bulk_session(conn):
+    """把连接切换为批量装载设置"""
+    cursor = conn.cursor()
+    for sql in BULK_SESSION_SQL:
+        cursor.execute(sql)
+    cursor.close()
+    conn.autocommit(False)
+
+def table_indexes(cursor, table=TABLE_NAME):
+    """
+    读取表上的索引
+
+    返回 {索引名: (是否唯一, 列定义)}，列定义与 schema.sql 写法一致，如 "pol, pod"。
+    """
+    cursor.execute(f"SHOW INDEX FROM {table}")
+    names = [d[0] for d in cursor.description]
+    columns = {}
+    unique = {}
+    for row in cursor.fetchall():
+        info = dict(zip(names, row))
+        key = info['Key_name']
+        columns.setdefault(key, []).append((info['Seq_in_index'], info['Column_name']))
+        unique[key] = not int(info['Non_unique'])
+    return {
+        key: (unique[key], ', '.join(col for _, col in sorted(cols)))
+        for key, cols in columns.items()
+    }
+
+def drop_secondary_indexes(conn, table=TABLE_NAME):
+    """
+    用一条 ALTER TABLE 删除全部非唯一二级索引
+
+    主键和唯一键保留（增量导入和重复检查依赖它们）。返回删除的索引名列表。
+    """
+    cursor = conn.cursor()
+    try:
+        names = [key for key, (unique, _) in table_indexes(cursor, table).items() if not unique]
+        if names:
+            cursor.execute(f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX {name}" for name in names))
+    finally:
+        cursor.close()
+    print(f"   ✅ 已删除 {len(names)} 个二级索引，装载后重建")
+    return names
+
+def build_indexes(conn, indexes, table=TABLE_NAME):
+    """数据装载完成后一次性建立全部二级索引"""
+    if not indexes:
+        return
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute(add_indexes_sql(table, indexes))
+    cursor.close()
+    print(f"   ✅ 已建立 {len(indexes)} 个索引，耗时 {time.perf_counter() - start:.2f} 秒")
+
+def rebuild_indexes(conn, table=TABLE_NAME):
+    """按 schema.sql 补建表上缺失的二级索引，返回补建的索引名列表"""
+    cursor = conn.cursor()
+    try:
+        existing = table_indexes(cursor, table)
+    finally:
+        cursor.close()
+    missing = [(name, cols) for name, cols in expected_indexes().items() if name not in existing]
+    build_indexes(conn, missing, table)
+    return [name for name, _ in missing]
+
+def verify_indexes(conn, table=TABLE_NAME):
+    """
+    核对表上的非唯一二级索引与 schema.sql 是否一致
+
+    返回问题列表，一致时为空列表。
+    """
+    cursor = conn.cursor()
+    try:
+        actual = {key: cols for key, (unique, cols) in table_indexes(cursor, table).items() if not unique}
+    finally:
+        cursor.close()
+    expected = expected_indexes()
+
+    problems = []
+    for name, cols in expected.items():
+        if name not in actual:
+            problems.append(f"缺少索引 {name} ({cols})")
+        elif actual[name].replace(' ', '') != cols.replace(' ', ''):
+            problems.append(f"索引 {name} 的列为 ({actual[name]})，schema.sql 中为 ({cols})")
+    for name, cols in actual.items():
+        if name not in expected:
+            problems.append(f"多余的索引 {name} ({cols})")
+    return problems
+
+def print_index_report(problems, table=TABLE_NAME):
+    if not problems:
+        print(f"   ✅ {table} 的索引与 schema.sql 一致")
+        return
+    for problem in problems:
+        print(f"   ⚠️  {problem}")
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 索引核对与重建')
+    parser.add_argument('--verify', action='store_true', help='核对索引是否与 schema.sql 一致')
+    parser.add_argument('--rebuild', action='store_true', help='按 schema.sql 补建缺失的索引')
+    args = parser.parse_args()
+
+    if not (args.verify or args.rebuild):
+        parser.print_help()
+        return
+
+    # 延迟导入，避免与 import_csv_pymysql 循环引用
+    from import_csv_pymysql import connect
+
+    try:
+        conn = connect()
+        if args.rebuild:
+            print(f"\n补建 {TABLE_NAME} 的索引...")
+            if not rebuild_indexes(conn):
+                print("   ✅ 没有缺失的索引")
+        print(f"\n核对 {TABLE_NAME} 的索引...")
+        problems = verify_indexes(conn)
+        print_index_report(problems)
+        conn.close()
+    except pymysql.Error as err:
+        print(f"\n❌ 数据库错误: {err}")
+        sys.exit(1)
+    if problems:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 增量同步（按 updated_at 水位捕获变更）
+
+下游（本地快照、导出文件、搜索索引……）不必每次重读整张表。同步进程
+轮询 enquiry_records，只取上次之后变化的记录，成批交给可插拔的 sink:
+
+    新增 / 修改   updated_at 在插入和每次更新时自动刷新（ON UPDATE
+                  CURRENT_TIMESTAMP；导入程序不写入时间戳，与水位同为数据库
+                  时钟）。按 (updated_at, id) 排序翻页，水位同时
+                  记录两者，同一秒内的多条记录不会漏取或重复
+    删除          AFTER DELETE 触发器把被删记录的 id 写入删除日志表
+                  enquiry_records_deletes，按自增序号 seq 轮询
+    整表替换      影子表切换 / 回滚（shadow_table.py）在删除日志中写一条
+                  reset，下游清空后从头同步新一代数据
+
+只读取 updated_at / deleted_at 早于数据库当前时间 --lag 秒的变更: 事务提交
+晚于其时间戳时，留出这段时间让它提交，避免水位越过尚未可见的记录。
+
+水位保存在状态文件中，每轮 sink.flush() 成功之后才写入；中断后从上次
+保存的水位继续，最后一轮可能重发，sink 的 upsert / delete 需要幂等。
+
+sink 写法: 名称:目标，或 模块.类名:目标（自定义 sink，继承 Sink）
+    jsonl:changes.jsonl          追加变更事件（每行一个 JSON）
+    snapshot:enquiry_snapshot    合并到 snapshot.py 的列式快照（需 numpy）
+
+用法:
+    python cdc_sync.py --install                      建立删除日志表和触发器（迁移 005 已包含）
+    python cdc_sync.py --sink jsonl:changes.jsonl     持续同步（Ctrl+C 停止）
+    python cdc_sync.py --sink snapshot:enquiry_snapshot --once
+    python cdc_sync.py --prune-days 30                清理 30 天前的删除日志
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pymysql
+
+import ids
+from export import format_id, json_value
+from header_mapping import FIELD_NAMES
+from offer_parser import OFFER_COLUMNS
+from schema_tools import TABLE_NAME
+from validation import rules_from_table
+
+DELETE_LOG = TABLE_NAME + '_deletes'
+DELETE_TRIGGER = f"trg_{TABLE_NAME}_delete"
+
+# 同步的列（不含 content_hash）
+SYNC_COLUMNS = ('id',) + FIELD_NAMES + OFFER_COLUMNS + ('created_at', 'updated_at')
+
+# 每页行数（一次 sink.upsert）
+DEFAULT_BATCH_SIZE = 1000
+
+# 没有变更时的轮询间隔（秒）
+DEFAULT_INTERVAL = 5
+
+# 只读取早于数据库当前时间这么多秒的变更
+DEFAULT_LAG = 5
+
+# 断线后重连前等待的秒数
+RECONNECT_DELAY = 10
+
+def delete_log_sql(id_type):
+    return (
+        f"CREATE TABLE IF NOT EXISTS {DELETE_LOG} (\n"
+        f"    seq BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,\n"
+        f"    op ENUM('delete', 'reset') NOT NULL DEFAULT 'delete' COMMENT 'reset: 整表被替换',\n"
+        f"    id {id_type} COMMENT '被删除记录的主键',\n"
+        f"    reference_number VARCHAR(50) COMMENT '被删除记录的参考编号',\n"
+        f"    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,\n"
+        f"    INDEX idx_deleted_at (deleted_at)\n"
+        f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='{TABLE_NAME} 删除日志（增量同步）'"
+    )
+
+DELETE_TRIGGER_SQL = (
+    f"CREATE TRIGGER {DELETE_TRIGGER} AFTER DELETE ON {TABLE_NAME} FOR EACH ROW "
+    f"INSERT INTO {DELETE_LOG} (id, reference_number) VALUES (OLD.id, OLD.reference_number)"
+)
+
+def delete_log_exists(cursor):
+    cursor.execute("SHOW TABLES LIKE %s", (DELETE_LOG,))
+    return cursor.fetchone() is not None
+
+def attach_trigger(cursor):
+    """（重新）把删除触发器建在当前的线上表上；RENAME TABLE 时触发器跟随原表改名"""
+    cursor.execute(f"DROP TRIGGER IF EXISTS {DELETE_TRIGGER}")
+    cursor.execute(DELETE_TRIGGER_SQL)
+
+def install(conn):
+    """建立删除日志表和触发器（已存在的保留 / 重建）"""
+    cursor = conn.cursor()
+    try:
+        id_type = 'BINARY(16)' if ids.id_format(cursor, TABLE_NAME) == 'binary' else 'VARCHAR(36)'
+        cursor.execute(delete_log_sql(id_type))
+        attach_trigger(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def uninstall(conn):
+    """删除触发器（保留日志表）；删除日志表之前必须先删除触发器，否则线上表无法 DELETE"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {DELETE_TRIGGER}")
+    finally:
+        cursor.close()
+
+def mark_reload(conn):
+    """
+    线上表被整表替换之后调用（影子表切换 / 回滚）
+
+    没有启用增量同步（删除日志表不存在）时不做任何事。否则把触发器重建
+    到新的线上表，并写一条 reset 通知下游从头同步。
+    """
+    cursor = conn.cursor()
+    try:
+        if not delete_log_exists(cursor):
+            return
+        attach_trigger(cursor)
+        cursor.execute(f"INSERT INTO {DELETE_LOG} (op) VALUES ('reset')")
+        conn.commit()
+        print(f"   ✅ 已通知增量同步: 整表替换，下游将从头同步")
+    finally:
+        cursor.close()
+
+def prune(conn, days):
+    """删除 days 天前的删除日志，返回删除的行数"""
+    cursor = conn.cursor()
+    try:
+        deleted = cursor.execute(f"DELETE FROM {DELETE_LOG} WHERE deleted_at < NOW() - INTERVAL %s DAY", (days,))
+        conn.commit()
+        return deleted
+    finally:
+        cursor.close()
+
+class Sink:
+    """
+    下游接口
+
+    open() 之后按轮次调用: reset()（整表替换时）、delete()、upsert()
+    若干次，最后 flush()；flush 返回后这一轮的水位才保存。同一批变更在中断
+    后可能重发，实现需要幂等。rows 为 SYNC_COLUMNS 中表里存在的列
+    （self.columns）的元组，ids 为主键（BINARY(16) 为 bytes）。
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.columns = None
+
+    def open(self, columns, rules):
+        self.columns = columns
+
+    def upsert(self, rows):
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class JsonlSink(Sink):
+    """追加变更事件: {"op": "upsert", "row": {...}} / {"op": "delete", "id": ...} / {"op": "reset"}"""
+
+    def open(self, columns, rules):
+        super().open(columns, rules)
+        self.file = open(self.target, 'a', encoding='utf-8', newline='\n')
+
+    def write(self, event):
+        self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def upsert(self, rows):
+        for row in rows:
+            record = {name: json_value(value) for name, value in zip(self.columns, row)}
+            record['id'] = format_id(record['id'])
+            self.write({'op': 'upsert', 'row': record})
+
+    def delete(self, ids):
+        for value in ids:
+            self.write({'op': 'delete', 'id': format_id(value)})
+
+    def reset(self):
+        self.write({'op': 'reset'})
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class SnapshotSink(Sink):
+    """每轮的变更合并到 snapshot.py 的列式快照（一轮写一次快照）"""
+
+    def open(self, columns, rules):
+        super().open(columns, rules)
+        import snapshot
+
+        self.snapshot = snapshot
+        self.snapshot_columns, self.kinds = snapshot.snapshot_columns(rules)
+        self.positions = [columns.index(name) for name in self.snapshot_columns]
+        self.updated_pos = columns.index('updated_at')
+        self.clear()
+
+    def clear(self):
+        self.current = None
+        self.buffers = None
+        self.watermark = None
+        self.removed = bytearray()
+        self.replace = False
+
+    def begin(self):
+        """本轮第一次写入时打开已有快照，变更直接编码进列缓冲（不保留原始行）"""
+        if self.buffers is not None:
+            return
+        snapshot = self.snapshot
+        if not self.replace:
+            self.current = snapshot.load_current(self.target, self.kinds)
+        dictionaries = snapshot.current_dictionaries(self.current, self.kinds)
+        self.buffers = {name: snapshot.ColumnBuffer(self.kinds[name], dictionaries.get(name, ()))
+                        for name in self.snapshot_columns}
+        self.appenders = [self.buffers[name].append for name in self.snapshot_columns]
+
+    def upsert(self, rows):
+        self.begin()
+        for row in rows:
+            for append, pos in zip(self.appenders, self.positions):
+                append(row[pos])
+            updated = row[self.updated_pos]
+            if updated is not None and (self.watermark is None or updated > self.watermark):
+                self.watermark = updated
+
+    def delete(self, ids):
+        for value in ids:
+            self.removed += self.snapshot.id_bytes(value)
+
+    def reset(self):
+        if self.current is not None:
+            self.current.arrays.clear()
+        self.clear()
+        self.replace = True
+
+    def flush(self):
+        if self.buffers is None and not self.removed and not self.replace:
+            return
+        self.begin()
+        removed = self.snapshot.np.frombuffer(bytes(self.removed), dtype='S16')
+        self.snapshot.merge(self.target, self.current, self.snapshot_columns, self.kinds, self.buffers,
+                            self.watermark, removed=removed)
+        self.clear()
+
+SINKS = {
+    'jsonl': JsonlSink,
+    'snapshot': SnapshotSink,
+}
+
+def load_sink(spec):
+    """按 "名称:目标" 或 "模块.类名:目标" 建立 sink"""
+    name, _, target = spec.partition(':')
+    if not target:
+        raise ValueError(f"sink 应写成 名称:目标，如 jsonl:changes.jsonl（收到 {spec!r}）")
+    if name in SINKS:
+        return SINKS[name](target)
+    module_name, _, class_name = name.rpartition('.')
+    if not module_name:
+        raise ValueError(f"未知的 sink: {name}（可用: {', '.join(SINKS)}，或 模块.类名）")
+    return getattr(importlib.import_module(module_name), class_name)(target)
+
+class SyncState:
+    """持久化的水位: (updated_at, id) 和删除日志的 seq"""
+
+    def __init__(self, path):
+        self.path = path
+        self.watermark = None
+        self.last_id = None
+        self.delete_seq = None
+        self.upserts = 0
+        self.deletes = 0
+
+    @classmethod
+    def load(cls, path):
+        state = cls(path)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            state.watermark = datetime.fromisoformat(data['watermark']) if data['watermark'] else None
+            state.last_id = bytes.fromhex(data['last_id']) if data['binary_id'] else data['last_id']
+            state.delete_seq = data['delete_seq']
+            state.upserts = data['upserts']
+            state.deletes = data['deletes']
+        return state
+
+    def restart(self):
+        """从头同步（整表替换之后）"""
+        self.watermark = None
+        self.last_id = None
+
+    def save(self):
+        binary = isinstance(self.last_id, (bytes, bytearray))
+        data = {
+            'table': TABLE_NAME,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'last_id': self.last_id.hex() if binary else self.last_id,
+            'binary_id': binary,
+            'delete_seq': self.delete_seq,
+            'upserts': self.upserts,
+            'deletes': self.deletes,
+            'saved': datetime.now().isoformat(timespec='seconds'),
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+class SyncWorker:
+    """一个 sink 的同步进程；conn 应为自动提交连接，每轮查询都能看到最新提交的数据"""
+
+    def __init__(self, conn, sink, state, batch_size=DEFAULT_BATCH_SIZE, lag=DEFAULT_LAG):
+        self.conn = conn
+        self.sink = sink
+        self.state = state
+        self.batch_size = batch_size
+        self.lag = lag
+        self.columns = None
+
+    def open(self):
+        cursor = self.conn.cursor()
+        try:
+            rules = rules_from_table(cursor, TABLE_NAME)
+            if not delete_log_exists(cursor):
+                raise ValueError(f"删除日志表 {DELETE_LOG} 不存在，请先运行: python cdc_sync.py --install")
+            if self.state.delete_seq is None:
+                # 首次同步: 全量拉取已包含此前的删除，删除日志从当前位置开始
+                cursor.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {DELETE_LOG}")
+                self.state.delete_seq = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        self.columns = tuple(name for name in SYNC_COLUMNS if name in rules)
+        self.sink.open(self.columns, rules)
+        select = f"SELECT {', '.join(self.columns)} FROM {TABLE_NAME}"
+        order = f"ORDER BY updated_at, id LIMIT {self.batch_size}"
+        self.first_page_sql = f"{select} WHERE updated_at <= %s {order}"
+        self.next_page_sql = (
+            f"{select} WHERE updated_at <= %s AND (updated_at > %s OR (updated_at = %s AND id > %s)) {order}"
+        )
+
+    def sync_deletes(self, cursor, upper):
+        """处理删除日志，返回删除数"""
+        deleted = 0
+        while True:
+            cursor.execute(
+                f"SELECT seq, op, id FROM {DELETE_LOG} WHERE seq > %s AND deleted_at <= %s ORDER BY seq LIMIT %s",
+                (self.state.delete_seq, upper, self.batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return deleted
+            pending = []
+            for seq, op, value in rows:
+                if op == 'reset':
+                    # 之前的删除和水位都已无意义
+                    pending = []
+                    self.sink.reset()
+                    self.state.restart()
+                else:
+                    pending.append(value)
+            if pending:
+                self.sink.delete(pending)
+                deleted += len(pending)
+            self.state.delete_seq = rows[-1][0]
+
+    def sync_changes(self, cursor, upper):
+        """按 (updated_at, id) 翻页取变更，返回行数"""
+        changed = 0
+        updated_pos = self.columns.index('updated_at')
+        while True:
+            state = self.state
+            if state.watermark is None:
+                cursor.execute(self.first_page_sql, (upper,))
+            else:
+                cursor.execute(self.next_page_sql, (upper, state.watermark, state.watermark, state.last_id))
+            rows = cursor.fetchall()
+            if not rows:
+                return changed
+            self.sink.upsert(rows)
+            changed += len(rows)
+            state.watermark = rows[-1][updated_pos]
+            state.last_id = rows[-1][0]
+            if len(rows) < self.batch_size:
+                return changed
+
+    def run_once(self):
+        """同步一轮，返回 (变更数, 删除数)"""
+        cursor = self.conn.cursor()
+        try:
+            # 上界用数据库时钟，与 updated_at 的默认值一致
+            cursor.execute("SELECT NOW() - INTERVAL %s SECOND", (self.lag,))
+            upper = cursor.fetchone()[0]
+            # 先删后改: 同一主键被删除后又重新写入时，以写入为准
+            deleted = self.sync_deletes(cursor, upper)
+            changed = self.sync_changes(cursor, upper)
+        finally:
+            cursor.close()
+        self.sink.flush()
+        self.state.upserts += changed
+        self.state.deletes += deleted
+        self.state.save()
+        return changed, deleted
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 增量同步')
+    parser.add_argument('--sink', help='jsonl:文件、snapshot:目录，或 模块.类名:目标')
+    parser.add_argument('--state', help='水位状态文件 (默认 cdc_state_<sink 名称>.json)')
+    parser.add_argument('--once', action='store_true', help='同步一轮后退出')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'没有变更时的轮询间隔秒数 (默认 {DEFAULT_INTERVAL})')
+    parser.add_argument('--lag', type=int, default=DEFAULT_LAG,
+                        help=f'只同步早于数据库当前时间 N 秒的变更 (默认 {DEFAULT_LAG})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'每页行数 (默认 {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--install', action='store_true', help='建立删除日志表和触发器')
+    parser.add_argument('--uninstall', action='store_true', help='删除触发器（停用增量同步）')
+    parser.add_argument('--prune-days', type=int, help='删除 N 天前的删除日志')
+    args = parser.parse_args()
+    if not (args.sink or args.install or args.uninstall or args.prune_days is not None):
+        parser.error('请指定 --sink、--install、--uninstall 或 --prune-days')
+
+    import db
+
+    try:
+        conn = db.connect('pymysql', autocommit=True)
+    except pymysql.Error as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+
+    if not args.sink:
+        try:
+            if args.install:
+                install(conn)
+                print(f"   ✅ 已建立删除日志表 {DELETE_LOG} 和触发器 {DELETE_TRIGGER}")
+            if args.uninstall:
+                uninstall(conn)
+                print(f"   ✅ 已删除触发器 {DELETE_TRIGGER}")
+            if args.prune_days is not None:
+                print(f"   ✅ 已清理 {prune(conn, args.prune_days)} 条删除日志")
+        except pymysql.Error as e:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+        finally:
+            conn.close()
+        return
+
+    try:
+        sink = load_sink(args.sink)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    state_file = args.state or f"cdc_state_{args.sink.partition(':')[0]}.json"
+    state = SyncState.load(state_file)
+    worker = SyncWorker(conn, sink, state, args.batch_size, args.lag)
+    try:
+        worker.open()
+    except (ValueError, pymysql.Error) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    print(f"\n增量同步 {db.CONFIG['database']}.{TABLE_NAME} -> {args.sink}")
+    print(f"   水位: updated_at = {state.watermark}，删除日志 seq = {state.delete_seq}")
+    try:
+        while True:
+            try:
+                changed, deleted = worker.run_once()
+            except pymysql.Error as e:
+                if not db.is_disconnect(e):
+                    raise
+                print(f"   ⚠️  连接断开，{RECONNECT_DELAY} 秒后重连: {e}")
+                time.sleep(RECONNECT_DELAY)
+                worker.conn = conn = db.connect('pymysql', autocommit=True)
+                continue
+            if changed or deleted:
+                print(f"   ✅ {datetime.now():%H:%M:%S} 变更 {changed} 条，删除 {deleted} 条，"
+                      f"水位 {state.watermark}")
+            if args.once:
+                break
+            if not changed and not deleted:
+                time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n   已停止")
+    finally:
+        sink.close()
+        conn.close()
+    print(f"   累计同步: 变更 {state.upserts} 条，删除 {state.deletes} 条")
+
+if __name__ == '__main__':
+    main()
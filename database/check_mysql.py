@@ -1,30 +1,28 @@
 #!/usr/bin/env python3
 """
 MySQL 连接检查工具 - 支持多种主机配置
+
+并发探测所有候选主机，选出延迟最小的可达主机并缓存（见 discovery.py），
+之后其他数据库脚本直接连接缓存的主机。
 """
 
 import sys
+import time
+
+import db
+import discovery
 
 try:
-    import mysql.connector
-except ImportError:
-    print("❌ 请先安装依赖: pip install mysql-connector-python")
+    db.get_driver('mysql-connector').module
+except ImportError as e:
+    print(f"❌ {e}")
     sys.exit(1)
 
-def check_connection(host, port, user, password, db=None):
+def check_connection(host, port, user, password, database=None):
     """测试 MySQL 连接"""
     try:
-        config = {
-            'host': host,
-            'port': port,
-            'user': user,
-            'password': password,
-            'connect_timeout': 5
-        }
-        if db:
-            config['database'] = db
-            
-        conn = mysql.connector.connect(**config)
+        conn = db.connect('mysql-connector', host=host, port=port, user=user, password=password,
+                          database=database, connect_timeout=5)
         cursor = conn.cursor()
         
         # 测试查询
@@ -43,47 +41,40 @@ def main():
     print("=" * 60)
     print()
     
-    # 数据库配置
-    user = 'root'
-    password = 'ldf123'
-    port = 3306
-    database = 'logitrack'
+    # 数据库配置（见 db.py）
+    user = db.CONFIG['user']
+    password = db.CONFIG['password']
+    port = db.CONFIG['port']
+    database = db.CONFIG['database']
     
-    # 尝试不同的主机地址
-    hosts = [
-        ('localhost', 'localhost（本地）'),
-        ('127.0.0.1', '127.0.0.1（本地回环）'),
-        ('host.docker.internal', 'host.docker.internal（Docker Desktop）'),
-    ]
+    # 候选主机并发探测（TCP 握手 + MySQL 握手包），总耗时不超过一个超时
+    hosts = discovery.candidate_hosts(db.CONFIG['host'])
+    descriptions = dict(hosts)
     
-    # 尝试从 WSL 获取 Windows 主机 IP
-    try:
-        with open('/etc/resolv.conf', 'r') as f:
-            for line in f:
-                if 'nameserver' in line:
-                    wsl_host = line.split()[1]
-                    hosts.append((wsl_host, f'{wsl_host}（WSL2 Windows 主机）'))
-                    break
-    except:
-        pass
+    print(f"🔍 并发探测 {len(hosts)} 个候选主机（超时 {discovery.PROBE_TIMEOUT} 秒）...")
+    print()
     
-    print("🔍 尝试连接到 MySQL...")
+    start = time.perf_counter()
+    results = discovery.probe_hosts([host for host, _ in hosts], port)
+    for r in results:
+        if r['ok']:
+            print(f"   ✅ {descriptions[r['host']]}: {r['latency_ms']} ms，MySQL {r['version']}")
+        else:
+            print(f"   ❌ {descriptions[r['host']]}: {r['error']}")
+    print(f"   探测耗时 {time.perf_counter() - start:.2f} 秒")
     print()
     
+    # 按延迟从小到大验证用户名和密码，选中的主机缓存给其他脚本使用
     success_host = None
-    
-    for host, description in hosts:
-        print(f"测试 {description}...", end=' ')
-        success, result = check_connection(host, port, user, password)
-        
+    for r in sorted((r for r in results if r['ok']), key=lambda r: r['latency_ms']):
+        success, result = check_connection(r['host'], port, user, password)
         if success:
-            print(f"✅ 成功")
-            print(f"   MySQL 版本: {result}")
-            success_host = host
+            success_host = r['host']
+            discovery.save_endpoint(r)
+            print(f"✅ 选用 {descriptions[r['host']]}（{r['latency_ms']} ms）")
+            print(f"   已缓存 {discovery.ENDPOINT_TTL // 3600} 小时，其他数据库脚本直接使用")
             break
-        else:
-            print(f"❌ 失败")
-            # print(f"   错误: {result}")
+        print(f"❌ {descriptions[r['host']]} 登录失败: {result}")
     
     if not success_host:
         print()
@@ -123,13 +114,7 @@ def main():
         
         # 检查表
         try:
-            conn = mysql.connector.connect(
-                host=success_host,
-                port=port,
-                user=user,
-                password=password,
-                database=database
-            )
+            conn = db.connect('mysql-connector', host=success_host)
             cursor = conn.cursor()
             
             cursor.execute("SHOW TABLES LIKE 'enquiry_records'")
@@ -170,6 +155,10 @@ def main():
     print(f"   spring.datasource.username={user}")
     print(f"   spring.datasource.password={password}")
     print()
+    if db.CONFIG['host_from'] != 'default' and success_host != db.CONFIG['host']:
+        print(f"📝 db.ini / 环境变量中指定的主机 {db.CONFIG['host']} 优先于探测结果，请改为:")
+        print(f"   export LOGITRACK_DB_HOST={success_host}")
+        print()
     
     print("✅ 所有检查完成！")
     print()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 导入断点
+
+断点记录保存在 import_checkpoints 表中，并且与每批数据在同一个事务里
+提交: 数据提交了，断点一定也提交了，反之亦然。因此 --resume 从断点
+继续时不会重复写入、也不会漏掉任何一批。
+
+断点内容: 已提交的最后一条记录结束处的字节偏移、对应的源行号、累计
+成功/失败数和批次数。文件大小或修改时间变化后拒绝续传。
+"""
+
+import os
+
+CHECKPOINT_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS import_checkpoints (
+        import_key VARCHAR(255) PRIMARY KEY COMMENT 'CSV 文件绝对路径',
+        fingerprint VARCHAR(64) NOT NULL COMMENT '文件大小:修改时间',
+        mode VARCHAR(20) NOT NULL COMMENT '导入模式',
+        byte_offset BIGINT NOT NULL COMMENT '已提交记录结束处的字节偏移',
+        line_number BIGINT NOT NULL COMMENT '已提交的最后一个源行号',
+        imported BIGINT NOT NULL DEFAULT 0,
+        failed BIGINT NOT NULL DEFAULT 0,
+        batches INT NOT NULL DEFAULT 0,
+        status VARCHAR(20) NOT NULL COMMENT 'running / done',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='导入断点'
+    """
+
+def file_fingerprint(csv_file):
+    """文件大小和修改时间，用于判断续传时文件是否被替换"""
+    st = os.stat(csv_file)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+class ImportCheckpoint:
+    """一个 CSV 文件的导入断点"""
+
+    def __init__(self, conn, source, mode):
+        self.conn = conn
+        self.source = source
+        self.mode = mode
+        self.key = os.path.abspath(source.csv_file)[-255:]
+        self.fingerprint = file_fingerprint(source.csv_file)
+        self.line_number = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+
+        cursor = conn.cursor()
+        cursor.execute(CHECKPOINT_TABLE_SQL)
+        cursor.close()
+        conn.commit()
+
+    def load(self):
+        """读取已有断点，返回 dict 或 None"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT fingerprint, mode, byte_offset, line_number, imported, failed, batches, status "
+            "FROM import_checkpoints WHERE import_key = %s",
+            (self.key,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        if not row:
+            return None
+        keys = ('fingerprint', 'mode', 'byte_offset', 'line_number', 'imported', 'failed', 'batches', 'status')
+        return dict(zip(keys, row))
+
+    def resume(self):
+        """
+        从已有断点继续
+
+        返回 (字节偏移, 已提交的最后一个源行号)。没有断点、文件已变化或
+        上次已经完成时抛出 ValueError。
+        """
+        saved = self.load()
+        if saved is None:
+            raise ValueError("没有找到该文件的导入断点，请不带 --resume 重新导入")
+        if saved['fingerprint'] != self.fingerprint:
+            raise ValueError("CSV 文件在上次导入后发生了变化，无法续传")
+        if saved['mode'] != self.mode:
+            raise ValueError(f"上次导入模式为 {saved['mode']}，请使用相同的模式续传")
+        if saved['status'] == 'done':
+            raise ValueError("该文件上次已导入完成，无需续传")
+
+        self.line_number = saved['line_number']
+        self.imported = saved['imported']
+        self.failed = saved['failed']
+        self.batches = saved['batches']
+        return saved['byte_offset'], saved['line_number']
+
+    def reset(self):
+        """开始一次全新的导入（不提交，由调用方与清空表一起提交）"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "REPLACE INTO import_checkpoints "
+            "(import_key, fingerprint, mode, byte_offset, line_number, imported, failed, batches, status) "
+            "VALUES (%s, %s, %s, %s, 0, 0, 0, 0, 'running')",
+            (self.key, self.fingerprint, self.mode, self.source.header_end)
+        )
+        cursor.close()
+
+    def record(self, cursor, line_number, ok, bad):
+        """
+        在当前事务中记录一批的断点（由写入函数在 commit 之前调用）
+
+        此时读取位置恰好停在这一批最后一条记录的末尾。
+        """
+        self.line_number = line_number
+        self.imported += ok
+        self.failed += bad
+        self.batches += 1
+        cursor.execute(
+            "UPDATE import_checkpoints SET byte_offset = %s, line_number = %s, "
+            "imported = %s, failed = %s, batches = %s WHERE import_key = %s",
+            (self.source.bytes_read, line_number, self.imported, self.failed, self.batches, self.key)
+        )
+
+    def finish(self):
+        """标记导入完成"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "UPDATE import_checkpoints SET status = 'done' WHERE import_key = %s",
+            (self.key,)
+        )
+        cursor.close()
+        self.conn.commit()
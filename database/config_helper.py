@@ -15,6 +15,8 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "mysql-connector-python"])
     import mysql.connector
 
+import db
+
 print("\n" + "="*60)
 print("LogiTrack Pro - 数据库配置助手")
 print("="*60)
@@ -22,13 +24,8 @@ print("="*60)
 print("\n当前配置的数据库连接信息:")
 print("-" * 60)
 
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 3306,
-    'user': 'root',
-    'password': 'ldf123',
-    'database': 'logitrack'
-}
+# 当前配置（默认值 → db.ini → 环境变量，见 db.py）
+DB_CONFIG = {key: db.CONFIG[key] for key in ('host', 'port', 'user', 'password', 'database')}
 
 print(f"  主机地址: {DB_CONFIG['host']}")
 print(f"  端口: {DB_CONFIG['port']}")
@@ -88,12 +85,7 @@ print(f"\n➡️  连接到 {DB_CONFIG['host']}:{DB_CONFIG['port']}...")
 
 try:
     # 先测试不指定数据库的连接
-    conn = mysql.connector.connect(
-        host=DB_CONFIG['host'],
-        port=DB_CONFIG['port'],
-        user=DB_CONFIG['user'],
-        password=DB_CONFIG['password']
-    )
+    conn = db.connect('mysql-connector', **dict(DB_CONFIG, database=None))
     print("✅ MySQL 服务器连接成功！")
     
     cursor = conn.cursor()
@@ -122,7 +114,7 @@ try:
     # 连接到指定数据库
     if db_exists or create == 'y':
         print(f"\n➡️  连接到数据库 '{DB_CONFIG['database']}'...")
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = db.connect('mysql-connector', **DB_CONFIG)
         cursor = conn.cursor()
         
         # 检查表
@@ -145,11 +137,11 @@ try:
     print("="*60)
     
     if choice == '2':
-        print("\n配置已更新，请手动更新以下文件中的数据库配置:")
-        print("  1. backend/src/main/resources/application.properties")
-        print("  2. database/create_table.py")
-        print("  3. database/import_csv.py")
-        print("  4. database/test_connection.py")
+        db.save_config(dict(db.CONFIG, **DB_CONFIG))
+        print(f"\n✅ 配置已保存到 {db.CONFIG_FILE}，database 目录下的脚本都会使用它")
+        print("   （环境变量 LOGITRACK_DB_* 优先于配置文件）")
+        print("\n后端配置仍需手动更新:")
+        print("  backend/src/main/resources/application.properties")
         print("\n新配置:")
         print(f"  host={DB_CONFIG['host']}")
         print(f"  port={DB_CONFIG['port']}")
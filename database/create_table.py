@@ -8,13 +8,11 @@ import mysql.connector
 import sys
 import os
 
-# 数据库配置
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 3306,
-    'user': 'root',
-    'password': 'ldf123'
-}
+import db
+
+# 数据库配置（见 db.py），建库前不选数据库
+DB_CONFIG = db.CONFIG
+DB_NAME = DB_CONFIG['database']
 
 print("\n" + "="*60)
 print("LogiTrack Pro - MySQL 表结构创建")
@@ -46,7 +44,9 @@ for line in sql_script.split('\n'):
     # 如果行以分号结束，表示一条语句完成
     if line.endswith(';'):
         stmt = ' '.join(current_statement)
-        if stmt.strip() and not stmt.strip().startswith('/*'):
+        # 建库和 USE 按配置的数据库名执行（见下文），跳过脚本里写死的 logitrack
+        database_stmt = stmt.upper().startswith(('CREATE DATABASE', 'USE '))
+        if stmt.strip() and not stmt.strip().startswith('/*') and not database_stmt:
             sql_statements.append(stmt)
         current_statement = []
 
@@ -54,18 +54,18 @@ print(f"✅ 解析到 {len(sql_statements)} 条 SQL 语句")
 
 try:
     # 连接到 MySQL（不指定数据库）
-    print(f"\n1. 连接到 MySQL 服务器 ({DB_CONFIG['host']}:{DB_CONFIG['port']})...")
-    conn = mysql.connector.connect(**DB_CONFIG)
+    print(f"\n1. 连接到 MySQL 服务器 ({db.resolved_host()}:{DB_CONFIG['port']})...")
+    conn = db.connect('mysql-connector', database=None)
     cursor = conn.cursor()
     print("   ✅ 连接成功")
     
     # 创建数据库（如果不存在）
-    print("\n2. 创建数据库 'logitrack'...")
-    cursor.execute("CREATE DATABASE IF NOT EXISTS logitrack CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    print(f"\n2. 创建数据库 '{DB_NAME}'...")
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
     print("   ✅ 数据库已创建或已存在")
     
     # 选择数据库
-    cursor.execute("USE logitrack")
+    cursor.execute(f"USE {DB_NAME}")
     
     # 执行 SQL 语句
     print("\n3. 创建表和索引...")
@@ -93,6 +93,13 @@ try:
     
     conn.commit()
     
+    # schema.sql 会先删除旧表（连同增量同步的删除触发器）。启用了增量同步
+    # （存在删除日志表，见 cdc_sync.py，需要 pymysql）时重新挂上触发器并通知下游从头同步
+    cursor.execute("SHOW TABLES LIKE 'enquiry_records_deletes'")
+    if cursor.fetchall():
+        import cdc_sync
+        cdc_sync.mark_reload(conn)
+    
     # 验证表结构
     print("\n4. 验证表结构...")
     cursor.execute("DESCRIBE enquiry_records")
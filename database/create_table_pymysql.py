@@ -6,11 +6,10 @@
 import pymysql
 import sys
 
-# 数据库配置
-MYSQL_HOST = '127.0.0.1'
-MYSQL_USER = 'root'
-MYSQL_PASSWORD = 'ldf123'
-MYSQL_DB = 'logitrack'
+from bulk_load import print_index_report, verify_indexes
+import cdc_sync
+import db
+import schema_tools
 
 print("\n" + "="*60)
 print("LogiTrack Pro - 创建 MySQL 表结构")
@@ -18,22 +17,15 @@ print("="*60)
 
 try:
     # 连接 MySQL
-    print(f"\n1. 连接到 MySQL ({MYSQL_HOST})...")
-    conn = pymysql.connect(
-        host=MYSQL_HOST,
-        user=MYSQL_USER,
-        password=MYSQL_PASSWORD,
-        database=MYSQL_DB,
-        charset='utf8mb4'
-    )
+    print(f"\n1. 连接到 MySQL ({db.resolved_host()}:{db.CONFIG['port']})...")
+    conn = db.connect('pymysql')
     print("   ✅ 连接成功")
     
     cursor = conn.cursor()
     
-    # 读取 SQL 脚本
+    # 读取 SQL 脚本（二级索引随 CREATE TABLE 一起建立，以 schema.sql 为准）
     print("\n2. 读取建表脚本...")
-    with open('schema.sql', 'r', encoding='utf-8') as f:
-        sql_script = f.read()
+    create_table_sql, _ = schema_tools.create_table_sql()
     
     # 分割并执行 SQL 语句
     print("\n3. 创建表结构...")
@@ -42,36 +34,15 @@ try:
     cursor.execute("DROP TABLE IF EXISTS enquiry_records")
     print("   ✅ 清理旧表")
     
-    # 提取 CREATE TABLE 语句
-    create_table_start = sql_script.find("CREATE TABLE")
-    create_table_end = sql_script.find(";", create_table_start) + 1
-    create_table_sql = sql_script[create_table_start:create_table_end]
-    
     cursor.execute(create_table_sql)
     print("   ✅ 创建表 enquiry_records")
+    # 重建的表没有删除触发器；启用了增量同步时重新挂上并通知下游从头同步
+    cdc_sync.mark_reload(conn)
     
-    # 创建索引
-    print("\n4. 创建索引...")
-    indexes = [
-        "CREATE INDEX idx_reference_number ON enquiry_records(reference_number)",
-        "CREATE INDEX idx_status ON enquiry_records(status)",
-        "CREATE INDEX idx_sales_country ON enquiry_records(sales_country)",
-        "CREATE INDEX idx_booking_confirmed ON enquiry_records(booking_confirmed)",
-        "CREATE INDEX idx_enquiry_date ON enquiry_records(enquiry_received_date)",
-        "CREATE INDEX idx_product ON enquiry_records(product)",
-        "CREATE INDEX idx_pol_pod ON enquiry_records(pol, pod)",
-        "CREATE INDEX idx_created_at ON enquiry_records(created_at)"
-    ]
-    
-    for idx_sql in indexes:
-        try:
-            cursor.execute(idx_sql)
-            print(f"   ✅ {idx_sql.split('CREATE INDEX ')[1].split(' ON')[0]}")
-        except pymysql.err.OperationalError as e:
-            if e.args[0] == 1061:  # Duplicate key name
-                print(f"   ⚠️  索引已存在，跳过")
-            else:
-                raise
+    # 核对索引
+    print("\n4. 核对索引...")
+    problems = verify_indexes(conn)
+    print_index_report(problems)
     
     conn.commit()
     
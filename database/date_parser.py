@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 日期解析组件
+
+支持导出文件中出现的所有日期格式，并按原始字符串缓存结果:
+    2 Jan 2024      (China Pricing 导出)
+    2-Jan-24        (Test.csv)
+    2024-01-02      (ISO)
+    45293           (Excel 序列号)
+
+每个文件只有几百个不同的日期值，缓存命中后解析只需要一次字典查找。
+无法识别的值（TBA、Week 12 等自由文本）返回 None，并计入统计。
+"""
+
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+# 缓存的不同取值上限，超过后清空，避免自由文本列把内存撑大
+DEFAULT_MAX_CACHE = 100000
+
+MONTHS = {
+    'jan': 1, 'january': 1,
+    'feb': 2, 'february': 2,
+    'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4,
+    'may': 5,
+    'jun': 6, 'june': 6,
+    'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8,
+    'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10,
+    'nov': 11, 'november': 11,
+    'dec': 12, 'december': 12,
+}
+
+# 2 Jan 2024 / 2-Jan-24 / 02 JAN 24 / 2-January-2024
+DAY_MONTH_YEAR = re.compile(r'(\d{1,2})([ \-])([A-Za-z]{3,9})[ \-](\d{4}|\d{2})')
+# 2024-01-02（允许带时间部分）
+ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T].*)?')
+# Excel 序列号，限制在 1954-2119 之间以免把普通数字当成日期
+EXCEL_SERIAL = re.compile(r'([2-7]\d{4})(?:\.\d+)?')
+EXCEL_EPOCH = date(1899, 12, 30)
+
+def expand_year(year_str):
+    """两位年份按 strptime %y 的规则展开 (69-99 -> 19xx, 00-68 -> 20xx)"""
+    year = int(year_str)
+    if len(year_str) == 2:
+        year += 1900 if year >= 69 else 2000
+    return year
+
+def parse_uncached(text):
+    """
+    解析一个已去除首尾空白的字符串
+
+    返回 (YYYY-MM-DD 或 None, 匹配到的格式名)。
+    """
+    try:
+        match = DAY_MONTH_YEAR.fullmatch(text)
+        if match:
+            day, sep, month_name, year = match.groups()
+            month = MONTHS.get(month_name.lower())
+            if month:
+                value = date(expand_year(year), month, int(day))
+                return value.isoformat(), f"d{sep}Mon{sep}{'y' * len(year)}"
+
+        match = ISO_DATE.fullmatch(text)
+        if match:
+            year, month, day = match.groups()
+            return date(int(year), int(month), int(day)).isoformat(), 'yyyy-mm-dd'
+
+        match = EXCEL_SERIAL.fullmatch(text)
+        if match:
+            return (EXCEL_EPOCH + timedelta(days=int(match.group(1)))).isoformat(), 'excel serial'
+    except ValueError:
+        # 形状对但日期无效，如 31 Feb 2024
+        return None, 'invalid'
+
+    return None, 'unparsed'
+
+class DateParser:
+    """带缓存的多格式日期解析器，同时统计各格式的命中次数"""
+
+    def __init__(self, max_cache=DEFAULT_MAX_CACHE):
+        self.max_cache = max_cache
+        self.cache = {}
+        self.format_counts = Counter()
+        self.unparsed_counts = Counter()
+
+    def parse(self, value):
+        """解析日期，返回 YYYY-MM-DD 字符串，空值或无法识别时返回 None"""
+        if not value:
+            return None
+        hit = self.cache.get(value)
+        if hit is None:
+            text = value.strip()
+            if not text:
+                return None
+            hit = parse_uncached(text)
+            if len(self.cache) >= self.max_cache:
+                self.cache.clear()
+            self.cache[value] = hit
+
+        result, fmt = hit
+        self.format_counts[fmt] += 1
+        if result is None:
+            self.unparsed_counts[value.strip()] += 1
+        return result
+
+    def pop_counts(self):
+        """取出并清零统计（用于从子进程汇总到主进程）"""
+        counts = (self.format_counts, self.unparsed_counts)
+        self.format_counts = Counter()
+        self.unparsed_counts = Counter()
+        return counts
+
+    def merge_counts(self, counts):
+        """合并 pop_counts 的结果"""
+        format_counts, unparsed_counts = counts
+        self.format_counts.update(format_counts)
+        self.unparsed_counts.update(unparsed_counts)
+
+    def print_report(self, top=10):
+        """打印各格式命中次数和最常见的无法识别的值"""
+        if not self.format_counts:
+            return
+        print("\n   日期格式统计:")
+        for fmt, count in self.format_counts.most_common():
+            print(f"      - {fmt}: {count}")
+        if self.unparsed_counts:
+            print(f"   无法识别的日期 (前 {top} 个，已写入 NULL):")
+            for text, count in self.unparsed_counts.most_common(top):
+                print(f"      - {text!r}: {count}")
+
+# 模块级默认实例
+DATE_PARSER = DateParser()
+
+def parse_date(value):
+    """使用默认实例解析日期"""
+    return DATE_PARSER.parse(value)
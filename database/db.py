@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 数据库访问层
+
+所有数据库脚本共用的配置、驱动和连接池:
+
+配置（后者覆盖前者）:
+    1. 内置默认值（本地开发环境）
+    2. 配置文件 db.ini 的 [mysql] 段（路径可用 LOGITRACK_DB_CONFIG 指定，
+       参考 db.ini.example，config_helper.py 可以交互式生成）
+    3. 环境变量 LOGITRACK_DB_HOST / _PORT / _USER / _PASSWORD / _NAME / _DRIVER
+
+主机没有在配置文件或环境变量中指定时，使用 check_mysql.py 探测并缓存的
+最快主机（见 discovery.py）；连接失败时重新探测一次。
+
+驱动: pymysql 和 mysql-connector 两种，按需导入，连接参数和断线判断的
+差异在这里统一。
+
+连接池: 预热时并发建立连接；取出空闲超过 HEALTH_CHECK_INTERVAL 秒的
+连接前先 ping，断开的连接丢弃并换新的；归还时回滚未提交的事务。取出的
+是 PooledConnection，close() 即归还，因此按普通连接写的代码不用改动。
+"""
+
+import concurrent.futures
+import configparser
+import contextlib
+import os
+import threading
+import time
+
+import discovery
+
+CONFIG_FILE = os.environ.get(
+    'LOGITRACK_DB_CONFIG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db.ini'),
+)
+
+DEFAULT_CONFIG = {
+    'driver': 'pymysql',
+    'host': '127.0.0.1',
+    'port': 3306,
+    'user': 'root',
+    'password': 'ldf123',
+    'database': 'logitrack',
+    'charset': 'utf8mb4',
+}
+
+# 环境变量 -> 配置项
+ENV_VARS = {
+    'LOGITRACK_DB_DRIVER': 'driver',
+    'LOGITRACK_DB_HOST': 'host',
+    'LOGITRACK_DB_PORT': 'port',
+    'LOGITRACK_DB_USER': 'user',
+    'LOGITRACK_DB_PASSWORD': 'password',
+    'LOGITRACK_DB_NAME': 'database',
+}
+
+# 空闲超过多少秒的连接在取出前先 ping
+HEALTH_CHECK_INTERVAL = 30
+
+# 表示连接已断开的错误码: 0 为 pymysql 在已关闭连接上操作，
+# 2003 无法连接，2006 服务器已断开，2013 查询中断开，2055 mysql-connector 断开
+DISCONNECT_CODES = {0, 2003, 2006, 2013, 2055}
+
+def load_config(path=CONFIG_FILE):
+    """
+    读取配置: 默认值 → 配置文件 → 环境变量
+
+    host_from 记录主机来自 default / file / env，只有默认主机会被探测
+    缓存的主机替换。
+    """
+    config = dict(DEFAULT_CONFIG)
+    config['host_from'] = 'default'
+    parser = configparser.ConfigParser()
+    if parser.read(path, encoding='utf-8') and parser.has_section('mysql'):
+        config.update(parser['mysql'])
+        if 'host' in parser['mysql']:
+            config['host_from'] = 'file'
+    for var, key in ENV_VARS.items():
+        if os.environ.get(var):
+            config[key] = os.environ[var]
+            if key == 'host':
+                config['host_from'] = 'env'
+    config['port'] = int(config['port'])
+    return config
+
+def save_config(config, path=CONFIG_FILE):
+    """把配置写入配置文件的 [mysql] 段"""
+    parser = configparser.ConfigParser()
+    parser['mysql'] = {key: str(config[key]) for key in DEFAULT_CONFIG if key in config}
+    with open(path, 'w', encoding='utf-8') as f:
+        parser.write(f)
+
+# 模块级配置，各脚本共用
+CONFIG = load_config()
+
+class Driver:
+    """数据库驱动: 按需导入模块，统一连接参数和错误判断"""
+
+    name = None
+    module_name = None
+    package = None
+
+    def __init__(self):
+        self._module = None
+
+    @property
+    def module(self):
+        if self._module is None:
+            try:
+                self._module = __import__(self.module_name, fromlist=['connect'])
+            except ImportError:
+                raise ImportError(f"请先安装依赖: pip install {self.package}") from None
+        return self._module
+
+    @property
+    def Error(self):
+        return self.module.Error
+
+    def connect(self, config, **options):
+        raise NotImplementedError
+
+    def ping(self, conn):
+        """连接不可用时抛出异常（不自动重连，重连由连接池换新连接完成）"""
+        conn.ping(reconnect=False)
+
+class PyMySQLDriver(Driver):
+    name = 'pymysql'
+    module_name = 'pymysql'
+    package = 'pymysql'
+
+    def connect(self, config, autocommit=False, local_infile=False, connect_timeout=10):
+        return self.module.connect(
+            host=config['host'],
+            port=config['port'],
+            user=config['user'],
+            password=config['password'],
+            database=config['database'],
+            charset=config['charset'],
+            autocommit=autocommit,
+            local_infile=local_infile,
+            connect_timeout=connect_timeout,
+        )
+
+class MySQLConnectorDriver(Driver):
+    name = 'mysql-connector'
+    module_name = 'mysql.connector'
+    package = 'mysql-connector-python'
+
+    def connect(self, config, autocommit=False, local_infile=False, connect_timeout=10):
+        options = {
+            'host': config['host'],
+            'port': config['port'],
+            'user': config['user'],
+            'password': config['password'],
+            'charset': config['charset'],
+            'autocommit': autocommit,
+            'allow_local_infile': local_infile,
+            'connection_timeout': connect_timeout,
+        }
+        if config['database']:
+            options['database'] = config['database']
+        return self.module.connect(**options)
+
+DRIVERS = {driver.name: driver for driver in (PyMySQLDriver(), MySQLConnectorDriver())}
+
+def get_driver(name=None):
+    """按名称取驱动，默认为配置中的驱动"""
+    name = name or CONFIG['driver']
+    if name not in DRIVERS:
+        raise ValueError(f"未知的数据库驱动: {name}（可选: {', '.join(DRIVERS)}）")
+    return DRIVERS[name]
+
+def is_disconnect(error):
+    """错误是否表示连接已断开（两种驱动的错误码位置不同）"""
+    code = getattr(error, 'errno', None)
+    if code is None and error.args and isinstance(error.args[0], int):
+        code = error.args[0]
+    return code in DISCONNECT_CODES
+
+def resolved_host(port=None):
+    """实际使用的主机: 配置中指定的主机，或未过期的探测缓存，否则为默认主机"""
+    port = port or CONFIG['port']
+    if CONFIG['host_from'] == 'default':
+        endpoint = discovery.load_endpoint()
+        if endpoint and endpoint['port'] == port:
+            return endpoint['host']
+    return CONFIG['host']
+
+def connect(driver=None, **options):
+    """
+    按共用配置建立一个连接
+
+    options 可覆盖 host / port / user / password / database（None 表示不选
+    数据库，建库前使用），其余参数（autocommit、local_infile、
+    connect_timeout）传给驱动。
+
+    没有指定主机时优先使用缓存的探测结果；连不上时重新探测，换到
+    最快的可达主机再试一次。
+    """
+    config = dict(CONFIG)
+    auto_host = 'host' not in options and config['host_from'] == 'default'
+    if auto_host:
+        config['host'] = resolved_host(options.get('port'))
+    for key in ('host', 'port', 'user', 'password', 'database'):
+        if key in options:
+            config[key] = options.pop(key)
+
+    db_driver = get_driver(driver)
+    try:
+        return db_driver.connect(config, **options)
+    except db_driver.Error as e:
+        if not auto_host or not is_disconnect(e):
+            raise
+        endpoint = discovery.discover(config['port'], CONFIG['host'])
+        if endpoint is None or endpoint['host'] == config['host']:
+            raise
+        print(f"   ⚠️  {config['host']} 连接失败，改用探测到的 {endpoint['host']} ({endpoint['latency_ms']} ms)")
+        config['host'] = endpoint['host']
+        return db_driver.connect(config, **options)
+
+async def connect_async(**options):
+    """
+    按共用配置建立一个 aiomysql 连接（asyncio 导入使用，关闭自动提交）
+
+    options 可覆盖 host / port / user / password / database，其余传给
+    aiomysql.connect。aiomysql 基于 pymysql，错误类型与 pymysql 相同。
+    """
+    try:
+        import aiomysql
+    except ImportError:
+        raise ImportError("请先安装依赖: pip install aiomysql") from None
+    config = dict(CONFIG)
+    if 'host' not in options:
+        config['host'] = resolved_host(options.get('port'))
+    for key in ('host', 'port', 'user', 'password', 'database'):
+        if key in options:
+            config[key] = options.pop(key)
+    options.setdefault('autocommit', False)
+    options.setdefault('connect_timeout', 10)
+    return await aiomysql.connect(
+        host=config['host'],
+        port=config['port'],
+        user=config['user'],
+        password=config['password'],
+        db=config['database'],
+        charset=config['charset'],
+        **options,
+    )
+
+class PooledConnection:
+    """从连接池取出的连接，close() 归还连接池，其余属性转发给驱动连接"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self.raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def close(self):
+        if self.raw is not None:
+            self._pool.release(self.raw)
+            self.raw = None
+
+    def discard(self):
+        """连接已不可用，关闭而不归还"""
+        if self.raw is not None:
+            self._pool.release(self.raw, broken=True)
+            self.raw = None
+
+class ConnectionPool:
+    """
+    固定上限的连接池
+
+    factory 为建立一个连接的函数（可在其中设置会话参数，断线换新连接
+    时同样生效）；driver 用于 ping。连接池满时 acquire() 等待归还，
+    超过 timeout 秒抛出 TimeoutError。
+    """
+
+    def __init__(self, factory, size=4, driver=None, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.factory = factory
+        self.size = size
+        self.driver = driver or get_driver()
+        self.health_check_interval = health_check_interval
+        self.cond = threading.Condition()
+        # 空闲连接 [(连接, 归还时间), ...]，后进先出，常用的连接保持温热
+        self.idle = []
+        self.created = 0
+        self.closed = False
+        self.opened = 0
+        self.replaced = 0
+
+    def _open(self):
+        conn = self.factory()
+        with self.cond:
+            self.opened += 1
+        return conn
+
+    def warm_up(self, count=None):
+        """并发建立 count 个连接（默认填满连接池）放入空闲列表，返回耗时秒数"""
+        start = time.perf_counter()
+        with self.cond:
+            count = min(count or self.size, self.size - self.created)
+            self.created += count
+        if count <= 0:
+            return 0.0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(self._open) for _ in range(count)]
+        error = None
+        for future in futures:
+            try:
+                conn = future.result()
+            except Exception as e:
+                error = error or e
+                with self.cond:
+                    self.created -= 1
+                continue
+            self.release(conn)
+        if error is not None:
+            raise error
+        return time.perf_counter() - start
+
+    def acquire(self, timeout=None):
+        """取出一个可用连接（PooledConnection）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.cond:
+                while True:
+                    if self.closed:
+                        raise RuntimeError("连接池已关闭")
+                    if self.idle:
+                        conn, last_used = self.idle.pop()
+                        break
+                    if self.created < self.size:
+                        self.created += 1
+                        conn = last_used = None
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"等待数据库连接超时 ({timeout} 秒)")
+                    self.cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    return PooledConnection(self, self._open())
+                except Exception:
+                    with self.cond:
+                        self.created -= 1
+                        self.cond.notify()
+                    raise
+
+            if time.monotonic() - last_used >= self.health_check_interval:
+                try:
+                    self.driver.ping(conn)
+                except Exception:
+                    # 服务器已断开（超时、重启……）: 丢弃，下一轮换新连接
+                    self.release(conn, broken=True)
+                    with self.cond:
+                        self.replaced += 1
+                    continue
+            return PooledConnection(self, conn)
+
+    def release(self, conn, broken=False):
+        """归还连接: 回滚未提交的事务；已断开或连接池已关闭时关闭连接"""
+        if not broken and not self.closed:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        if broken or self.closed:
+            with contextlib.suppress(Exception):
+                conn.close()
+            with self.cond:
+                self.created -= 1
+                self.cond.notify()
+            return
+        with self.cond:
+            self.idle.append((conn, time.monotonic()))
+            self.cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """with 语句取用连接；因断线抛出异常时丢弃该连接"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception as e:
+            if is_disconnect(e):
+                conn.discard()
+            else:
+                conn.close()
+            raise
+        conn.close()
+
+    def close(self):
+        """关闭全部空闲连接；之后归还的连接直接关闭"""
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.created -= len(idle)
+            self.cond.notify_all()
+        for conn, _ in idle:
+            with contextlib.suppress(Exception):
+                conn.close()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 低基数列的字典编码
+
+product、status、sales_country、category 等列只有几十个不同取值，却在
+每一行里重复存一遍长字符串（如 "4. Origin Charges/EXW"）。可选的字典
+编码布局把它们换成指向查找表的 SMALLINT 外键:
+
+    lookup_<列名>             (id SMALLINT, value 原类型 UNIQUE)
+    enquiry_records_compact   原表结构，低基数列换成 <列名>_id
+    enquiry_records_flat      视图，关联查找表还原为 enquiry_records 的列
+
+行宽、二级索引（idx_status 等）都从变长字符串缩小到 2 字节，GROUP BY
+先按编号聚合再关联查找表。后端仍读写 enquiry_records，字典布局供只读
+分析使用。
+
+导入（import_csv_pymysql.py --dictionary）时，编码在进程内的字典里完成，
+启动时一次性载入全部查找表；只有第一次出现的新值才写一次查找表（单独的
+自动提交连接，批次回滚不会让缓存的编号失效）。
+
+用法:
+    python dictionary.py --create          建立查找表、字典编码表和视图
+    python dictionary.py --create --copy   并从 enquiry_records 复制现有数据
+    python dictionary.py --report          对比两种布局的数据和索引大小
+"""
+
+import argparse
+import re
+import sys
+import time
+
+import pymysql
+
+from header_mapping import FIELD_NAMES
+from instrumentation import METRICS
+from schema_tools import TABLE_NAME, create_table_sql
+from validation import rules_from_schema
+
+COMPACT_TABLE = TABLE_NAME + '_compact'
+FLAT_VIEW = TABLE_NAME + '_flat'
+
+# 字典编码的列
+DICT_COLUMNS = (
+    'product',
+    'status',
+    'cn_pricing_admin',
+    'sales_country',
+    'sales_office',
+    'assigned_cn_offices',
+    'pod_country',
+    'category',
+    'booking_confirmed',
+)
+
+def lookup_table(column):
+    return f"lookup_{column}"
+
+def encoded_columns(columns):
+    """把列名序列中的字典列换成编码列（INSERT / LOAD DATA 的列清单）"""
+    return tuple(f"{name}_id" if name in DICT_COLUMNS else name for name in columns)
+
+def lookup_table_sql(column, rules):
+    """查找表的建表语句，value 与原表的列类型一致"""
+    rule = rules[column]
+    value_type = f"{rule.type.upper()}({rule.length})" if rule.length else rule.type.upper()
+    return (
+        f"CREATE TABLE IF NOT EXISTS {lookup_table(column)} (\n"
+        f"    id SMALLINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,\n"
+        f"    value {value_type} NOT NULL UNIQUE\n"
+        f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='{column} 字典'"
+    )
+
+def compact_table_sql():
+    """
+    由 schema.sql 的建表语句生成字典编码表
+
+    字典列换成 SMALLINT UNSIGNED 的 <列名>_id 并加外键，引用它们的二级索引
+    改为引用编码列，其余列和索引不变。
+    """
+    create_sql, _ = create_table_sql(COMPACT_TABLE)
+    lines = []
+    for line in create_sql.splitlines():
+        match = re.match(r'^(\s*)(\w+)\s+\w+\s*(?:\([^)]*\))?(.*)$', line)
+        if match and match.group(2) in DICT_COLUMNS:
+            indent, name, rest = match.groups()
+            line = f"{indent}{name}_id SMALLINT UNSIGNED{rest}"
+        elif re.match(r'^\s*(?:INDEX|KEY)\s', line, re.IGNORECASE):
+            line = re.sub(r'\(([^)]*)\)',
+                          lambda m: '(' + ', '.join(encoded_columns([c.strip() for c in m.group(1).split(',')])) + ')',
+                          line)
+        lines.append(line)
+    body = '\n'.join(lines)
+    constraints = ',\n'.join(
+        f"    CONSTRAINT fk_compact_{name} FOREIGN KEY ({name}_id) REFERENCES {lookup_table(name)} (id)"
+        for name in DICT_COLUMNS
+    )
+    # 外键接在最后一个索引之后
+    return re.sub(r'\n(\)\s*ENGINE)', f",\n{constraints}\n\\1", body, count=1)
+
+def flat_view_sql(rules):
+    """还原 enquiry_records 列的视图，列顺序与 schema.sql 一致"""
+    select = []
+    joins = []
+    for name in rules:
+        if name in DICT_COLUMNS:
+            select.append(f"    l_{name}.value AS {name}")
+            joins.append(f"LEFT JOIN {lookup_table(name)} l_{name} ON l_{name}.id = r.{name}_id")
+        else:
+            select.append(f"    r.{name}")
+    return (
+        f"CREATE OR REPLACE VIEW {FLAT_VIEW} AS\nSELECT\n" + ',\n'.join(select)
+        + f"\nFROM {COMPACT_TABLE} r\n" + '\n'.join(joins)
+    )
+
+def create_schema(conn):
+    """建立查找表、字典编码表和视图（已存在的保留）"""
+    rules = rules_from_schema()
+    cursor = conn.cursor()
+    for name in DICT_COLUMNS:
+        cursor.execute(lookup_table_sql(name, rules))
+    cursor.execute(compact_table_sql().replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+    cursor.execute(flat_view_sql(rules))
+    cursor.close()
+    conn.commit()
+
+def copy_from_flat(conn):
+    """
+    从 enquiry_records 复制现有数据（全部在服务器端完成）
+
+    先把各字典列的不同取值写入查找表，再整表 INSERT ... SELECT。
+    返回复制的行数。
+    """
+    rules = rules_from_schema()
+    cursor = conn.cursor()
+    for name in DICT_COLUMNS:
+        cursor.execute(
+            f"INSERT IGNORE INTO {lookup_table(name)} (value) "
+            f"SELECT DISTINCT {name} FROM {TABLE_NAME} WHERE {name} IS NOT NULL"
+        )
+    columns = encoded_columns(tuple(rules))
+    select = ', '.join(f"l_{name}.id" if name in DICT_COLUMNS else f"r.{name}" for name in rules)
+    joins = ' '.join(f"LEFT JOIN {lookup_table(name)} l_{name} ON l_{name}.value = r.{name}" for name in DICT_COLUMNS)
+    cursor.execute(f"DELETE FROM {COMPACT_TABLE}")
+    copied = cursor.execute(
+        f"INSERT INTO {COMPACT_TABLE} ({', '.join(columns)}) SELECT {select} FROM {TABLE_NAME} r {joins}"
+    )
+    cursor.close()
+    conn.commit()
+    return copied
+
+class DictionaryEncoder:
+    """
+    导入时的进程内字典: 值 -> 编号
+
+    open() 之前 encode_records() 原样产出，导入非字典布局时不起作用。
+    参数元组中字典列的位置为 FIELD_NAMES 的位置加 1（第 0 位为主键）。
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.codes = {}
+        self.values = {}
+        self.created = 0
+        self.positions = tuple((FIELD_NAMES.index(name) + 1, name) for name in DICT_COLUMNS)
+
+    def open(self, conn):
+        """conn 为自动提交的连接，一次性载入全部查找表"""
+        self.conn = conn
+        self.created = 0
+        cursor = conn.cursor()
+        for name in DICT_COLUMNS:
+            cursor.execute(f"SELECT id, value FROM {lookup_table(name)}")
+            rows = cursor.fetchall()
+            self.codes[name] = {value: code for code, value in rows}
+            self.values[name] = dict(rows)
+        cursor.close()
+        return sum(len(codes) for codes in self.codes.values())
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def code(self, name, value):
+        """取值的编号，新值写入查找表（已被其他进程写入时取其编号）"""
+        code = self.codes[name].get(value)
+        if code is None:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"INSERT INTO {lookup_table(name)} (value) VALUES (%s) "
+                "ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)",
+                (value,),
+            )
+            code = cursor.lastrowid
+            cursor.close()
+            self.codes[name][value] = code
+            # 排序规则不区分大小写，"Quoted" 与 "QUOTED" 共用编号，解码时取先出现的写法
+            self.values[name].setdefault(code, value)
+            self.created += 1
+        return code
+
+    def encode(self, data):
+        data = list(data)
+        for pos, name in self.positions:
+            if data[pos] is not None:
+                data[pos] = self.code(name, data[pos])
+        return tuple(data)
+
+    def decode(self, data):
+        """编码后的参数元组还原为原值（写入拒绝文件时使用）"""
+        if self.conn is None:
+            return data
+        data = list(data)
+        for pos, name in self.positions:
+            if data[pos] is not None:
+                data[pos] = self.values[name].get(data[pos], data[pos])
+        return tuple(data)
+
+    def encode_records(self, records):
+        """逐条编码 (源行号, 参数元组)，计入 METRICS 的 encode 阶段"""
+        if self.conn is None:
+            yield from records
+            return
+        perf = time.perf_counter
+        thread_time = time.thread_time
+        wall = cpu = 0.0
+        calls = 0
+        try:
+            for idx, data in records:
+                w, c = perf(), thread_time()
+                data = self.encode(data)
+                wall += perf() - w
+                cpu += thread_time() - c
+                calls += 1
+                yield idx, data
+        finally:
+            METRICS.add('encode', wall, cpu, calls)
+
+    def print_report(self):
+        if self.conn is None:
+            return
+        total = sum(len(values) for values in self.values.values())
+        print(f"\n   字典编码: {len(DICT_COLUMNS)} 列共 {total} 个取值，本次新增 {self.created} 个")
+
+# 模块级实例，导入流水线各处共用
+DICTIONARY = DictionaryEncoder()
+
+def table_size(cursor, table):
+    """(行数估计, 数据字节, 索引字节)"""
+    cursor.execute(
+        "SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+    )
+    row = cursor.fetchone()
+    return row if row else (0, 0, 0)
+
+def print_size_report(conn):
+    """对比 enquiry_records 与字典编码表（含查找表）的大小"""
+    cursor = conn.cursor()
+    cursor.execute(f"ANALYZE TABLE {TABLE_NAME}, {COMPACT_TABLE}")
+    cursor.fetchall()
+    flat = table_size(cursor, TABLE_NAME)
+    compact = list(table_size(cursor, COMPACT_TABLE))
+    for name in DICT_COLUMNS:
+        _, data_length, index_length = table_size(cursor, lookup_table(name))
+        compact[1] += data_length
+        compact[2] += index_length
+    cursor.close()
+    print(f"\n   {'':<28}{'行数':>10}{'数据 MB':>12}{'索引 MB':>12}")
+    for label, (rows, data_length, index_length) in ((TABLE_NAME, flat), (f"{COMPACT_TABLE} + 查找表", compact)):
+        print(f"   {label:<28}{rows or 0:>10}{(data_length or 0) / 1048576:>12.1f}{(index_length or 0) / 1048576:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 低基数列字典编码')
+    parser.add_argument('--create', action='store_true', help='建立查找表、字典编码表和视图')
+    parser.add_argument('--copy', action='store_true', help='从 enquiry_records 复制现有数据到字典编码表')
+    parser.add_argument('--report', action='store_true', help='对比两种布局的数据和索引大小')
+    args = parser.parse_args()
+    if not (args.create or args.copy or args.report):
+        parser.error('请指定 --create、--copy 或 --report')
+
+    import db
+
+    try:
+        conn = db.connect('pymysql')
+    except pymysql.Error as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+    try:
+        if args.create:
+            create_schema(conn)
+            print(f"   ✅ 已建立 {len(DICT_COLUMNS)} 个查找表、{COMPACT_TABLE} 和视图 {FLAT_VIEW}")
+        if args.copy:
+            start = time.perf_counter()
+            copied = copy_from_flat(conn)
+            print(f"   ✅ 已复制 {copied} 条 ({time.perf_counter() - start:.1f} 秒)")
+        if args.report:
+            print_size_report(conn)
+    except pymysql.Error as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - MySQL 主机发现
+
+WSL / Docker 环境下 MySQL 可能在 localhost、host.docker.internal 或
+WSL 的 Windows 主机（resolv.conf 的 nameserver）上。逐个以 5 秒超时尝试
+要十几秒，这里并发探测全部候选主机: 建立 TCP 连接并读取 MySQL 的握手包
+（不需要驱动和密码），按实测延迟选出最快的可达主机。
+
+结果缓存在 .db_endpoint.json 中，ENDPOINT_TTL 秒内其他脚本直接使用
+（见 db.connect），过期或连接失败时重新探测。
+"""
+
+import concurrent.futures
+import json
+import os
+import socket
+import time
+
+ENDPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.db_endpoint.json')
+
+# 缓存有效期（秒）；WSL 的 Windows 主机 IP 重启后会变，失效后自动重新探测
+ENDPOINT_TTL = 12 * 3600
+
+# 单个主机的探测超时（秒），所有主机并发探测，总耗时不超过它
+PROBE_TIMEOUT = 3
+
+def in_wsl():
+    """是否运行在 WSL 中（普通 Linux 的 resolv.conf 指向本地解析器或公司 DNS，不能当作主机）"""
+    if os.environ.get('WSL_DISTRO_NAME'):
+        return True
+    try:
+        with open('/proc/version', 'r') as f:
+            return 'microsoft' in f.read().lower()
+    except OSError:
+        return False
+
+def wsl_host():
+    """WSL2 中 Windows 主机的 IP（resolv.conf 的 nameserver），不在 WSL 中时返回 None"""
+    if not in_wsl():
+        return None
+    try:
+        with open('/etc/resolv.conf', 'r') as f:
+            for line in f:
+                if line.startswith('nameserver'):
+                    return line.split()[1]
+    except (OSError, IndexError):
+        pass
+    return None
+
+def candidate_hosts(configured=None):
+    """候选主机 [(主机, 说明), ...]，configured 为配置中的主机（排在最前）"""
+    hosts = [
+        ('localhost', 'localhost（本地）'),
+        ('127.0.0.1', '127.0.0.1（本地回环）'),
+        ('host.docker.internal', 'host.docker.internal（Docker Desktop）'),
+    ]
+    windows_host = wsl_host()
+    if windows_host:
+        hosts.append((windows_host, f'{windows_host}（WSL2 Windows 主机）'))
+    if configured and configured not in [host for host, _ in hosts]:
+        hosts.insert(0, (configured, f'{configured}（db.ini / 环境变量配置）'))
+    return hosts
+
+def recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("连接被关闭")
+        data += chunk
+    return data
+
+def probe_host(host, port, timeout=PROBE_TIMEOUT):
+    """
+    探测一个主机: TCP 连接并读取 MySQL 握手包
+
+    返回 dict: host、ok、latency_ms（连接到收到握手包的耗时）、version、
+    error。服务器拒绝该客户端主机时（如 1130）ok 为 False，但带有错误信息。
+    """
+    result = {'host': host, 'port': port, 'ok': False, 'latency_ms': None, 'version': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            header = recv_exact(sock, 4)
+            payload = recv_exact(sock, int.from_bytes(header[:3], 'little'))
+        result['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    except (OSError, ConnectionError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+        return result
+
+    if payload[:1] == b'\xff':
+        # 错误包: 0xff, 错误码 (2 字节), 信息
+        code = int.from_bytes(payload[1:3], 'little')
+        result['error'] = f"{code} {payload[3:].decode('utf-8', errors='replace')}"
+    elif payload[:1] == b'\x0a':
+        # 握手包 v10: 0x0a, 以 \0 结尾的版本号
+        result['version'] = payload[1:payload.find(b'\0', 1)].decode('ascii', errors='replace')
+        result['ok'] = True
+    else:
+        result['error'] = "不是 MySQL 服务"
+    return result
+
+def probe_hosts(hosts, port, timeout=PROBE_TIMEOUT):
+    """并发探测，按传入顺序返回结果列表"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        return list(executor.map(lambda host: probe_host(host, port, timeout), hosts))
+
+def fastest(results):
+    """可达主机中延迟最小的一个，没有时返回 None"""
+    reachable = [r for r in results if r['ok']]
+    return min(reachable, key=lambda r: r['latency_ms']) if reachable else None
+
+def load_endpoint(ttl=ENDPOINT_TTL, path=ENDPOINT_FILE):
+    """读取未过期的缓存 {'host', 'port', 'latency_ms', 'version', 'discovered_at'}，没有时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            endpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - endpoint.get('discovered_at', 0) > ttl:
+        return None
+    return endpoint
+
+def save_endpoint(result, path=ENDPOINT_FILE):
+    """缓存探测结果（先写临时文件再替换，并发的脚本不会读到半个文件）"""
+    endpoint = {
+        'host': result['host'],
+        'port': result['port'],
+        'latency_ms': result['latency_ms'],
+        'version': result['version'],
+        'discovered_at': time.time(),
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(endpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return endpoint
+
+def forget_endpoint(path=ENDPOINT_FILE):
+    """删除缓存（缓存的主机连不上时）"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def discover(port, configured=None, timeout=PROBE_TIMEOUT):
+    """并发探测候选主机，缓存并返回最快的可达主机；都不可达时返回 None"""
+    hosts = [host for host, _ in candidate_hosts(configured)]
+    best = fastest(probe_hosts(hosts, port, timeout))
+    if best is None:
+        return None
+    return save_endpoint(best)
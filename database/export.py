@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 流式导出 enquiry_records
+
+后端的 GET /api/enquiries 用 findAll() 把整张表读进内存，临时的
+SELECT * 也会让驱动缓存整个结果集。这里按主键分页（keyset: WHERE id > 上
+一页最后的 id ORDER BY id LIMIT n），每页用服务器端游标（SSCursor）逐行
+读取、逐行写出，内存占用与表大小无关:
+    - 每页是一条独立的短查询（自动提交），不会长时间持有读视图
+    - 翻页按主键定位，不像 OFFSET 那样越往后越慢
+
+输出格式:
+    csv      China Pricing 导出的列布局和表头（日期如 "2 Jan 2024"），
+             可直接用 import_csv_pymysql.py 重新导入
+    jsonl    每行一个 JSON 对象，键为列名，日期为 ISO 格式
+    parquet  按页写入行组，列类型来自 DESCRIBE（需 pip install pyarrow）
+
+用法:
+    python export.py out.csv
+    python export.py out.jsonl --format jsonl --since 2025-01-01 --until 2025-03-31
+    python export.py out.parquet --columns reference_number,status,volume_cbm
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pymysql
+
+from header_mapping import FIELD_KINDS, FIELD_NAMES, HEADERS, MONTHS
+from instrumentation import ProgressReporter
+from schema_tools import TABLE_NAME
+from validation import rules_from_table
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# 每页行数（一条查询）；parquet 每页写一个行组
+DEFAULT_PAGE_SIZE = 10000
+
+# 默认导出的列: csv 与 China Pricing 导出一致，便于重新导入；其余格式带主键和时间戳
+DEFAULT_COLUMNS = {
+    'csv': FIELD_NAMES,
+    'jsonl': ('id',) + FIELD_NAMES + ('created_at', 'updated_at'),
+    'parquet': ('id',) + FIELD_NAMES + ('created_at', 'updated_at'),
+}
+
+# 字段名 -> China Pricing 表头（含换行，与原始导出一致）
+CSV_HEADERS = dict(zip(FIELD_NAMES, HEADERS))
+
+# 可用于 --date-column 的日期列
+DATE_COLUMNS = tuple(name for name, kind in zip(FIELD_NAMES, FIELD_KINDS) if kind == 'date')
+
+def format_id(value):
+    """BINARY(16) 主键转为标准的 36 位字符串（迁移 003 之前已是字符串）"""
+    if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+        return str(uuid.UUID(bytes=bytes(value)))
+    return value
+
+def csv_value(value):
+    """CSV 单元格: 日期用导出格式 "2 Jan 2024"，数值去掉多余的 0，NULL 为空"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    if isinstance(value, date):
+        return f"{value.day} {MONTHS[value.month - 1]} {value.year}"
+    if isinstance(value, Decimal):
+        return f"{value.normalize():f}"
+    return value
+
+def json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def page_queries(columns, table=TABLE_NAME, date_column=None, since=None, until=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    返回 (第一页的 SQL, 后续页的 SQL, 过滤参数)
+
+    columns 中没有 id 时在最前面加上（翻页用）。后续页的 SQL 多一个
+    id > %s 条件，参数放在过滤参数之前。
+    """
+    filters = []
+    params = []
+    if since is not None:
+        filters.append(f"{date_column} >= %s")
+        params.append(since)
+    if until is not None:
+        filters.append(f"{date_column} <= %s")
+        params.append(until)
+    if 'id' not in columns:
+        columns = ('id',) + tuple(columns)
+    select = f"SELECT {', '.join(columns)} FROM {table}"
+    order = f"ORDER BY id LIMIT {page_size}"
+    first = f"{select} WHERE {' AND '.join(filters)} {order}" if filters else f"{select} {order}"
+    following = f"{select} WHERE {' AND '.join(['id > %s'] + filters)} {order}"
+    return first, following, params
+
+def stream_rows(conn, columns, table=TABLE_NAME, date_column=None, since=None, until=None,
+                page_size=DEFAULT_PAGE_SIZE):
+    """按主键分页、逐行产出 columns 的值（元组），conn 应为自动提交连接"""
+    first, following, params = page_queries(columns, table, date_column, since, until, page_size)
+    key = list(columns).index('id') if 'id' in columns else None
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    last = None
+    try:
+        while True:
+            if last is None:
+                cursor.execute(first, params)
+            else:
+                cursor.execute(following, [last] + params)
+            count = 0
+            for row in cursor:
+                count += 1
+                if key is None:
+                    last = row[0]
+                    yield row[1:]
+                else:
+                    last = row[key]
+                    yield row
+            if count < page_size:
+                break
+    finally:
+        cursor.close()
+
+class CsvExport:
+    """China Pricing 列布局的 CSV（UTF-8 BOM、CRLF，与 Test.csv 相同）"""
+
+    def __init__(self, path, columns, rules):
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file, lineterminator='\r\n')
+        self.writer.writerow([CSV_HEADERS.get(name, name) for name in columns])
+        self.id_pos = columns.index('id') if 'id' in columns else None
+
+    def write(self, row):
+        row = [csv_value(value) for value in row]
+        if self.id_pos is not None:
+            row[self.id_pos] = format_id(row[self.id_pos])
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+class JsonlExport:
+    """每行一个 JSON 对象"""
+
+    def __init__(self, path, columns, rules):
+        self.file = open(path, 'w', encoding='utf-8', newline='\n')
+        self.columns = columns
+
+    def write(self, row):
+        record = {name: json_value(value) for name, value in zip(self.columns, row)}
+        if 'id' in record:
+            record['id'] = format_id(record['id'])
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+class ParquetExport:
+    """
+    Parquet，每 row_group_size 行写一个行组
+
+    列类型按 DESCRIBE: DECIMAL 保持精度和小数位，日期为 date32，时间戳为
+    timestamp，主键为 36 位字符串，其余为字符串。
+    """
+
+    def __init__(self, path, columns, rules, row_group_size=DEFAULT_PAGE_SIZE):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("请先安装依赖: pip install pyarrow") from None
+        self.pa = pyarrow
+        self.columns = columns
+        self.schema = pyarrow.schema([(name, self.arrow_type(rules[name])) for name in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.id_pos = columns.index('id') if 'id' in columns else None
+
+    def arrow_type(self, rule):
+        pa = self.pa
+        if rule.name == 'id':
+            return pa.string()
+        if rule.type == 'decimal':
+            return pa.decimal128(rule.length, rule.scale)
+        if rule.type == 'date':
+            return pa.date32()
+        if rule.type in ('datetime', 'timestamp'):
+            return pa.timestamp('us')
+        if rule.type in ('tinyint', 'smallint', 'int', 'integer', 'bigint'):
+            return pa.int64()
+        if rule.type in ('float', 'double'):
+            return pa.float64()
+        return pa.string()
+
+    def write(self, row):
+        if self.id_pos is not None:
+            row = list(row)
+            row[self.id_pos] = format_id(row[self.id_pos])
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = [list(values) for values in zip(*self.rows)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+EXPORTERS = {
+    'csv': CsvExport,
+    'jsonl': JsonlExport,
+    'parquet': ParquetExport,
+}
+
+def export(conn, path, fmt='csv', columns=None, table=TABLE_NAME, date_column=DATE_COLUMNS[0], since=None,
+           until=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    导出到 path，返回 (行数, 耗时秒数)
+
+    columns 为空时使用该格式的默认列。列名按目标表的 DESCRIBE 检查，
+    不存在时抛出 ValueError。
+    """
+    columns = tuple(columns or DEFAULT_COLUMNS[fmt])
+    cursor = conn.cursor()
+    try:
+        rules = rules_from_table(cursor, table)
+    finally:
+        cursor.close()
+    unknown = [name for name in columns + (date_column,) if name not in rules]
+    if unknown:
+        raise ValueError(f"表 {table} 中没有列: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    reporter = ProgressReporter()
+    out = EXPORTERS[fmt](path, columns, rules)
+    count = 0
+    try:
+        for row in stream_rows(conn, columns, table, date_column, since, until, page_size):
+            out.write(row)
+            count += 1
+            if count % page_size == 0:
+                elapsed = time.perf_counter() - start
+                reporter.update(f"   ✅ [{count}] 已导出，{count / elapsed:,.0f} 条/秒")
+    finally:
+        out.close()
+    reporter.finish()
+    return count, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 流式导出询价记录')
+    parser.add_argument('output', help='输出文件路径')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help='输出格式 (默认按扩展名，否则 csv)')
+    parser.add_argument('--columns', help='逗号分隔的列名 (默认: csv 为 China Pricing 的全部列，其余另加 id 和时间戳)')
+    parser.add_argument('--date-column', choices=DATE_COLUMNS, default=DATE_COLUMNS[0],
+                        help=f'--since / --until 过滤的日期列 (默认 {DATE_COLUMNS[0]})')
+    parser.add_argument('--since', type=date.fromisoformat, help='起始日期 YYYY-MM-DD（含）')
+    parser.add_argument('--until', type=date.fromisoformat, help='截止日期 YYYY-MM-DD（含）')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'每页行数 (默认 {DEFAULT_PAGE_SIZE})')
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'csv'
+    columns = [name.strip() for name in args.columns.split(',') if name.strip()] if args.columns else None
+
+    import db
+
+    print(f"\n导出 {db.CONFIG['database']}.{TABLE_NAME} 到 {args.output} ({fmt})...")
+    try:
+        conn = db.connect('pymysql', autocommit=True)
+    except pymysql.Error as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+    try:
+        count, elapsed = export(conn, args.output, fmt, columns, date_column=args.date_column, since=args.since,
+                                until=args.until, page_size=args.page_size)
+    except (ValueError, ImportError, pymysql.Error) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"   ✅ 共导出 {count} 条 ({elapsed:.1f} 秒, {rate:,.0f} 条/秒)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 合成询价数据生成器
+
+按 Test.csv 和 China Pricing 导出的列格式和取值分布生成任意行数的询价
+记录，供导入基准测试使用。相同的行数、种子和格式总是生成完全相同的
+文件，不同提交之间的测试结果可以直接对比。
+
+两种格式:
+    china  与 China Pricing 导出一致: 表头上方有一行字段说明，表头含
+           换行，行尾有空列，CRLF 换行，cp1252 编码
+    test   与 Test.csv 一致: UTF-8 BOM，只有表头行
+
+用法:
+    python generate_enquiries.py out.csv --rows 100000 [--seed 42] [--style china|test]
+"""
+
+import argparse
+import bisect
+import csv
+import itertools
+import random
+import time
+from datetime import date, timedelta
+
+from header_mapping import HEADERS, MONTHS
+
+# 生成器的取值分布改变时递增，基准测试的缓存文件名包含此版本号
+GENERATOR_VERSION = 1
+
+DEFAULT_SEED = 42
+
+# China Pricing 导出表头上方的字段说明行（节选）
+DESCRIPTION_ROW = (
+    'Default current. User allowed to chage it. ', 'Default current date. User NOT allowed to chage it. ',
+    'Auto-gen unique ID', 'Drop down list. ', 'Drop down list',
+    'Default to login User Name, not allow to update. ', 'Drop down list. From country table.',
+    'Lookup field. \nFrom master table.', 'Free text', 'Dropdown list ', 'Dropdown list ',
+    'Numeric. \n3 decimal place. \n', 'Numeric. \n3 decimal place. \n', 'UI Design. TBD', 'Auto-cal',
+    'Free Text', 'Free Text\n(To be enhanced later.)', 'Lookup , From master table',
+    'Lookup , From master table', 'Lookup , From master table', 'Option / Dropdown', 'Drop down',
+    'Date / Optional field. ', 'Free text \n(200 characters at least) ', 'Date / Optional field. ',
+    'Numeric ? \nFree Text ? ', 'Numeric ? \nFree Text ? ', '', '', 'Dropdown list',
+    'Free text. \nText Area', 'Free text', 'Free text',
+)
+
+# China Pricing 导出行尾的空列数
+TRAILING_COLUMNS = 22
+
+# 数据时间范围
+FIRST_DAY = date(2024, 1, 2)
+LAST_DAY = date(2025, 10, 31)
+
+# 以下为 (取值, 权重)，权重按真实导出的频率取整
+PRODUCTS = (('AIR', 494), ('SEA', 465), ('SEA-AIR', 23), ('RAIL', 15), ('RAIL-SEA', 2), ('RAIL-AIR', 1))
+STATUSES = (('Quoted', 980), ('Cancelled', 18), ('New', 1))
+PRICING_ADMINS = (('Yuki Lam', 29), ('Nikki Zhou', 27), ('Susan Ho', 24), ('Janet Lee', 20), ('Yvonne Tse', 1))
+SALES_COUNTRIES = (
+    ('FRANCE', 423), ('UK', 184), ('BELGIUM', 98), ('AGENTS', 97), ('NETHERLANDS', 56),
+    ('SOUTH_AFRICA', 54), ('SWITZERLAND', 28), ('CHINA', 26), ('GERMANY', 25), ('MOROCCO', 5),
+    ('OTHERS', 2), ('GREECE', 1),
+)
+SALES_OFFICES = {
+    'FRANCE': (('ZIEGLER FRANCE', 1),),
+    'UK': (('ZIEGLER NEWPORT', 30), ('ZIEGLER COLNBROOK', 21), ('ZIEGLER COLNBROOK ', 8),
+           ('ZIEGLER WARRINGTON', 14), ('ZIEGLER FELIXSTOWE', 12)),
+    'BELGIUM': (('ZIEGLER BELGIUM', 1),),
+    'AGENTS': (('AGENT - DUBAI', 5), ('AGENT - KARACHI', 4), ('AGENT - LAGOS', 3), ('AGENT - SANTOS', 2),
+               ('AGENT - AUCKLAND', 1)),
+    'NETHERLANDS': (('ZIEGLER NETHERLANDS', 1),),
+    'SOUTH_AFRICA': (('ZIEGLER JOHANNESBURG', 49), ('ZIEGLER DURBAN', 2)),
+    'SWITZERLAND': (('ZIEGLER SWITZERLAND', 1),),
+    'CHINA': (('ZIEGLER HONG KONG', 4), ('ZIEGLER SHANGHAI', 1)),
+    'GERMANY': (('ZIEGLER GERMANY', 1),),
+    'MOROCCO': (('ZIEGLER MOROCCO', 1),),
+    'OTHERS': (('OTHERS', 1),),
+    'GREECE': (('ZIEGLER GREECE', 1),),
+}
+FIRST_NAMES = ('ANNE', 'BRUNO', 'CLAIRE', 'DAVID', 'EMMA', 'FRANK', 'GRACE', 'HUGO', 'IRIS', 'JULES',
+               'KEVIN', 'LUCIE', 'MARC', 'NORA', 'OSCAR', 'PAUL', 'ROSE', 'SIMON', 'TOM', 'VERA')
+LAST_NAMES = ('MARTIN', 'BERNARD', 'DUBOIS', 'PEETERS', 'JANSSENS', 'SMITH', 'JONES', 'TAYLOR',
+              'DE VRIES', 'BAKKER', 'NAIDOO', 'MULLER', 'WONG', 'CHAN', 'LEROY', 'FOURNIER')
+CN_OFFICES = (('SHANGHAI', 304), ('SHENZHEN', 304), ('NINGBO', 104), ('HONG KONG', 88), ('TIANJIN', 77),
+              ('QINGDAO', 74), ('XIAMEN', 45), ('CN-MULTI', 3))
+SEA_CONTAINERS = (("40'HQ", 420), ("20'GP", 271), ("40'GP", 68), ("20'GP/40'GP/40'HQ", 66),
+                  ("20'GP/40'HQ", 59), ("20'GP/40'GP", 31), ('40‘HQ', 9), ('20‘GP', 9),
+                  ("40'GP/40'HQ", 6), ("45'HQ", 6))
+COMMODITIES = (('General Cargo', 115), ('Watch Components', 71), ('Printed Circuit Board', 32),
+               ('Furniture', 30), ('Garments', 27), ('Sticker', 24), ('Optical Frames', 18), ('Tools', 18),
+               ('Clock Case Parts', 18), ('Printed Wiring Board', 17), ('Lithium Batteries', 12),
+               ('LED Lights', 11), ('Spare Parts', 10), ('Textile', 9), ('Cosmetics', 6))
+HAZ = (('DG', 9), ('UN3481', 8), ('Class 9/UN3480', 4), ('UN3480', 3), ('UN3480/3481', 3), ('MSDS', 3),
+       ('DG cargo', 3), ('Class 4.1/UN2000', 2))
+AIR_POLS = (('PVG', 2573), ('SZX', 1870), ('HKG', 964), ('XMN', 277), ('CAN', 260), ('PEK', 180),
+            ('CTU', 90), ('NGB', 60))
+SEA_POLS = (('Shanghai', 1332), ('Ningbo', 1282), ('Shenzhen', 1276), ('Qingdao', 679), ('Xingang', 391),
+            ('Yantian', 345), ('Xiamen', 290), ('TAO', 283), ('Shekou', 150), ('Hong Kong', 120))
+RAIL_POLS = (('Chengdu', 5), ('Xian', 4), ('Zhengzhou', 3), ('Yiwu', 2))
+AIR_PODS = (('LHR', 797), ('CDG', 623), ('LYS', 570), ('SXB', 420), ('AMS', 415), ('NTE', 390),
+            ('JNB', 360), ('BRU', 300), ('FRA', 200), ('MRS', 180), ('ZRH', 150), ('CMN', 60))
+SEA_PODS = (('Antwerp', 1446), ('Southampton', 658), ('Fos', 493), ('Rotterdam', 431), ('Le Havre', 395),
+            ('Felixstowe', 300), ('Durban', 280), ('Hamburg', 200), ('Karachi', 180), ('Jebel Ali', 150),
+            ('Casablanca', 70), ('Piraeus', 13))
+RAIL_PODS = (('Duisburg', 5), ('Lodz', 3), ('Malaszewicze', 2))
+POD_COUNTRIES = {
+    'LHR': 'UK', 'CDG': 'FRANCE', 'LYS': 'FRANCE', 'SXB': 'FRANCE', 'AMS': 'NETHERLANDS',
+    'NTE': 'FRANCE', 'JNB': 'SOUTH AFRICA', 'BRU': 'BELGIUM', 'FRA': 'GERMANY', 'MRS': 'FRANCE',
+    'ZRH': 'SWITZERLAND', 'CMN': 'MOROCCO', 'Antwerp': 'BELGIUM', 'Southampton': 'UK', 'Fos': 'FRANCE',
+    'Rotterdam': 'NETHERLANDS', 'Le Havre': 'FRANCE', 'Felixstowe': 'UK', 'Durban': 'SOUTH AFRICA',
+    'Hamburg': 'GERMANY', 'Karachi': 'PAKISTAN', 'Jebel Ali': 'UAE', 'Casablanca': 'MOROCCO',
+    'Piraeus': 'GREECE', 'Duisburg': 'GERMANY', 'Lodz': 'POLAND', 'Malaszewicze': 'POLAND',
+}
+AIR_CATEGORIES = (('Air Freight', 2322), ('Air Freight + Origin Charge & EXW', 2195),
+                  ('Origin Charges & EXW', 1900), ('Origin charges & EXW', 500))
+SEA_CATEGORIES = (('Ocean Freight', 3851), ('Origin Charges & EXW', 2268), ('Origin charges & EXW', 625),
+                  ('Ocean Freight + Origin Charges & EXW', 249), ('Ocean Freight + Origin Charges & EXW + DAP', 52),
+                  ('', 14))
+CARGO_READY_WORDS = (('TBA', 10670), ('Ready', 41), ('Feb', 18), ('Jan', 6), ('End of Nov', 6),
+                     ('Week 42', 5), ('End of Apr', 4), ('Mid June to Mid-July', 4), ('Beginning of July', 4))
+BOOKINGS = (('Rejected', 7800), ('Yes', 5724), ('Pending', 337), ('Invalid', 177), ('invalid', 2))
+REJECTED_REASONS = (('Rate Checking - For indication only', 3480), ('Rate Checking only', 3387),
+                    ('Rate Checking - No feedback from customer', 517), ('Rate Issue-freight', 163),
+                    ('By Other NVOCC', 58), ('Space Issue', 15), ('Others', 18), ('RATE CHECKING ONLY', 12))
+CANCEL_REASONS = (('Cancel Booking', 69), ('Cancel Booking - PO Cancelled', 33), ('Cancel Booking - By Sea', 19))
+REMARKS = (('Waiting feedback', 41), ('E-commerce', 28), ('Space Issue', 9), ('await overseas feedback', 7),
+           ('FOB shipment', 6), ('NON-CORE', 4), ('Confirmed ship by Air', 3), ('waiting feedback', 3),
+           ('Customer asked for transit time', 3), ('Rate valid until end of month', 2))
+ACTUAL_REASONS = (('Rate Checking only', 7), ('no reply', 6), ('Rate Checking - For indication only', 4),
+                  ('main difference were at EXW charges – compared with local forwarder', 1),
+                  ('customer received better offer : $2.19/kg', 1))
+
+class Picker:
+    """按权重抽取，预先计算累积权重"""
+
+    def __init__(self, choices):
+        self.values = [value for value, _ in choices]
+        self.cum = list(itertools.accumulate(weight for _, weight in choices))
+        self.total = self.cum[-1]
+
+    def __call__(self, rng):
+        return self.values[bisect.bisect_right(self.cum, rng.random() * self.total)]
+
+PICK = {name: Picker(choices) for name, choices in (
+    ('product', PRODUCTS), ('status', STATUSES), ('admin', PRICING_ADMINS),
+    ('country', SALES_COUNTRIES), ('cn_office', CN_OFFICES), ('container', SEA_CONTAINERS),
+    ('commodity', COMMODITIES), ('haz', HAZ), ('air_pol', AIR_POLS), ('sea_pol', SEA_POLS),
+    ('rail_pol', RAIL_POLS), ('air_pod', AIR_PODS), ('sea_pod', SEA_PODS), ('rail_pod', RAIL_PODS),
+    ('air_category', AIR_CATEGORIES), ('sea_category', SEA_CATEGORIES),
+    ('ready_word', CARGO_READY_WORDS), ('booking', BOOKINGS), ('rejected', REJECTED_REASONS),
+    ('cancel', CANCEL_REASONS), ('remark', REMARKS), ('actual', ACTUAL_REASONS),
+)}
+OFFICE_PICK = {country: Picker(offices) for country, offices in SALES_OFFICES.items()}
+
+def format_date(day, rng):
+    """导出中的日期格式: 绝大多数为 "2 Jan 2024"，少量为 "02-Jan-24" """
+    if rng.random() < 0.01:
+        return f"{day.day:02d}-{MONTHS[day.month - 1]}-{day.year % 100:02d}"
+    return f"{day.day} {MONTHS[day.month - 1]} {day.year}"
+
+def air_offer(rng):
+    """空运报价自由文本，如 "USD4.50"、"USD3.35 ALL IN" """
+    rate = round(rng.uniform(1.5, 7.5), 2)
+    roll = rng.random()
+    if roll < 0.80:
+        return f"USD{rate:.2f}"
+    if roll < 0.90:
+        return f"USD{rate:.2f} ALL IN"
+    if roll < 0.95:
+        return f"USD {rate:.1f}/kg"
+    if roll < 0.98:
+        return f"RMB{rate * 7:.0f}/KG"
+    return '-'
+
+def ocean_offer(rng, cargo_type):
+    """海运报价自由文本，如 "USD2500"、"USD35/CBM"、"As per tradetech" """
+    roll = rng.random()
+    if cargo_type == 'LCL':
+        rate = rng.randrange(20, 80)
+        return f"USD{rate}/CBM" if roll < 0.7 else f"USD{rate}/W/M"
+    rate = rng.randrange(8, 60) * 100
+    if roll < 0.80:
+        return f"USD{rate}"
+    if roll < 0.88:
+        return f"USD{rate:,}/40HQ"
+    if roll < 0.93:
+        return f"USD{rate} ALL IN"
+    if roll < 0.97:
+        return 'As per tradetech'
+    return '-'
+
+def number_text(value, rng):
+    """数值字段的文本，偶尔为 "-" 或带千分位"""
+    roll = rng.random()
+    if roll < 0.005:
+        return '-'
+    if value >= 1000 and roll < 0.1:
+        return f"{value:,.1f}"
+    return f"{value:.1f}" if roll < 0.97 else f"{value:.3f}"
+
+def generate_rows(count, seed=DEFAULT_SEED, duplicate_rate=0.0001):
+    """生成 count 行数据（列表，顺序同 HEADERS），按询价日期递增"""
+    rng = random.Random(seed)
+    span = (LAST_DAY - FIRST_DAY).days
+    sequence = {}
+    recent = []
+
+    for i in range(count):
+        received = FIRST_DAY + timedelta(days=i * span // max(count, 1))
+        issued = received + timedelta(days=rng.choice((0, 0, 0, 0, 1, 1, 2, 3)))
+
+        # 参考编号: CN + 年月 + 当月序号 + 后缀，导出中偶有重复
+        month = f"{received.year % 100:02d}{received.month:02d}"
+        if recent and rng.random() < duplicate_rate:
+            reference = rng.choice(recent)
+        else:
+            sequence[month] = sequence.get(month, 0) + 1
+            reference = f"CN{month}{sequence[month]:03d}-{'A' if rng.random() < 0.95 else 'R'}"
+            recent = (recent + [reference])[-50:]
+
+        product = PICK['product'](rng)
+        if product in ('AIR', 'SEA-AIR', 'RAIL-AIR'):
+            cargo_type = 'AIR'
+        elif product == 'RAIL':
+            cargo_type = 'RAIL'
+        else:
+            cargo_type = 'FCL' if rng.random() < 0.7 else 'LCL'
+
+        if cargo_type in ('AIR', 'LCL'):
+            volume = number_text(round(rng.lognormvariate(0, 1.2), 2), rng) if rng.random() < 0.9 else ''
+            quantity = number_text(float(round(rng.lognormvariate(5, 1.3))), rng) if rng.random() < 0.95 else ''
+            unit = 'KG'
+            teu = ''
+        else:
+            volume = '' if rng.random() < 0.99 else '-'
+            containers = rng.choice((1, 1, 1, 1, 2, 2, 3, 4, 6, 10))
+            quantity = number_text(float(containers), rng)
+            unit = PICK['container'](rng) if cargo_type == 'FCL' else "40'HQ"
+            teu = str(containers * (1 if unit.startswith('20') else 2))
+
+        if cargo_type == 'AIR':
+            pol, pod = PICK['air_pol'](rng), PICK['air_pod'](rng)
+            category = PICK['air_category'](rng)
+        elif cargo_type == 'RAIL':
+            pol, pod = PICK['rail_pol'](rng), PICK['rail_pod'](rng)
+            category = PICK['sea_category'](rng)
+        else:
+            pol, pod = PICK['sea_pol'](rng), PICK['sea_pod'](rng)
+            category = 'LCL' if cargo_type == 'LCL' and rng.random() < 0.03 else PICK['sea_category'](rng)
+
+        country = PICK['country'](rng)
+        status = PICK['status'](rng)
+        booking = PICK['booking'](rng)
+
+        roll = rng.random()
+        if roll < 0.76:
+            ready = 'TBA'
+        elif roll < 0.77:
+            ready = PICK['ready_word'](rng)
+        else:
+            ready = format_date(received + timedelta(days=rng.randrange(3, 45)), rng)
+
+        quoted = '' if rng.random() < 0.02 else format_date(issued + timedelta(days=rng.randrange(0, 5)), rng)
+        first_ocean = ocean_offer(rng, cargo_type) if cargo_type != 'AIR' and rng.random() < 0.95 else ''
+        first_air = air_offer(rng) if cargo_type == 'AIR' and rng.random() < 0.90 else ''
+        latest_ocean = ocean_offer(rng, cargo_type) if first_ocean and rng.random() < 0.1 else ''
+        latest_air = air_offer(rng) if first_air and rng.random() < 0.03 else ''
+
+        if booking == 'Rejected':
+            rejected = PICK['rejected'](rng)
+        elif status == 'Cancelled':
+            rejected = PICK['cancel'](rng)
+        else:
+            rejected = ''
+
+        yield [
+            format_date(received, rng),
+            format_date(issued, rng),
+            reference,
+            product,
+            status,
+            PICK['admin'](rng),
+            country,
+            OFFICE_PICK[country](rng),
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            PICK['cn_office'](rng),
+            cargo_type,
+            volume,
+            quantity,
+            unit,
+            teu,
+            'TBA' if rng.random() < 0.74 else PICK['commodity'](rng),
+            PICK['haz'](rng) if rng.random() < 0.03 else '',
+            pol,
+            pod,
+            POD_COUNTRIES[pod],
+            'CORE' if rng.random() < 0.83 else 'NON CORE',
+            category,
+            ready,
+            'NOT stackable' if rng.random() < 0.0003 else '',
+            quoted,
+            first_ocean,
+            first_air,
+            latest_ocean,
+            latest_air,
+            booking,
+            PICK['remark'](rng) if rng.random() < 0.07 else '',
+            rejected,
+            PICK['actual'](rng) if rng.random() < 0.002 else '',
+        ]
+
+def write_csv(path, count, seed=DEFAULT_SEED, style='china'):
+    """生成文件，返回写入的数据行数"""
+    if style == 'china':
+        f = open(path, 'w', encoding='cp1252', errors='replace', newline='')
+        padding = [''] * TRAILING_COLUMNS
+    else:
+        f = open(path, 'w', encoding='utf-8-sig', newline='')
+        padding = []
+    with f:
+        writer = csv.writer(f, lineterminator='\r\n')
+        if style == 'china':
+            writer.writerow(list(DESCRIPTION_ROW) + padding)
+        writer.writerow(list(HEADERS) + padding)
+        written = 0
+        for row in generate_rows(count, seed):
+            writer.writerow(row + padding)
+            written += 1
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 合成询价数据生成器')
+    parser.add_argument('output', help='输出 CSV 文件路径')
+    parser.add_argument('--rows', type=int, default=10000, help='数据行数 (默认 10000)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'随机种子 (默认 {DEFAULT_SEED})')
+    parser.add_argument('--style', choices=['china', 'test'], default='china',
+                        help='文件格式: china=China Pricing 导出, test=Test.csv (默认 china)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_csv(args.output, args.rows, args.seed, args.style)
+    print(f"✅ 已生成 {args.output}: {written} 行，耗时 {time.perf_counter() - start:.1f} 秒")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - CSV 表头解析
+
+每个文件只执行一次: 在前几条记录中找出真正的表头行（China Pricing 导出
+在表头上方还有一行字段说明，末尾还有若干空列），把各列模糊匹配到
+enquiry_records 的字段，得到按字段顺序排列的列下标元组。之后每行数据
+只需按下标取值，不再为每行构建 dict。
+"""
+
+import difflib
+import re
+
+# 在前多少条记录中查找表头
+HEADER_SCAN_ROWS = 10
+
+# 至少匹配多少个字段才认为是表头
+MIN_HEADER_FIELDS = 5
+
+# 模糊匹配的相似度阈值
+FUZZY_CUTOFF = 0.85
+
+# enquiry_records 的数据字段（顺序即写入顺序）: (字段名, 类型, 表头别名)
+# 别名为规范化后的文本，见 normalize_header
+FIELDS = (
+    ('enquiry_received_date', 'date', ('enquiry received date',)),
+    ('issue_date', 'date', ('issue date',)),
+    ('reference_number', 'string', ('reference number', 'ref no', 'reference no')),
+    ('product', 'string', ('product',)),
+    ('status', 'string', ('status',)),
+    ('cn_pricing_admin', 'string', ('cn pricing admin',)),
+    ('sales_country', 'string', ('sales country',)),
+    ('sales_office', 'string', ('sales office',)),
+    ('sales_pic', 'string', ('sales pic',)),
+    ('assigned_cn_offices', 'string', ('assigned cn offices', 'assigned cn office')),
+    ('cargo_type', 'string', ('cargo type',)),
+    ('volume_cbm', 'number', ('volume cbm', 'volume')),
+    ('quantity', 'number', ('quantity',)),
+    ('quantity_unit', 'string', ('quantity unit',)),
+    ('quantity_teu', 'number', ('quantity teu',)),
+    ('commodity', 'string', ('commodity',)),
+    ('haz_special_equipment', 'string', ('haz special equipment',)),
+    ('pol', 'string', ('pol',)),
+    ('pod', 'string', ('pod',)),
+    ('pod_country', 'string', ('pod country',)),
+    ('core_non_core', 'string', ('core non core',)),
+    ('category', 'string', ('category',)),
+    ('cargo_ready_date', 'date', ('cargo ready date',)),
+    ('additional_requirement', 'string', ('additional requirement',)),
+    ('first_quotation_sent', 'date', ('1st quotation sent', 'first quotation sent')),
+    ('first_offer_ocean_frg', 'string', ('1st offer ocean frg', 'first offer ocean frg')),
+    ('first_offer_air_frg_kg', 'string', ('1st offer air frg kg', 'first offer air frg kg')),
+    ('latest_offer_ocean_frg', 'string', ('lastest offer ocean frg', 'latest offer ocean frg')),
+    ('latest_offer_air_frg_kg', 'string', ('lastest offer air frg kg', 'latest offer air frg kg')),
+    ('booking_confirmed', 'string', ('booking confirmed',)),
+    ('remark', 'string', ('remark', 'remarks')),
+    ('rejected_reason', 'string', ('rejected reason',)),
+    ('actual_reason', 'string', ('actual reason',)),
+)
+
+FIELD_NAMES = tuple(name for name, _, _ in FIELDS)
+FIELD_KINDS = tuple(kind for _, kind, _ in FIELDS)
+
+# China Pricing 导出的原始表头（含换行），顺序同 FIELDS；导出和测试数据生成共用
+HEADERS = (
+    'Enquiry Received Date', 'Issue Date', 'Reference Number', 'Product',
+    'Status\n(New/Quoted )', 'CN Pricing Admin', 'Sales Country', ' Sales office', 'Sales PIC',
+    'Assigned CN Offices', 'Cargo Type', 'Volume (CBM)', 'Quantity', 'Quantity\n(Unit)',
+    'Quantity\n(TEU)', 'Commodity', 'Haz, Special Equipment \n(if relevant)', 'POL', 'POD',
+    'POD Country', 'CORE / NON CORE', 'Category \n', 'Cargo Ready Date', 'Additional Requirement',
+    '1st Quotation Sent', '1st Offer:\nOcean Frg', '1st Offer:\nAir Frg/KG',
+    'Lastest Offer:\nOcean Frg', 'Lastest Offer:\nAir Frg/KG',
+    'Booking Confirmed \n(Yes/Rejected/Pending)', 'Remark', 'Rejected Reason',
+    'Actual Reason \n(to be discussed)',
+)
+
+# 导出日期中的月份缩写（"2 Jan 2024"）
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# 别名 -> 字段名
+ALIASES = {alias: name for name, _, aliases in FIELDS for alias in aliases}
+
+NON_WORD = re.compile(r'[^a-z0-9]+')
+
+def normalize_header(text):
+    """规范化表头: 去 BOM、转小写、标点和换行折叠为单个空格"""
+    return NON_WORD.sub(' ', text.replace('\ufeff', '').lower()).strip()
+
+def match_field(header):
+    """
+    把一个表头匹配到字段名，匹配不到返回 None
+
+    依次尝试: 完全相同 → 以别名开头的最长别名（如 "status new quoted"
+    匹配 "status"，"quantity unit" 优先于 "quantity"）→ difflib 相似度。
+    """
+    text = normalize_header(header)
+    if not text:
+        return None
+    if text in ALIASES:
+        return ALIASES[text]
+
+    best = None
+    for alias in ALIASES:
+        if text.startswith(alias + ' ') and (best is None or len(alias) > len(best)):
+            best = alias
+    if best:
+        return ALIASES[best]
+
+    close = difflib.get_close_matches(text, ALIASES, n=1, cutoff=FUZZY_CUTOFF)
+    return ALIASES[close[0]] if close else None
+
+class HeaderMapping:
+    """一个文件的表头解析结果"""
+
+    def __init__(self, header, header_row=1):
+        self.header = header
+        self.header_row = header_row
+        self.columns = {}
+        self.duplicates = []
+        self.unmatched = []
+
+        for idx, text in enumerate(header):
+            field = match_field(text)
+            if field is None:
+                if text.strip():
+                    self.unmatched.append(text)
+            elif field in self.columns:
+                # 同一字段出现多次时取最左边的一列
+                self.duplicates.append(text)
+            else:
+                self.columns[field] = idx
+
+        # 按 FIELDS 顺序排列的列下标，缺失的字段为 None
+        self.indices = tuple(self.columns.get(name) for name in FIELD_NAMES)
+
+    @property
+    def missing(self):
+        return [name for name in FIELD_NAMES if name not in self.columns]
+
+    def print_report(self):
+        """打印匹配结果"""
+        print(f"   ✅ 表头位于第 {self.header_row} 行，匹配 {len(self.columns)}/{len(FIELD_NAMES)} 个字段")
+        for text in self.unmatched:
+            print(f"   ⚠️  未识别的列: {text!r}")
+        for text in self.duplicates:
+            print(f"   ⚠️  重复的列（已忽略）: {text!r}")
+        for name in self.missing:
+            print(f"   ⚠️  缺少字段 {name}，将写入 NULL")
+
+def resolve_header(rows):
+    """
+    在前 HEADER_SCAN_ROWS 条记录中找出表头
+
+    rows 为 csv.reader 产出的记录（列表）。返回 (HeaderMapping, 表头在
+    rows 中的序号，从 0 开始)。找不到包含 reference_number 的表头时
+    抛出 ValueError。
+    """
+    best = None
+    for pos, row in enumerate(rows):
+        if pos >= HEADER_SCAN_ROWS:
+            break
+        mapping = HeaderMapping(row, pos + 1)
+        if best is None or len(mapping.columns) > len(best[0].columns):
+            best = (mapping, pos)
+
+    if best is None or len(best[0].columns) < MIN_HEADER_FIELDS or 'reference_number' not in best[0].columns:
+        raise ValueError(f"前 {HEADER_SCAN_ROWS} 行中找不到有效的表头（需要包含 Reference Number 列）")
+    return best
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 时间有序主键
+
+uuid4 是完全随机的，InnoDB 聚簇索引按主键排序存放整行，随机主键让每次
+插入都落在 B 树中间，频繁分裂页、换入换出缓冲池。这里生成 UUIDv7:
+前 48 位为毫秒时间戳，同一毫秒内用 12 位计数器递增，其余为随机位。
+新记录总是追加在索引末尾。
+
+主键以 BINARY(16) 存储（schema.sql），比 VARCHAR(36) 小一半多，每个
+二级索引都会携带主键，一起变小。对外（API、导出）仍使用标准的
+36 位字符串形式。尚未执行迁移 003 的表仍为 VARCHAR(36)，导入时按表
+结构自动选择写入形式。
+"""
+
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+def uuid7():
+    """生成一个 UUIDv7，同一进程内严格递增"""
+    global _last_ms, _counter
+    rand = int.from_bytes(os.urandom(10), 'big')
+    with _lock:
+        ms = max(time.time_ns() // 1_000_000, _last_ms)
+        if ms == _last_ms:
+            _counter += 1
+            if _counter > 0xFFF:
+                # 计数器用尽，借用下一毫秒
+                ms += 1
+                _counter = rand >> 69
+        else:
+            # 每毫秒从随机位置开始计数，留出一半空间递增
+            _counter = rand >> 69
+        _last_ms = ms
+        counter = _counter
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | (rand & ((1 << 62) - 1))
+    return uuid.UUID(int=value)
+
+def text_id():
+    """VARCHAR(36) 主键的写入形式"""
+    return str(uuid7())
+
+def binary_id():
+    """BINARY(16) 主键的写入形式"""
+    return uuid7().bytes
+
+ID_FACTORIES = {
+    'text': text_id,
+    'binary': binary_id,
+}
+
+def id_format(cursor, table):
+    """
+    根据表结构判断主键的写入形式
+
+    id 列为 BINARY / VARBINARY 时返回 'binary'，否则返回 'text'。
+    """
+    cursor.execute(
+        "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'id'",
+        (table,)
+    )
+    row = cursor.fetchone()
+    return 'binary' if row and row[0].lower() in ('binary', 'varbinary') else 'text'
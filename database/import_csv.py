@@ -2,180 +2,125 @@
 """
 LogiTrack Pro - CSV 数据导入脚本
 将 Test.csv 数据导入到 MySQL 数据库
+
+表头解析和逐行转换与 import_csv_pymysql.py 共用（build_record），
+报价提取列和内容哈希一并写入。
 """
 
-import csv
+import argparse
 import mysql.connector
-from datetime import datetime
-import uuid
+import time
 import sys
 
-# MySQL 连接配置
-DB_CONFIG = {
-    'host': 'localhost',
-    'port': 3306,
-    'user': 'root',
-    'password': 'ldf123',  # 请修改为您的 MySQL 密码
-    'database': 'logitrack',
-    'charset': 'utf8mb4'
-}
+from date_parser import DATE_PARSER
+from ids import ID_FACTORIES, id_format
+from import_csv_pymysql import INSERT_COLUMNS, CsvSource, build_record, compile_plan
+from instrumentation import ProgressReporter
+import db
 
-def parse_date(date_str):
-    """解析日期字符串"""
-    if not date_str or date_str.strip() == '':
-        return None
-    try:
-        # 尝试解析 d-Mon-yy 格式 (如 2-Jan-24)
-        return datetime.strptime(date_str.strip(), '%d-%b-%y').strftime('%Y-%m-%d')
-    except ValueError:
-        try:
-            # 尝试其他格式
-            return datetime.strptime(date_str.strip(), '%Y-%m-%d').strftime('%Y-%m-%d')
-        except ValueError:
-            return None
+# MySQL 连接配置（db.ini / LOGITRACK_DB_* 环境变量，见 db.py）
+DB_CONFIG = db.CONFIG
 
-def parse_decimal(value_str):
-    """解析数字，移除逗号"""
-    if not value_str or value_str.strip() == '':
-        return None
+# 每批写入的行数（一次 executemany + 一次 commit）
+DEFAULT_BATCH_SIZE = 1000
+
+def write_batch(conn, cursor, insert_sql, batch):
+    """
+    写入一批记录并提交一次
+
+    batch 为 [(参考编号, 参数元组), ...]。整批失败时回滚并逐行重试，
+    保证失败统计仍然精确到行。返回 (成功数, 失败数)。
+    """
     try:
-        # 移除逗号和空格
-        cleaned = value_str.replace(',', '').strip()
-        return float(cleaned)
-    except ValueError:
-        return None
+        # mysql.connector 会把 INSERT ... VALUES 的 executemany 改写为多行 VALUES
+        cursor.executemany(insert_sql, [data for _, data in batch])
+        conn.commit()
+        return len(batch), 0
+    except mysql.connector.Error as e:
+        conn.rollback()
+        print(f"⚠️  批量写入失败，改为逐行重试: {e}")
 
-def clean_string(value):
-    """清理字符串"""
-    if not value or value.strip() == '':
-        return None
-    return value.strip()
+    imported_count = 0
+    error_count = 0
+    for reference, data in batch:
+        try:
+            cursor.execute(insert_sql, data)
+            imported_count += 1
+        except mysql.connector.Error as e:
+            error_count += 1
+            print(f"❌ 导入失败 {reference or 'Unknown'}: {e}")
+    conn.commit()
+    return imported_count, error_count
 
-def import_csv_to_mysql(csv_file_path):
-    """导入 CSV 文件到 MySQL"""
+def import_csv_to_mysql(csv_file_path, batch_size=DEFAULT_BATCH_SIZE):
+    """导入 CSV 文件到 MySQL，每 batch_size 行批量写入并提交一次"""
     
     print(f"开始导入 CSV 文件: {csv_file_path}")
     
     # 连接数据库
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = db.connect('mysql-connector')
         cursor = conn.cursor()
         print("✅ 成功连接到 MySQL 数据库")
+        # 时间有序主键，写入形式跟随 id 列类型（BINARY(16) 或 VARCHAR(36)）
+        new_id = ID_FACTORIES[id_format(cursor, 'enquiry_records')]
     except mysql.connector.Error as e:
         print(f"❌ 数据库连接失败: {e}")
         sys.exit(1)
     
-    # 准备 SQL 插入语句
-    insert_sql = """
-    INSERT INTO enquiry_records (
-        id,
-        enquiry_received_date,
-        issue_date,
-        reference_number,
-        product,
-        status,
-        cn_pricing_admin,
-        sales_country,
-        sales_office,
-        sales_pic,
-        assigned_cn_offices,
-        cargo_type,
-        volume_cbm,
-        quantity,
-        quantity_unit,
-        quantity_teu,
-        commodity,
-        haz_special_equipment,
-        pol,
-        pod,
-        pod_country,
-        core_non_core,
-        category,
-        cargo_ready_date,
-        additional_requirement,
-        first_quotation_sent,
-        first_offer_ocean_frg,
-        first_offer_air_frg_kg,
-        latest_offer_ocean_frg,
-        latest_offer_air_frg_kg,
-        booking_confirmed,
-        remark,
-        rejected_reason,
-        actual_reason
-    ) VALUES (
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s
+    # 准备 SQL 插入语句（列与 build_record 返回的元组一致）
+    insert_sql = (
+        f"INSERT INTO enquiry_records ({', '.join(INSERT_COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})"
     )
-    """
     
     # 读取并导入 CSV
     imported_count = 0
     error_count = 0
+    batch = []
+    reporter = ProgressReporter()
+    start = time.perf_counter()
+    
+    def flush():
+        nonlocal imported_count, error_count
+        ok, bad = write_batch(conn, cursor, insert_sql, batch)
+        imported_count += ok
+        error_count += bad
+        elapsed = time.perf_counter() - start
+        rate = (imported_count + error_count) / elapsed if elapsed > 0 else 0
+        reporter.update(f"✅ 已处理 {imported_count + error_count} 条 (本批 {len(batch)} 条, {rate:,.0f} 条/秒)")
+        batch.clear()
     
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            csv_reader = csv.DictReader(csvfile)
+        # 表头按名称模糊匹配（见 header_mapping.py），字段说明行和尾部空列自动跳过
+        source = CsvSource(csv_file_path)
+        plan = compile_plan(source.mapping.indices, new_id)
+        
+        for line, row in enumerate(source, 1):
+            try:
+                data = build_record(row, plan)
+                batch.append((data[3], data))
+            except Exception as e:
+                error_count += 1
+                print(f"❌ 导入失败 (第 {line} 行): {e}")
+                continue
             
-            for row in csv_reader:
-                try:
-                    # 生成 UUID
-                    record_id = str(uuid.uuid4())
-                    
-                    # 准备数据
-                    data = (
-                        record_id,
-                        parse_date(row.get('Enquiry Received Date')),
-                        parse_date(row.get('Issue Date')),
-                        clean_string(row.get('Reference Number')),
-                        clean_string(row.get('Product')),
-                        clean_string(row.get('Status\n(New/Quoted )')),
-                        clean_string(row.get('CN Pricing Admin')),
-                        clean_string(row.get('Sales Country')),
-                        clean_string(row.get(' Sales office')),
-                        clean_string(row.get('Sales PIC')),
-                        clean_string(row.get('Assigned CN Offices')),
-                        clean_string(row.get('Cargo Type')),
-                        parse_decimal(row.get('Volume (CBM)')),
-                        parse_decimal(row.get('Quantity')),
-                        clean_string(row.get('Quantity\n(Unit)')),
-                        parse_decimal(row.get('Quantity\n(TEU)')),
-                        clean_string(row.get('Commodity')),
-                        clean_string(row.get('Haz, Special Equipment \n(if relevant)')),
-                        clean_string(row.get('POL')),
-                        clean_string(row.get('POD')),
-                        clean_string(row.get('POD Country')),
-                        clean_string(row.get('CORE / NON CORE (formula locked, please just copy and past to the next record)')),
-                        clean_string(row.get('Category : \n1. Freight\n2. Freight + Origin Charge/EXW\n3. Freight + Origin Charge/EXW+Dest. Charges\n4. Origin Charges/EXW\n5. LCL')),
-                        parse_date(row.get('Cargo Ready Date')),
-                        clean_string(row.get('Additional Requirement')),
-                        parse_date(row.get('1st Quotation Sent')),
-                        clean_string(row.get('1st Offer:\nOcean Frg')),
-                        clean_string(row.get('1st Offer:\nAir Frg/KG')),
-                        clean_string(row.get('Lastest Offer:\nOcean Frg')),
-                        clean_string(row.get('Lastest Offer:\nAir Frg/KG')),
-                        clean_string(row.get('Booking Confirmed \n(Yes/Rejected/Pending)')),
-                        clean_string(row.get('Remark')),
-                        clean_string(row.get('Rejected Reason')),
-                        clean_string(row.get('Actual Reason \n(to be discussed)'))
-                    )
-                    
-                    # 执行插入
-                    cursor.execute(insert_sql, data)
-                    imported_count += 1
-                    print(f"✅ 已导入: {row.get('Reference Number')}")
-                    
-                except Exception as e:
-                    error_count += 1
-                    print(f"❌ 导入失败 {row.get('Reference Number', 'Unknown')}: {e}")
+            # 凑满一批后写入
+            if len(batch) >= batch_size:
+                flush()
         
-        # 提交事务
-        conn.commit()
+        if batch:
+            flush()
+        reporter.finish()
+        
+        elapsed = time.perf_counter() - start
+        rate = (imported_count + error_count) / elapsed if elapsed > 0 else 0
+        DATE_PARSER.print_report()
         print(f"\n{'='*50}")
         print(f"导入完成！")
         print(f"成功: {imported_count} 条")
         print(f"失败: {error_count} 条")
+        print(f"耗时: {elapsed:.2f} 秒 ({rate:,.0f} 条/秒, 每批 {batch_size} 条)")
         print(f"{'='*50}")
         
     except FileNotFoundError:
@@ -189,13 +134,20 @@ def import_csv_to_mysql(csv_file_path):
         print("数据库连接已关闭")
 
 if __name__ == '__main__':
-    csv_file = '/workspaces/LogiTrack-/Test.csv'
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - CSV 数据导入工具')
+    parser.add_argument('csv_file', nargs='?', default='/workspaces/LogiTrack-/Test.csv', help='CSV 文件路径')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'每批写入行数 (默认 {DEFAULT_BATCH_SIZE})')
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error('--batch-size 必须大于 0')
+    csv_file = args.csv_file
     
     print("=" * 50)
     print("LogiTrack Pro - CSV 数据导入工具")
     print("=" * 50)
     print(f"数据库: {DB_CONFIG['database']}")
-    print(f"主机: {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    print(f"主机: {db.resolved_host()}:{DB_CONFIG['port']}")
     print(f"用户: {DB_CONFIG['user']}")
     print("=" * 50)
     print("\n⚠️  请确保:")
@@ -206,4 +158,4 @@ if __name__ == '__main__':
     
     input("按 Enter 键开始导入...")
     
-    import_csv_to_mysql(csv_file)
+    import_csv_to_mysql(csv_file, args.batch_size)
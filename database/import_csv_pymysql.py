@@ -1,35 +1,132 @@
 #!/usr/bin/env python3
 """
 使用 pymysql 将 CSV 数据导入到 MySQL 数据库
+
+用法:
+    python import_csv_pymysql.py [csv_file] [--batch-size N] [--incremental] [--resume]
+                                 [--shadow [--min-ratio R]] [--defer-indexes]
+                                 [--mode batch|load-data|parallel|async]
+                                 [--workers N] [--writers N]
+                                 [--metrics-json PATH] [--profile cpu|memory]
+                                 [--reject-file PATH] [--no-validate] [--dictionary]
+
+导入模式:
+    batch      批量 INSERT（默认）
+    load-data  清洗后写入临时 TSV，再用一条 LOAD DATA LOCAL INFILE 装载
+               （服务器需开启 local_infile）
+    parallel   按记录边界切块，多进程并行解析转换，多个写入连接并发写入
+    async      在事件循环中解析，多个 aiomysql 连接流水线并发写入、按文件
+               顺序提交，适合高延迟的远程 MySQL（需 pip install aiomysql，
+               见 async_import.py）
+
+--incremental 不清空表，按 reference_number 和内容哈希只写入新增和变化的记录
+--resume      batch 模式的断点与每批数据同一事务提交，中断后从最后提交的批次继续
+--shadow      写入影子表后原子切换，重载期间线上表不受影响（回滚: shadow_table.py --rollback）
+--defer-indexes
+              装载前删除二级索引并关闭外键检查，装载后一次性重建索引
+              （中断后可用 bulk_load.py --rebuild 补建）
+--dictionary  导入字典编码布局 enquiry_records_compact（低基数列存为查找表编号，
+              先运行 dictionary.py --create，见 dictionary.py）
+
+建立了仪表盘汇总表（rollups.py --create）时，batch / parallel / 增量模式把每批
+的增量与数据在同一事务中累加到汇总表，其余模式导入后整体重算。
+
+被数据库拒绝的行（重复键、超长、无效数值……）由二分重试隔离出来，连同
+源行号和错误写入 --reject-file（默认 import_rejects.csv，见 quarantine.py）。
+写入前先按表约束（DESCRIBE 推导的长度、精度、非空、唯一）在内存里预校验，
+不通过的行同样进入拒绝文件，写入路径只处理干净的行（见 validation.py）。
+
+每次运行结束时打印各阶段耗时并写出 JSON 统计（见 instrumentation.py）。
 """
 
+import argparse
+import bisect
+import collections
+import concurrent.futures
 import csv
+import functools
+import hashlib
+import io
+import queue
+import threading
+import zlib
 import pymysql
-from datetime import datetime
-import uuid
+import time
+import re
 import sys
 import os
+import tempfile
+
+from date_parser import DATE_PARSER
+from dictionary import COMPACT_TABLE, DICTIONARY, FLAT_VIEW, encoded_columns
+from checkpoint import ImportCheckpoint
+from header_mapping import FIELD_KINDS, FIELD_NAMES, HEADER_SCAN_ROWS, resolve_header
+from instrumentation import CONVERTER_SAMPLE_EVERY, METRICS, Profiler, ProgressReporter
+from offer_parser import OFFER_COLUMNS, OFFER_PARSER
+from quarantine import DEFAULT_REJECT_FILE, REJECTS, bisect_write
+from rollups import ROLLUPS
+from schema_tools import TABLE_NAME
+from validation import build_validator
+import bulk_load
+import db
+import ids
+import rollups
+import shadow_table
+
+# 每批写入的行数（一次 executemany + 一次 commit）
+DEFAULT_BATCH_SIZE = 1000
+
+# 并行模式下每个解析任务读取的字节数（按记录边界对齐）
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+# 写入列，顺序与 build_record 返回的元组一致（INSERT 与 LOAD DATA 共用）
+# 数据字段之后是从报价文本提取的币种 / 金额 / 计费单位（见 offer_parser.py）
+# created_at / updated_at 不由导入程序写入，取数据库的 CURRENT_TIMESTAMP，
+# 与增量同步（cdc_sync.py）按数据库时钟推进的水位一致
+INSERT_COLUMNS = ('id',) + FIELD_NAMES + OFFER_COLUMNS + ('content_hash',)
+
+def table_columns(table):
+    """写入列；字典编码表写入编码列（见 dictionary.py），顺序不变"""
+    return encoded_columns(INSERT_COLUMNS) if table == COMPACT_TABLE else INSERT_COLUMNS
+
+def build_insert_sql(table=TABLE_NAME):
+    """插入语句（pymysql 的 executemany 会把它改写为多行 VALUES）"""
+    return (
+        f"INSERT INTO {table} ({', '.join(table_columns(table))}) "
+        f"VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})"
+    )
+
+def build_load_data_sql(table=TABLE_NAME, binary_id=False):
+    """
+    LOAD DATA 语句，读取 write_tsv 生成的临时文件（\\N 表示 NULL）
+
+    BINARY(16) 主键在 TSV 中写为十六进制，装载时 UNHEX 还原。
+    """
+    columns = table_columns(table)
+    if binary_id:
+        columns = ('@id',) + columns[1:]
+    return (
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+        "CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+        "LINES TERMINATED BY '\\n' "
+        f"({', '.join(columns)})"
+        + (" SET id = UNHEX(@id)" if binary_id else "")
+    )
 
-# 数据库配置
-MYSQL_HOST = '127.0.0.1'
-MYSQL_USER = 'root'
-MYSQL_PASSWORD = 'ldf123'
-MYSQL_DB = 'logitrack'
+INSERT_SQL = build_insert_sql()
+LOAD_DATA_SQL = build_load_data_sql()
+
+# 增量导入用的 upsert：按 reference_number 唯一键更新，保留原 id 和 created_at，
+# updated_at 取数据库当前时间
+UPSERT_SQL = INSERT_SQL + " ON DUPLICATE KEY UPDATE " + ", ".join(
+    [f"{col} = VALUES({col})" for col in INSERT_COLUMNS if col not in ('id', 'reference_number')]
+    + ["updated_at = CURRENT_TIMESTAMP"]
+)
 
 def parse_date(date_str):
-    """解析日期字符串"""
-    if not date_str or date_str.strip() == '':
-        return None
-    try:
-        # 尝试解析 d-Mon-yy 格式 (如 2-Jan-24)
-        return datetime.strptime(date_str.strip(), '%d-%b-%y').strftime('%Y-%m-%d')
-    except ValueError:
-        try:
-            # 尝试其他格式
-            return datetime.strptime(date_str.strip(), '%Y-%m-%d').strftime('%Y-%m-%d')
-        except ValueError:
-            print(f"   ⚠️  无法解析日期: {date_str}")
-            return None
+    """解析日期字符串（多格式、带缓存，见 date_parser.py）"""
+    return DATE_PARSER.parse(date_str)
 
 def parse_number(num_str):
     """解析数值字符串，移除逗号"""
@@ -40,7 +137,7 @@ def parse_number(num_str):
         cleaned = num_str.replace(',', '').strip()
         return float(cleaned)
     except ValueError:
-        print(f"   ⚠️  无法解析数值: {num_str}")
+        # 按字段计入解析失败统计（见 build_record），不逐个打印
         return None
 
 def clean_string(s):
@@ -49,169 +146,973 @@ def clean_string(s):
         return None
     return s.strip()
 
-print("\n" + "="*60)
-print("LogiTrack Pro - CSV 数据导入")
-print("="*60)
-
-# 检查 CSV 文件
-csv_file = '../Test.csv'
-if not os.path.exists(csv_file):
-    print(f"\n❌ 找不到文件: {csv_file}")
-    sys.exit(1)
-
-print(f"\n✅ 找到 CSV 文件: {csv_file}")
-
-try:
-    # 连接数据库
-    print(f"\n1. 连接到数据库 {MYSQL_DB}...")
-    conn = pymysql.connect(
-        host=MYSQL_HOST,
-        user=MYSQL_USER,
-        password=MYSQL_PASSWORD,
-        database=MYSQL_DB,
-        charset='utf8mb4'
+def decode_line(raw):
+    """按 UTF-8 解码，失败时按 Excel 常用的 cp1252 解码（China Pricing 导出）"""
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+def decode_chunk(chunk):
+    """解码一个按行对齐的字节块"""
+    try:
+        return chunk.decode('utf-8')
+    except UnicodeDecodeError:
+        return ''.join(decode_line(raw) for raw in chunk.splitlines(keepends=True))
+
+# 字段类型 -> 转换函数
+CONVERTERS = {
+    'date': parse_date,
+    'number': parse_number,
+    'string': clean_string,
+}
+
+def compile_plan(indices, new_id=ids.text_id):
+    """
+    根据表头解析得到的列下标生成转换计划
+
+    返回 (主键生成函数, 转换表, 失败检查表)。转换表为按字段顺序排列的
+    (转换函数, 列下标) 元组，缺失的列下标为 None；失败检查表为需要统计
+    解析失败的日期 / 数值字段的 (字段位置, 列下标)。主键生成函数见
+    ids.py，按目标表 id 列的类型选择。
+    """
+    converters = tuple((CONVERTERS[kind], idx) for kind, idx in zip(FIELD_KINDS, indices))
+    checks = tuple((pos, idx) for pos, (kind, idx) in enumerate(zip(FIELD_KINDS, indices))
+                   if kind != 'string' and idx is not None)
+    return new_id, converters, checks
+
+def content_hash(fields):
+    """数据字段的 MD5，用于增量导入判断记录是否变化"""
+    text = '\x1f'.join('\x00' if v is None else str(v) for v in fields)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def build_record(values, plan, sample=False):
+    """
+    将一行 CSV（列表）按转换计划转换为 INSERT_SQL 的参数元组
+
+    报价列由原文提取，内容哈希只覆盖数据字段。sample 为 True 时分别计时
+    每个转换函数（见 instrumentation.py）。
+    """
+    new_id, converters, checks = plan
+
+    width = len(values)
+    if sample:
+        fields = METRICS.convert_sampled(values, converters)
+    else:
+        fields = [convert(values[idx]) if idx is not None and idx < width else None
+                  for convert, idx in converters]
+    # 非空但解析为 NULL 的日期 / 数值计入对应字段的失败次数
+    for pos, idx in checks:
+        if fields[pos] is None and idx < width and values[idx].strip():
+            METRICS.parse_failures[FIELD_NAMES[pos]] += 1
+    return (
+        new_id(),
+        *fields,
+        *OFFER_PARSER.extract(fields),
+        content_hash(fields),
     )
-    print("   ✅ 连接成功")
-    
+
+def quarantine_rows(rejected):
+    """把 bisect_write 隔离出的坏行计入失败并写入拒绝文件，返回坏行数"""
+    for idx, data, error in rejected:
+        METRICS.row_failed(idx, f"{data[3]} {error}")
+        REJECTS.add(idx, data[3], error, DICTIONARY.decode(data)[1:1 + len(FIELD_NAMES)])
+    return len(rejected)
+
+def written_rows(batch, rejected):
+    """二分重试后实际写入的行（batch 去掉 rejected 中的行号）"""
+    lines = {idx for idx, _, _ in rejected}
+    return [(idx, data) for idx, data in batch if idx not in lines]
+
+def write_batch(conn, cursor, batch, checkpoint=None, sql=INSERT_SQL):
+    """
+    写入一批记录并提交一次
+
+    batch 为 [(行号, 参数元组), ...]。整批失败时回滚并二分重试，
+    只把坏行隔离到拒绝文件，其余行仍成批写入（见 quarantine.py）。checkpoint 不为空时，断点在同一事务中
+    一起提交。汇总表启用时，这一批的增量也在同一事务中累加（见 rollups.py）。
+    返回 (成功数, 失败数)。
+    """
+    try:
+        with METRICS.stage('write'):
+            cursor.executemany(sql, [data for _, data in batch])
+        ROLLUPS.apply(cursor, batch)
+        if checkpoint:
+            with METRICS.stage('checkpoint'):
+                checkpoint.record(cursor, batch[-1][0], len(batch), 0)
+        with METRICS.stage('commit'):
+            conn.commit()
+        return len(batch), 0
+    except pymysql.Error as e:
+        # 连接断开时整批重试由调用方负责，不做二分
+        if db.is_disconnect(e):
+            raise
+        conn.rollback()
+
+    with METRICS.stage('write_retry'):
+        _, imported, rejected = bisect_write(cursor, sql, batch)
+    ROLLUPS.apply(cursor, written_rows(batch, rejected))
+    failed = quarantine_rows(rejected)
+    if checkpoint:
+        checkpoint.record(cursor, batch[-1][0], imported, failed)
+    with METRICS.stage('commit'):
+        conn.commit()
+    return imported, failed
+
+class CsvSource:
+    """
+    流式读取 CSV，逐行产出列表
+
+    打开时先在前几条记录中解析表头（见 header_mapping.py），之后从表头
+    结束处开始产出数据行。以二进制方式读取并统计已读字节数，因此无需先
+    把整个文件读入内存也能按文件大小显示进度。
+    """
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+        self.size = os.path.getsize(csv_file)
+        self.bytes_read = 0
+
+        # 记下每条记录结束处的字节偏移，以便定位表头之后的数据
+        offsets = []
+        rows = []
+        with open(csv_file, 'rb') as f:
+            reader = csv.reader(self._lines(f))
+            for row in reader:
+                rows.append(row)
+                offsets.append(self.bytes_read)
+                if len(rows) >= HEADER_SCAN_ROWS:
+                    break
+        self.mapping, pos = resolve_header(rows)
+        self.header_end = offsets[pos]
+        self.plan = compile_plan(self.mapping.indices)
+
+    def _lines(self, f):
+        for raw in f:
+            self.bytes_read += len(raw)
+            yield decode_line(raw)
+
+    def __iter__(self):
+        return self.iter_from(self.header_end)
+
+    def iter_from(self, offset):
+        """从某条记录的起始字节偏移开始产出数据行（断点续传用）"""
+        with open(self.csv_file, 'rb') as f:
+            f.seek(offset)
+            self.bytes_read = offset
+            for row in csv.reader(self._lines(f)):
+                # 与 DictReader 一致，跳过空行
+                if row:
+                    yield row
+
+    def progress(self):
+        """已读取的百分比"""
+        if not self.size:
+            return '100.0%'
+        return f"{self.bytes_read / self.size:.1%}"
+
+def transform_records(rows, plan, stats, start=1):
+    """
+    逐行转换为 (源行号, 参数元组)，源行号为表头之后的数据行序号
+
+    转换失败的行不会产出，只计入 stats['failed'] 和 stats['failed_lines']。
+    读取和转换分别计入 METRICS 的 read / transform 阶段。
+    """
+    perf = time.perf_counter
+    thread_time = time.thread_time
+    wall = cpu = 0.0
+    calls = 0
+    try:
+        for idx, row in enumerate(METRICS.timed(rows, 'read'), start):
+            w, c = perf(), thread_time()
+            try:
+                data = build_record(row, plan, idx % CONVERTER_SAMPLE_EVERY == 0)
+            except Exception as e:
+                data = None
+                stats['failed'] += 1
+                stats['failed_lines'].append(idx)
+                METRICS.row_failed(idx, e)
+            wall += perf() - w
+            cpu += thread_time() - c
+            calls += 1
+            if data is not None:
+                yield idx, data
+    finally:
+        METRICS.add('transform', wall, cpu, calls)
+
+def validate_records(records, validator, stats):
+    """
+    写入前的内存预校验（见 validation.py），只产出满足表约束的记录
+
+    不通过的行与转换失败的行一样计入 stats['failed'] 和
+    stats['failed_lines']，并写入拒绝文件。validator 为 None 时原样产出。
+    """
+    if validator is None:
+        yield from records
+        return
+    perf = time.perf_counter
+    thread_time = time.thread_time
+    wall = cpu = 0.0
+    calls = 0
+    try:
+        for idx, data in records:
+            w, c = perf(), thread_time()
+            problems = validator.check(data)
+            wall += perf() - w
+            cpu += thread_time() - c
+            calls += 1
+            if problems:
+                message = '; '.join(problems)
+                stats['failed'] += 1
+                stats['failed_lines'].append(idx)
+                METRICS.row_failed(idx, f"{data[3]} {message}")
+                REJECTS.add(idx, data[3], ('validation', message), data[1:1 + len(FIELD_NAMES)])
+                continue
+            yield idx, data
+    finally:
+        METRICS.add('validate', wall, cpu, calls)
+
+def batched(items, batch_size):
+    """把可迭代对象切成最多 batch_size 条的列表"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def new_stats():
+    """导入统计"""
+    return {'imported': 0, 'failed': 0, 'failed_lines': [],
+            'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+def tsv_field(value):
+    """将一个字段值转换为 LOAD DATA 可识别的 TSV 文本"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bytes):
+        return value.hex()
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+def write_tsv(out, records):
+    """清洗后的 (源行号, 参数元组) 逐行写入 TSV，返回写入行数"""
+    written = 0
+    for _, data in records:
+        out.write('\t'.join(tsv_field(v) for v in data))
+        out.write('\n')
+        written += 1
+    return written
+
+def source_line(tsv_line, failed_lines):
+    """TSV 行号映射回源行号（跳过转换失败、未写入 TSV 的行）"""
+    idx = tsv_line
+    while True:
+        mapped = tsv_line + bisect.bisect_right(failed_lines, idx)
+        if mapped == idx:
+            return idx
+        idx = mapped
+
+def load_data_import(conn, rows, plan, progress=None, table=TABLE_NAME, validator=None):
+    """
+    LOAD DATA 模式导入
+
+    清洗后的记录流式写入临时 TSV，再用一条 LOAD DATA LOCAL INFILE 装载。
+    LOCAL 模式下重复键、数据截断等问题会变成警告而不是中断，
+    这里用 SHOW WARNINGS 把警告映射回源行号，被跳过的行计为失败。
+    validator 不为空时先做内存预校验，不通过的行不写入 TSV。
+    返回 (成功数, 失败数, 耗时秒数)。
+    """
     cursor = conn.cursor()
-    
-    # 检查表是否存在
-    cursor.execute("SHOW TABLES LIKE 'enquiry_records'")
-    if not cursor.fetchone():
-        print("\n❌ 表 'enquiry_records' 不存在")
-        print("   请先运行: python create_table_pymysql.py")
-        sys.exit(1)
-    
-    print("   ✅ 表 'enquiry_records' 存在")
-    
-    # 清空现有数据
-    print("\n2. 清空现有数据...")
-    cursor.execute("DELETE FROM enquiry_records")
-    conn.commit()
-    print("   ✅ 数据已清空")
-    
-    # 读取 CSV
-    print(f"\n3. 读取 CSV 文件...")
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        csv_reader = csv.DictReader(f)
-        records = list(csv_reader)
-    
-    print(f"   ✅ 读取到 {len(records)} 条记录")
-    
-    # 准备插入语句
-    insert_sql = """
-    INSERT INTO enquiry_records (
-        id, enquiry_received_date, issue_date, reference_number, product, status,
-        cn_pricing_admin, sales_country, sales_office, sales_pic, assigned_cn_offices,
-        cargo_type, volume_cbm, quantity, quantity_unit, quantity_teu, commodity,
-        haz_special_equipment, pol, pod, pod_country, core_non_core, category,
-        cargo_ready_date, additional_requirement, first_quotation_sent,
-        first_offer_ocean_frg, first_offer_air_frg_kg, latest_offer_ocean_frg,
-        latest_offer_air_frg_kg, booking_confirmed, remark, rejected_reason,
-        actual_reason, created_at, updated_at
-    ) VALUES (
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-    )
+    stats = new_stats()
+    start = time.perf_counter()
+
+    fd, tsv_path = tempfile.mkstemp(prefix='enquiry_records_', suffix='.tsv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as out:
+            records = validate_records(transform_records(rows, plan, stats), validator, stats)
+            written = write_tsv(out, DICTIONARY.encode_records(records))
+        print(f"   ✅ 已写入临时文件 {tsv_path} ({written} 条)")
+
+        # 主键形式跟随转换计划（BINARY(16) 主键在 TSV 中为十六进制）
+        binary_id = plan[0] is ids.binary_id
+        with METRICS.stage('load_data'):
+            loaded = cursor.execute(build_load_data_sql(table, binary_id), (tsv_path,))
+        # 仅返回前 max_error_count 条（默认 1024）
+        cursor.execute("SHOW WARNINGS")
+        warnings = cursor.fetchall()
+        conn.commit()
+    except pymysql.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        os.remove(tsv_path)
+
+    for level, code, message in warnings:
+        match = re.search(r'at row (\d+)', message)
+        if match and 0 < int(match.group(1)) <= written:
+            line = source_line(int(match.group(1)), stats['failed_lines'])
+            METRICS.row_failed(line, message)
+            REJECTS.add(line, None, (code, message))
+        else:
+            print(f"   ⚠️  {level} {code}: {message}")
+
+    # 重复键等被跳过的行没有写入
+    failed = stats['failed'] + written - loaded
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed > 0 else 0
+    suffix = f" ({progress()})" if progress else ''
+    print(f"   ✅ [{loaded}/{written}] LOAD DATA 完成，{rate:,.0f} 条/秒{suffix}")
+    return loaded, failed, elapsed
+
+def import_records(conn, rows, plan, batch_size=DEFAULT_BATCH_SIZE, progress=None,
+                   checkpoint=None, start_line=1, table=TABLE_NAME, validator=None):
     """
-    
-    # 导入数据
-    print("\n4. 导入数据到数据库...")
-    imported = 0
-    failed = 0
-    
-    for idx, row in enumerate(records, 1):
-        try:
-            # 生成 UUID
-            record_id = str(uuid.uuid4())
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 准备数据
-            data = (
-                record_id,
-                parse_date(row.get('Enquiry Received Date', '')),
-                parse_date(row.get('Issue Date', '')),
-                clean_string(row.get('Reference Number', '')),
-                clean_string(row.get('Product', '')),
-                clean_string(row.get('Status\n(New/Quoted )', '')),
-                clean_string(row.get('CN Pricing Admin', '')),
-                clean_string(row.get('Sales Country', '')),
-                clean_string(row.get(' Sales office', '')),
-                clean_string(row.get('Sales PIC', '')),
-                clean_string(row.get('Assigned CN Offices', '')),
-                clean_string(row.get('Cargo Type', '')),
-                parse_number(row.get('Volume (CBM)', '')),
-                parse_number(row.get('Quantity', '')),
-                clean_string(row.get('Quantity\n(Unit)', '')),
-                parse_number(row.get('Quantity\n(TEU)', '')),
-                clean_string(row.get('Commodity', '')),
-                clean_string(row.get('Haz, Special Equipment \n(if relevant)', '')),
-                clean_string(row.get('POL', '')),
-                clean_string(row.get('POD', '')),
-                clean_string(row.get('POD Country', '')),
-                clean_string(row.get('CORE / NON CORE (formula locked, please just copy and past to the next record)', '')),
-                clean_string(row.get('Category : \n1. Freight\n2. Freight + Origin Charge/EXW\n3. Freight + Origin Charge/EXW+Dest. Charges\n4. Origin Charges/EXW\n5. LCL', '')),
-                parse_date(row.get('Cargo Ready Date', '')),
-                clean_string(row.get('Additional Requirement', '')),
-                parse_date(row.get('1st Quotation Sent', '')),
-                clean_string(row.get('1st Offer:\nOcean Frg', '')),
-                clean_string(row.get('1st Offer:\nAir Frg/KG', '')),
-                clean_string(row.get('Lastest Offer:\nOcean Frg', '')),
-                clean_string(row.get('Lastest Offer:\nAir Frg/KG', '')),
-                clean_string(row.get('Booking Confirmed \n(Yes/Rejected/Pending)', '')),
-                clean_string(row.get('Remark', '')),
-                clean_string(row.get('Rejected Reason', '')),
-                clean_string(row.get('Actual Reason \n(to be discussed)', '')),
-                now,
-                now
-            )
-            
-            cursor.execute(insert_sql, data)
-            imported += 1
-            print(f"   ✅ [{idx}/{len(records)}] {row.get('Reference Number', 'N/A')}")
-            
-        except Exception as e:
-            failed += 1
-            print(f"   ❌ [{idx}/{len(records)}] 失败: {e}")
+    按批次流式导入记录
+
+    读取 → 转换 → 分批 → 写入 全部是生成器串联，内存占用只与批大小有关。
+    每批执行一次 executemany 并提交，同时打印吞吐量；progress 为可选的
+    回调，返回读取进度文本；checkpoint 为 ImportCheckpoint，每批的断点与
+    数据一起提交；start_line 为第一行的源行号（续传时大于 1）；table 为
+    目标表（影子表重载时为 enquiry_records_new）；validator 为写入前的
+    预校验（见 validation.py）。
+    返回 (成功数, 失败数, 耗时秒数)。
+    """
+    cursor = conn.cursor()
+    stats = new_stats()
+    sql = build_insert_sql(table)
+    reporter = ProgressReporter()
+    start = time.perf_counter()
+
+    records = validate_records(transform_records(rows, plan, stats, start_line), validator, stats)
+    for batch in batched(DICTIONARY.encode_records(records), batch_size):
+        ok, bad = write_batch(conn, cursor, batch, checkpoint, sql)
+        stats['imported'] += ok
+        stats['failed'] += bad
+        elapsed = time.perf_counter() - start
+        processed = stats['imported'] + stats['failed']
+        rate = processed / elapsed if elapsed > 0 else 0
+        suffix = f" ({progress()})" if progress else ''
+        reporter.update(f"   ✅ [{processed}] 本批 {len(batch)} 条，{rate:,.0f} 条/秒{suffix}")
+
+    reporter.finish()
+    cursor.close()
+    return stats['imported'], stats['failed'], time.perf_counter() - start
+
+def fetch_hashes(conn):
+    """一次性读取现有记录的 reference_number -> content_hash（服务器端游标流式读取）"""
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        with METRICS.stage('fetch_hashes'):
+            cursor.execute("SELECT reference_number, content_hash FROM enquiry_records")
+            return {reference: digest for reference, digest in cursor}
+    finally:
+        cursor.close()
+
+def select_changed(records, known, stats):
+    """
+    过滤掉内容未变化的记录
+
+    known 为 fetch_hashes 的结果，处理过程中同步更新，因此文件内重复的
+    参考编号以最后一次出现为准。
+    """
+    for idx, data in records:
+        reference, digest = data[3], data[-1]
+        if known.get(reference, '') == digest:
+            stats['unchanged'] += 1
             continue
-    
-    # 提交事务
-    conn.commit()
-    
-    # 验证导入
-    print(f"\n5. 验证导入结果...")
-    cursor.execute("SELECT COUNT(*) FROM enquiry_records")
-    count = cursor.fetchone()[0]
-    print(f"   ✅ 数据库中共有 {count} 条记录")
-    
-    # 显示部分数据
-    if count > 0:
-        cursor.execute("SELECT reference_number, status, product, sales_country FROM enquiry_records LIMIT 5")
-        sample_records = cursor.fetchall()
-        print(f"\n   前 {len(sample_records)} 条记录:")
-        for r in sample_records:
-            print(f"      - {r[0]}: {r[1]} ({r[2]}) - {r[3]}")
-    
+        known[reference] = digest
+        yield idx, data
+
+def write_upsert_batch(conn, cursor, batch, checkpoint=None):
+    """
+    以 upsert 写入一批新增或已变化的记录并提交一次
+
+    ON DUPLICATE KEY UPDATE 的影响行数: 新增 1，更新 2，据此区分新增和更新。
+    整批失败时回滚并二分重试，坏行隔离到拒绝文件。checkpoint 不为空时，断点在同一事务中
+    一起提交。汇总表启用时，写入前读取被更新记录的旧值，累加 新值 - 旧值。
+    返回 (新增数, 更新数, 失败数)。
+    """
+    old = ROLLUPS.snapshot(cursor, batch)
+    try:
+        with METRICS.stage('write'):
+            affected = cursor.executemany(UPSERT_SQL, [data for _, data in batch])
+        ROLLUPS.apply(cursor, batch, old)
+        if checkpoint:
+            with METRICS.stage('checkpoint'):
+                checkpoint.record(cursor, batch[-1][0], len(batch), 0)
+        with METRICS.stage('commit'):
+            conn.commit()
+        updated = affected - len(batch)
+        return len(batch) - updated, updated, 0
+    except pymysql.Error as e:
+        # 连接断开时整批重试由调用方负责，不做二分
+        if db.is_disconnect(e):
+            raise
+        conn.rollback()
+
+    with METRICS.stage('write_retry'):
+        affected, written, rejected = bisect_write(cursor, UPSERT_SQL, batch)
+    ROLLUPS.apply(cursor, written_rows(batch, rejected), old)
+    failed = quarantine_rows(rejected)
+    updated = affected - written
+    inserted = written - updated
+    if checkpoint:
+        checkpoint.record(cursor, batch[-1][0], inserted + updated, failed)
+    with METRICS.stage('commit'):
+        conn.commit()
+    return inserted, updated, failed
+
+def incremental_import(conn, rows, plan, batch_size=DEFAULT_BATCH_SIZE, progress=None,
+                       checkpoint=None, start_line=1, validator=None):
+    """
+    增量导入
+
+    不清空表：先取出现有记录的内容哈希，内容未变的行直接跳过，新增和
+    变化的行以 upsert 分批写入（保留原 id，前端持有的 id 不会失效）。
+    耗时与变化量成正比。validator 为不检查重复的预校验（upsert 允许
+    参考编号已存在）。返回 (写入数, 失败数, 耗时秒数)。
+    """
+    start = time.perf_counter()
+    known = fetch_hashes(conn)
+    print(f"   ✅ 已读取 {len(known)} 条现有记录的内容哈希")
+
+    cursor = conn.cursor()
+    stats = new_stats()
+    records = validate_records(transform_records(rows, plan, stats, start_line), validator, stats)
+    changed = select_changed(records, known, stats)
+    reporter = ProgressReporter()
+    for batch in batched(changed, batch_size):
+        inserted, updated, bad = write_upsert_batch(conn, cursor, batch, checkpoint)
+        stats['inserted'] += inserted
+        stats['updated'] += updated
+        stats['failed'] += bad
+        elapsed = time.perf_counter() - start
+        suffix = f" ({progress()})" if progress else ''
+        reporter.update(f"   ✅ 新增 {stats['inserted']}，更新 {stats['updated']}，"
+                        f"未变 {stats['unchanged']}，{elapsed:.1f} 秒{suffix}")
+    reporter.finish()
     cursor.close()
-    conn.close()
-    
+
+    print(f"   ✅ 增量导入完成: 新增 {stats['inserted']} 条，更新 {stats['updated']} 条，"
+          f"未变 {stats['unchanged']} 条，失败 {stats['failed']} 条")
+    return stats['inserted'] + stats['updated'], stats['failed'], time.perf_counter() - start
+
+def connect(local_infile=False, bulk=False):
+    """
+    建立一个导入用的数据库连接（关闭自动提交，配置见 db.py）
+
+    bulk 为 True 时使用批量装载会话设置。
+    """
+    conn = db.connect('pymysql', autocommit=False, local_infile=local_infile)
+    if bulk:
+        bulk_load.apply_bulk_session(conn)
+    return conn
+
+def record_boundary(buf):
+    """
+    返回 buf 中最后一个记录边界（换行之后的位置），没有则返回 -1
+
+    buf 从记录边界开始，所以引号计数为偶数的换行才是真正的记录结尾，
+    引号内的换行（多行表头、自由文本）不会被切开。
+    """
+    quotes = buf.count(b'"')
+    end = len(buf)
+    pos = buf.rfind(b'\n')
+    while pos >= 0:
+        quotes -= buf.count(b'"', pos, end)
+        end = pos
+        if quotes % 2 == 0:
+            return pos + 1
+        pos = buf.rfind(b'\n', 0, pos)
+    return -1
+
+def iter_chunks(csv_file, offset, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """从 offset 开始把文件切成按记录对齐的字节块"""
+    with open(csv_file, 'rb') as f:
+        f.seek(offset)
+        pending = b''
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            buf = pending + block
+            cut = record_boundary(buf)
+            if cut < 0:
+                pending = buf
+                continue
+            yield buf[:cut]
+            pending = buf[cut:]
+        if pending:
+            yield pending
+
+def transform_chunk(plan, chunk):
+    """
+    在子进程中解析并转换一个字节块
+
+    plan 为 compile_plan 生成的转换计划。返回 (记录列表, 错误列表, 记录数,
+    字节数, 日期格式统计, 报价提取统计, 阶段统计)。记录为 (块内序号, 参数元组)，错误为
+    (块内序号, 错误信息)；块内序号从 1 开始，由主进程换算成源行号。
+    与流式读取一致，空行不计入序号。
+    """
+    records = []
+    errors = []
+    idx = 0
+    with METRICS.stage('decode'):
+        text = decode_chunk(chunk)
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    for values in METRICS.timed(csv.reader(io.StringIO(text, newline='')), 'read'):
+        if not values:
+            continue
+        idx += 1
+        try:
+            records.append((idx, build_record(values, plan, idx % CONVERTER_SAMPLE_EVERY == 0)))
+        except Exception as e:
+            errors.append((idx, str(e)))
+    read = METRICS.stages.get('read', (0.0, 0.0, 0))
+    # 转换耗时 = 循环总耗时 - 读取耗时
+    METRICS.add('transform', time.perf_counter() - wall - read[0], time.thread_time() - cpu - read[1], idx)
+    return records, errors, idx, len(chunk), DATE_PARSER.pop_counts(), OFFER_PARSER.pop_counts(), METRICS.pop()
+
+def reset_worker_counts():
+    """进程池初始化: fork 出的子进程会继承主进程的统计，先清零"""
+    DATE_PARSER.pop_counts()
+    OFFER_PARSER.pop_counts()
+    METRICS.pop()
+
+def ordered_results(executor, tasks, window):
+    """
+    按提交顺序产出进程池结果
+
+    最多同时挂起 window 个任务，读取速度因此受限于处理速度，
+    不会把整个文件预读进内存。
+    """
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(executor.submit(*task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def write_pooled_batch(pool, batch, sql=INSERT_SQL):
+    """
+    从连接池取一个连接写入一批
+
+    连接在写入中途断开时（服务器重启、超时……）连接池丢弃它，换一个新
+    连接重试一次；未提交的批次已随断开回滚，不会重复写入。
+    """
+    for attempt in (1, 2):
+        try:
+            with pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    return write_batch(conn, cursor, batch, sql=sql)
+                finally:
+                    cursor.close()
+        except pymysql.Error as e:
+            if attempt == 2 or not db.is_disconnect(e):
+                raise
+            print(f"   ⚠️  写入连接断开，换新连接重试本批: {e}")
+
+def writer_loop(pool, jobs, stats, lock, sql=INSERT_SQL):
+    """
+    写入线程：按到达顺序写入自己队列中的批次
+
+    某一批无法写入时整批计为失败并继续取下一批，避免主线程阻塞在队列上。
+    """
+    for batch in iter(jobs.get, None):
+        try:
+            ok, bad = write_pooled_batch(pool, batch, sql)
+        except pymysql.Error as e:
+            print(f"   ❌ 第 {batch[0][0]}-{batch[-1][0]} 行所在批次写入失败: {e}")
+            ok, bad = 0, len(batch)
+        with lock:
+            stats['imported'] += ok
+            stats['failed'] += bad
+
+def parallel_import(source, batch_size=DEFAULT_BATCH_SIZE, workers=None, writers=1,
+                    connect_fn=connect, table=TABLE_NAME, validator=None):
+    """
+    多进程并行导入
+
+    主进程把文件切成按记录对齐的块，进程池并行解析、转换，结果按块顺序
+    取回并换算成全局源行号。转换后的记录按 reference_number 的哈希分配给
+    writers 个写入线程，同一个参考编号总是进入同一个写入线程并保持文件
+    顺序，因此重复编号的处理结果与单线程导入一致。写入线程共用一个预热
+    过的连接池（connect_fn 建立连接，见 db.py），每批取用一个连接。
+    预校验需要全局的参考编号集合，在主进程分发前进行。
+    返回 (成功数, 失败数, 耗时秒数)。
+    """
+    workers = workers or os.cpu_count() or 1
+    offset = source.header_end
+    size = source.size
+    stats = new_stats()
+    # 主线程的预校验统计，写入线程并发更新 stats，结束后再合并
+    checked = new_stats()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    pool = db.ConnectionPool(connect_fn, size=writers, driver=db.get_driver('pymysql'))
+    with METRICS.stage('pool_warmup'):
+        pool.warm_up()
+
+    # 有界队列：写入跟不上时阻塞主线程，形成背压
+    queues = [queue.Queue(maxsize=4) for _ in range(writers)]
+    threads = [
+        threading.Thread(target=writer_loop, args=(pool, q, stats, lock, build_insert_sql(table)),
+                         daemon=True)
+        for q in queues
+    ]
+    for t in threads:
+        t.start()
+
+    pending = [[] for _ in range(writers)]
+    base = 0
+    bytes_done = offset
+    reporter = ProgressReporter()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                    initializer=reset_worker_counts) as executor:
+            tasks = ((transform_chunk, source.plan, chunk) for chunk in iter_chunks(source.csv_file, offset))
+            results = ordered_results(executor, tasks, workers * 2)
+            for result in METRICS.timed(results, 'parse_wait'):
+                records, errors, count, nbytes, date_counts, offer_counts, metrics = result
+                DATE_PARSER.merge_counts(date_counts)
+                OFFER_PARSER.merge_counts(offer_counts)
+                METRICS.merge(metrics)
+                for idx, message in errors:
+                    with lock:
+                        stats['failed'] += 1
+                    METRICS.row_failed(base + idx, message)
+
+                records = ((base + idx, data) for idx, data in records)
+                records = validate_records(records, validator, checked)
+                for idx, data in DICTIONARY.encode_records(records):
+                    slot = zlib.crc32((data[3] or '').encode('utf-8')) % writers
+                    pending[slot].append((idx, data))
+                    if len(pending[slot]) >= batch_size:
+                        # 队列满时阻塞，即等待写入线程的时间
+                        with METRICS.stage('queue_wait'):
+                            queues[slot].put(pending[slot])
+                        pending[slot] = []
+
+                base += count
+                bytes_done += nbytes
+                elapsed = time.perf_counter() - start
+                rate = base / elapsed if elapsed > 0 else 0
+                percent = bytes_done / size if size else 1
+                reporter.update(f"   ✅ [{base}] 已解析，{rate:,.0f} 条/秒 ({percent:.1%})")
+        reporter.finish()
+    finally:
+        for slot, q in enumerate(queues):
+            if pending[slot]:
+                q.put(pending[slot])
+            q.put(None)
+        for t in threads:
+            t.join()
+        pool.close()
+
+    return stats['imported'], stats['failed'] + checked['failed'], time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - CSV 数据导入')
+    parser.add_argument('csv_file', nargs='?', default='../Test.csv', help='CSV 文件路径')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'每批写入行数 (默认 {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--mode', choices=['batch', 'load-data', 'parallel', 'async'], default='batch',
+                        help='导入模式: batch=批量 INSERT, load-data=LOAD DATA LOCAL INFILE, parallel=多进程解析, '
+                             'async=asyncio 并发写入')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量导入: 不清空表，按 reference_number 只写入新增和变化的记录')
+    parser.add_argument('--resume', action='store_true',
+                        help='从上次中断处继续导入（batch 模式，断点保存在 import_checkpoints 表）')
+    parser.add_argument('--shadow', action='store_true',
+                        help='零停机重载: 写入影子表，建索引、校验后用 RENAME TABLE 原子切换')
+    parser.add_argument('--min-ratio', type=float, default=shadow_table.DEFAULT_MIN_RATIO,
+                        help='--shadow 时新数据行数至少为线上的比例，否则取消切换 (默认 0.5)')
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help='全量导入前删除二级索引、关闭外键检查，导入后按 schema.sql 重建索引')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='parallel 模式的解析进程数 (默认 CPU 核数)')
+    parser.add_argument('--writers', type=int, default=1,
+                        help='parallel / async 模式的写入连接数 (默认 1)')
+    parser.add_argument('--metrics-json', default='import_metrics.json',
+                        help='运行结束时写出各阶段耗时等统计的 JSON 文件 (默认 import_metrics.json)')
+    parser.add_argument('--profile', choices=['cpu', 'memory'], default=None,
+                        help='导入期间打开 cProfile (cpu) 或 tracemalloc (memory)')
+    parser.add_argument('--reject-file', default=DEFAULT_REJECT_FILE,
+                        help=f'被数据库拒绝的行写入的 CSV 文件 (默认 {DEFAULT_REJECT_FILE})')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='跳过写入前的表约束预校验')
+    parser.add_argument('--dictionary', action='store_true',
+                        help=f'导入字典编码布局 {COMPACT_TABLE}（先运行 dictionary.py --create）')
+    args = parser.parse_args()
+
+    if args.batch_size < 1:
+        parser.error('--batch-size 必须大于 0')
+    if args.writers < 1 or (args.workers is not None and args.workers < 1):
+        parser.error('--workers / --writers 必须大于 0')
+    if (args.incremental or args.resume) and args.mode != 'batch':
+        parser.error('--incremental / --resume 仅支持 batch 模式')
+    if args.mode == 'async' and args.no_validate:
+        parser.error('async 模式按文件顺序提交，依赖预校验剔除重复的参考编号，不能与 --no-validate 同时使用')
+    if args.shadow and (args.incremental or args.resume):
+        parser.error('--shadow 是全量重载，不能与 --incremental / --resume 同时使用')
+    if args.defer_indexes and args.incremental:
+        parser.error('--defer-indexes 用于全量导入，不能与 --incremental 同时使用')
+    if args.dictionary and (args.incremental or args.shadow or args.defer_indexes):
+        parser.error('--dictionary 不能与 --incremental / --shadow / --defer-indexes 同时使用')
+
+    # 影子表本身就是先装载后建索引，同样使用批量会话设置
+    bulk = args.defer_indexes or args.shadow
+
     print("\n" + "="*60)
-    print(f"✅ 数据导入完成！")
-    print(f"   成功: {imported} 条")
-    print(f"   失败: {failed} 条")
+    print("LogiTrack Pro - CSV 数据导入")
     print("="*60)
-    
-    if imported > 0:
-        print("\n🚀 下一步:")
-        print("   1. 启动后端: cd ../backend && ./start-backend.sh")
-        print("   2. 启动前端: cd ../logitrack-pro && npm run dev")
-        print("   3. 访问系统: http://localhost:3000")
-    
-except pymysql.Error as err:
-    print(f"\n❌ 数据库错误: {err}")
-    sys.exit(1)
-except Exception as e:
-    print(f"\n❌ 发生错误: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+
+    # 检查 CSV 文件
+    csv_file = args.csv_file
+    if not os.path.exists(csv_file):
+        print(f"\n❌ 找不到文件: {csv_file}")
+        sys.exit(1)
+
+    print(f"\n✅ 找到 CSV 文件: {csv_file}")
+
+    # 先解析表头，表头无效时不会清空现有数据
+    try:
+        source = CsvSource(csv_file)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    try:
+        # 连接数据库
+        print(f"\n1. 连接到数据库 {db.CONFIG['database']} ({db.resolved_host()}:{db.CONFIG['port']})...")
+        conn = connect(local_infile=(args.mode == 'load-data'), bulk=bulk)
+        print("   ✅ 连接成功")
+
+        cursor = conn.cursor()
+
+        # 检查表是否存在（影子表重载会自行建表）
+        target = COMPACT_TABLE if args.dictionary else TABLE_NAME
+        cursor.execute("SHOW TABLES LIKE %s", (target,))
+        if not cursor.fetchone() and not args.shadow:
+            print(f"\n❌ 表 '{target}' 不存在")
+            print("   请先运行: python dictionary.py --create" if args.dictionary
+                  else "   请先运行: python create_table_pymysql.py")
+            sys.exit(1)
+
+        print(f"   ✅ 表 '{target}' 存在")
+
+        # 汇总表（rollups.py --create 之后）: batch / parallel / 增量模式每批累加；
+        # LOAD DATA、async 和影子表重载不逐批累加，导入后整体重算
+        rebuild_rollups = False
+        if not args.dictionary and ROLLUPS.open(conn):
+            if args.shadow or args.mode in ('load-data', 'async'):
+                ROLLUPS.close()
+                rebuild_rollups = True
+            print(f"   ✅ 汇总表: {'导入后重算' if rebuild_rollups else '逐批累加'}")
+        maintain_rollups = ROLLUPS.enabled
+
+        # batch 模式每批记录断点，可用 --resume 续传
+        checkpoint = None
+        rows = source
+        start_line = 1
+        table = target
+        if args.mode == 'batch' and not args.shadow:
+            checkpoint = ImportCheckpoint(conn, source, 'incremental' if args.incremental else 'batch')
+
+        # 清空现有数据（增量模式和续传时保留，影子表重载不动线上表）
+        if args.shadow:
+            print("\n2. 准备影子表...")
+            deferred_indexes = shadow_table.prepare_shadow(conn)
+            table = shadow_table.SHADOW_TABLE
+        elif args.resume:
+            try:
+                offset, last_line = checkpoint.resume()
+            except ValueError as e:
+                print(f"\n❌ {e}")
+                sys.exit(1)
+            rows = source.iter_from(offset)
+            start_line = last_line + 1
+            print(f"\n2. 从断点续传: 第 {last_line} 行之后继续 (已写入 {checkpoint.imported} 条)")
+        elif args.incremental:
+            checkpoint.reset()
+            conn.commit()
+            print("\n2. 增量模式，保留现有数据")
+        else:
+            print("\n2. 清空现有数据...")
+            if checkpoint:
+                checkpoint.reset()
+            cursor.execute(f"DELETE FROM {table}")
+            ROLLUPS.clear(cursor)
+            conn.commit()
+            print("   ✅ 数据已清空")
+        if args.defer_indexes and not args.shadow:
+            bulk_load.drop_secondary_indexes(conn, table)
+
+        # 流式读取 CSV（边读边写，不把整个文件读入内存）
+        print(f"\n3. 解析 CSV 表头...")
+        print(f"   ✅ 文件大小 {source.size / 1024 / 1024:.1f} MB")
+        source.mapping.print_report()
+
+        # 按目标表 id 列的类型生成时间有序主键（迁移 003 之前为 VARCHAR(36)）
+        id_kind = ids.id_format(cursor, table)
+        source.plan = compile_plan(source.mapping.indices, ids.ID_FACTORIES[id_kind])
+        print(f"   ✅ 主键: UUIDv7 ({'BINARY(16)' if id_kind == 'binary' else 'VARCHAR(36)'})")
+
+        # 预校验规则来自目标表的 DESCRIBE；增量导入是 upsert，不检查参考编号重复
+        validator = None
+        if not args.no_validate:
+            with METRICS.stage('fetch_existing'):
+                validator = build_validator(conn, table, check_unique=not args.incremental)
+            print(f"   ✅ 预校验: {validator.rule_count} 条规则 (来自 {validator.source})")
+
+        # 字典编码: 一次性载入查找表，新值经单独的自动提交连接写入
+        if args.dictionary:
+            known = DICTIONARY.open(db.connect('pymysql', autocommit=True))
+            print(f"   ✅ 字典编码: 已载入 {known} 个取值")
+
+        # 导入数据（续传时拒绝文件接着上次写）
+        REJECTS.open(args.reject_file, FIELD_NAMES, append=args.resume)
+        profiler = Profiler(args.profile)
+        profiler.start()
+        if args.mode == 'load-data':
+            print(f"\n4. 导入数据到数据库 (LOAD DATA LOCAL INFILE)...")
+            imported, failed, elapsed = load_data_import(conn, source, source.plan, progress=source.progress, table=table,
+                                                        validator=validator)
+        elif args.mode == 'parallel':
+            workers = args.workers or os.cpu_count() or 1
+            print(f"\n4. 导入数据到数据库 ({workers} 个解析进程, {args.writers} 个写入连接, 每批 {args.batch_size} 条)...")
+            connect_fn = functools.partial(connect, bulk=bulk)
+            imported, failed, elapsed = parallel_import(source, args.batch_size, workers, args.writers,
+                                                        connect_fn=connect_fn, table=table, validator=validator)
+        elif args.mode == 'async':
+            from async_import import async_import
+            print(f"\n4. 导入数据到数据库 (asyncio, {args.writers} 个写入连接, 每批 {args.batch_size} 条)...")
+            imported, failed, elapsed = async_import(source, source.plan, args.batch_size, args.writers, table=table,
+                                                     validator=validator, progress=source.progress, bulk=bulk)
+        elif args.incremental:
+            print(f"\n4. 增量导入到数据库 (每批 {args.batch_size} 条)...")
+            imported, failed, elapsed = incremental_import(conn, rows, source.plan, args.batch_size, progress=source.progress,
+                                                          checkpoint=checkpoint, start_line=start_line,
+                                                          validator=validator)
+        else:
+            print(f"\n4. 导入数据到数据库 (每批 {args.batch_size} 条)...")
+            imported, failed, elapsed = import_records(conn, rows, source.plan, args.batch_size, progress=source.progress,
+                                                      checkpoint=checkpoint, start_line=start_line, table=table,
+                                                      validator=validator)
+        profile_summary = profiler.stop()
+        REJECTS.close()
+        DICTIONARY.print_report()
+        DICTIONARY.close()
+
+        if checkpoint:
+            checkpoint.finish()
+
+        # 延后的索引一次性重建，并核对索引与 schema.sql 一致
+        if bulk:
+            print(f"\n4b. 重建索引...")
+            with METRICS.stage('build_indexes'):
+                if args.shadow:
+                    bulk_load.build_indexes(conn, deferred_indexes, table)
+                else:
+                    bulk_load.rebuild_indexes(conn, table)
+            bulk_load.print_index_report(bulk_load.verify_indexes(conn, table), table)
+
+        # 影子表: 校验 → 原子切换
+        if args.shadow:
+            try:
+                shadow_table.validate_shadow(conn, imported, args.min_ratio)
+            except ValueError as e:
+                print(f"\n❌ {e}")
+                print(f"   线上数据未改动，影子表 {shadow_table.SHADOW_TABLE} 已保留")
+                sys.exit(1)
+            shadow_table.swap_tables(conn)
+
+        if rebuild_rollups:
+            with METRICS.stage('rollups'):
+                counts = rollups.rebuild(conn)
+            print(f"\n4c. 汇总表已重算 ({sum(counts.values())} 行)")
+        ROLLUPS.close()
+
+        # 验证导入（字典编码布局经视图还原原值）
+        print(f"\n5. 验证导入结果...")
+        report_table = FLAT_VIEW if args.dictionary else TABLE_NAME
+        cursor.execute(f"SELECT COUNT(*) FROM {report_table}")
+        count = cursor.fetchone()[0]
+        print(f"   ✅ 数据库中共有 {count} 条记录")
+
+        # 显示部分数据
+        if count > 0:
+            cursor.execute(f"SELECT reference_number, status, product, sales_country FROM {report_table} LIMIT 5")
+            sample_records = cursor.fetchall()
+            print(f"\n   前 {len(sample_records)} 条记录:")
+            for r in sample_records:
+                print(f"      - {r[0]}: {r[1]} ({r[2]}) - {r[3]}")
+
+        cursor.close()
+        conn.close()
+
+        DATE_PARSER.print_report()
+        OFFER_PARSER.print_report()
+        REJECTS.print_report()
+
+        summary = METRICS.summary(
+            csv_file=os.path.abspath(csv_file),
+            mode=args.mode,
+            incremental=args.incremental,
+            resume=args.resume,
+            shadow=args.shadow,
+            batch_size=args.batch_size,
+            validate=not args.no_validate,
+            dictionary=args.dictionary,
+            rollups='rebuild' if rebuild_rollups else 'incremental' if maintain_rollups else None,
+            workers=workers if args.mode == 'parallel' else None,
+            writers=args.writers if args.mode in ('parallel', 'async') else None,
+            rows=imported + failed,
+            imported=imported,
+            failed=failed,
+            rejected=REJECTS.count,
+            reject_file=os.path.abspath(args.reject_file) if REJECTS.count else None,
+            elapsed=round(elapsed, 3),
+            date_formats=dict(DATE_PARSER.format_counts),
+            offer_currencies=dict(OFFER_PARSER.currency_counts),
+            profile=profile_summary,
+        )
+        METRICS.print_report(summary)
+        METRICS.write_json(args.metrics_json, summary)
+
+        rate = (imported + failed) / elapsed if elapsed > 0 else 0
+        print("\n" + "="*60)
+        print(f"✅ 数据导入完成！")
+        print(f"   成功: {imported} 条")
+        print(f"   失败: {failed} 条")
+        print(f"   耗时: {elapsed:.2f} 秒 ({rate:,.0f} 条/秒, 模式 {args.mode})")
+        print("="*60)
+
+        if imported > 0:
+            print("\n🚀 下一步:")
+            print("   1. 启动后端: cd ../backend && ./start-backend.sh")
+            print("   2. 启动前端: cd ../logitrack-pro && npm run dev")
+            print("   3. 访问系统: http://localhost:3000")
+
+    except pymysql.Error as err:
+        print(f"\n❌ 数据库错误: {err}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n❌ 发生错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
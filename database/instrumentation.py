@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 导入耗时统计
+
+记录导入流水线各阶段（读取、转换、写入、提交……）的墙钟时间和 CPU
+时间、各字段的解析失败次数、内存峰值，运行结束时打印汇总并写出 JSON。
+
+字段转换每隔 CONVERTER_SAMPLE_EVERY 行抽样一次，分别计时 parse_date /
+parse_number / clean_string，按抽样比例估算全量耗时，避免给每个字段都
+加计时。--profile cpu|memory 可另外打开 cProfile / tracemalloc。
+
+并行模式下子进程用 pop() 取出自己的统计随结果返回，主进程 merge()；
+写入线程各自计时，CPU 时间取各线程自己的 thread_time。
+"""
+
+import collections
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 进度最多每隔多少秒打印一次
+PROGRESS_INTERVAL = 1.0
+
+# 逐行的失败信息最多打印多少条，其余只计数（行号样例写入 JSON）
+MAX_FAILURE_PRINTS = 20
+MAX_FAILURE_SAMPLES = 100
+
+# 每隔多少行对字段转换分类型计时一次
+CONVERTER_SAMPLE_EVERY = 64
+
+_END = object()
+
+def peak_rss_mb(who=None):
+    """进程的内存峰值 (MB)，不支持时返回 None"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # Linux 单位为 KB，macOS 为字节
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss / scale, 1)
+
+class ImportMetrics:
+    """一次导入的各阶段统计"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.failures = 0
+        self.failure_samples = []
+        # 阶段 -> [墙钟秒, CPU 秒, 次数]
+        self.stages = {}
+        # 字段名 -> 非空但解析为 NULL 的次数
+        self.parse_failures = collections.Counter()
+        # 转换函数名 -> [抽样耗时秒, 调用次数]
+        self.converters = {}
+        self.sampled_rows = 0
+
+    def add(self, name, wall, cpu, calls=1):
+        with self.lock:
+            entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += calls
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """计时一个阶段"""
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def timed(self, iterable, name):
+        """逐项计时地迭代，只统计取下一项的时间（不含调用方处理的时间）"""
+        perf = time.perf_counter
+        thread_time = time.thread_time
+        it = iter(iterable)
+        wall = cpu = 0.0
+        calls = 0
+        try:
+            while True:
+                w, c = perf(), thread_time()
+                item = next(it, _END)
+                wall += perf() - w
+                cpu += thread_time() - c
+                if item is _END:
+                    return
+                calls += 1
+                yield item
+        finally:
+            self.add(name, wall, cpu, calls)
+
+    def convert_sampled(self, values, converters):
+        """与 build_record 的字段转换相同，但分别计时每个转换函数（抽样行使用）"""
+        perf = time.perf_counter
+        width = len(values)
+        fields = []
+        for convert, idx in converters:
+            if idx is None or idx >= width:
+                fields.append(None)
+                continue
+            start = perf()
+            value = convert(values[idx])
+            entry = self.converters.setdefault(convert.__name__, [0.0, 0])
+            entry[0] += perf() - start
+            entry[1] += 1
+            fields.append(value)
+        self.sampled_rows += 1
+        return fields
+
+    def row_failed(self, line, message):
+        """记录一行失败，只打印前 MAX_FAILURE_PRINTS 条"""
+        with self.lock:
+            self.failures += 1
+            count = self.failures
+            if len(self.failure_samples) < MAX_FAILURE_SAMPLES:
+                self.failure_samples.append({'line': line, 'error': str(message)})
+        if count <= MAX_FAILURE_PRINTS:
+            print(f"   ❌ [第 {line} 行] 失败: {message}")
+        elif count == MAX_FAILURE_PRINTS + 1:
+            print(f"   ⚠️  失败超过 {MAX_FAILURE_PRINTS} 行，之后不再逐行打印（见统计 JSON）")
+
+    def pop(self):
+        """取出并清空阶段和字段统计（子进程随结果返回给主进程）"""
+        snapshot = (self.stages, self.parse_failures, self.converters, self.sampled_rows)
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        """合并 pop 的结果"""
+        stages, parse_failures, converters, sampled_rows = snapshot
+        with self.lock:
+            for name, (wall, cpu, calls) in stages.items():
+                entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+                entry[0] += wall
+                entry[1] += cpu
+                entry[2] += calls
+            self.parse_failures.update(parse_failures)
+            for name, (seconds, calls) in converters.items():
+                entry = self.converters.setdefault(name, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += calls
+            self.sampled_rows += sampled_rows
+
+    def converter_estimates(self):
+        """按抽样比例估算各转换函数的全量耗时 (秒)"""
+        rows = self.stages.get('transform', (0, 0, 0))[2]
+        if not self.sampled_rows:
+            return {}
+        scale = rows / self.sampled_rows
+        return {name: round(seconds * scale, 4) for name, (seconds, _) in self.converters.items()}
+
+    def summary(self, **info):
+        """汇总为可写入 JSON 的 dict，info 为调用方补充的运行信息"""
+        rows = info.get('rows', 0)
+        elapsed = info.get('elapsed', 0)
+        result = dict(info)
+        result['rows_per_sec'] = round(rows / elapsed, 1) if elapsed > 0 else None
+        result['stages'] = {
+            name: {'wall_s': round(wall, 4), 'cpu_s': round(cpu, 4), 'calls': calls}
+            for name, (wall, cpu, calls) in self.stages.items()
+        }
+        result['converters_estimated_s'] = self.converter_estimates()
+        result['parse_failures'] = dict(self.parse_failures.most_common())
+        result['row_failures'] = {'count': self.failures, 'samples': self.failure_samples}
+        result['peak_rss_mb'] = peak_rss_mb()
+        if resource is not None:
+            result['children_peak_rss_mb'] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+        return result
+
+    def print_report(self, summary):
+        """打印各阶段耗时"""
+        print("\n   阶段耗时 (并行模式下子进程和写入线程为累计值):")
+        for name, stage in summary['stages'].items():
+            print(f"      - {name:<16} {stage['wall_s']:>9.3f} 秒  CPU {stage['cpu_s']:>9.3f} 秒  {stage['calls']:>8} 次")
+        for name, seconds in summary['converters_estimated_s'].items():
+            print(f"      - {name:<16} {seconds:>9.3f} 秒 (抽样估计)")
+        if summary['parse_failures']:
+            print("\n   ⚠️  字段解析失败 (非空但写入 NULL):")
+            for field, count in summary['parse_failures'].items():
+                print(f"      - {field}: {count} 次")
+        if summary['peak_rss_mb'] is not None:
+            print(f"\n   内存峰值: {summary['peak_rss_mb']} MB")
+
+    def write_json(self, path, summary):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+        print(f"   ✅ 统计已写入 {path}")
+
+# 模块级实例，导入流水线各处共用
+METRICS = ImportMetrics()
+
+class ProgressReporter:
+    """限频的进度输出: 每 interval 秒最多打印一次，结束时补打最后一条"""
+
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self.last = 0.0
+        self.pending = None
+
+    def update(self, message):
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.pending = None
+            print(message)
+        else:
+            self.pending = message
+
+    def finish(self):
+        if self.pending is not None:
+            print(self.pending)
+            self.pending = None
+
+class Profiler:
+    """--profile 开关: cpu 使用 cProfile，memory 使用 tracemalloc"""
+
+    def __init__(self, kind, output='import_profile.prof', top=15):
+        self.kind = kind
+        self.output = output
+        self.top = top
+        self.profile = None
+
+    def start(self):
+        if self.kind == 'cpu':
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.kind == 'memory':
+            tracemalloc.start()
+
+    def stop(self):
+        """停止并打印报告，返回写入统计 JSON 的摘要"""
+        if self.kind == 'cpu':
+            self.profile.disable()
+            self.profile.dump_stats(self.output)
+            out = io.StringIO()
+            pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(self.top)
+            print(f"\n   cProfile (主进程，按累计时间前 {self.top} 项，完整结果 {self.output}):")
+            print(out.getvalue())
+            return {'kind': 'cpu', 'output': self.output}
+        if self.kind == 'memory':
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:self.top]
+            tracemalloc.stop()
+            print(f"\n   tracemalloc: 当前 {current / 1024 / 1024:.1f} MB，峰值 {peak / 1024 / 1024:.1f} MB")
+            for stat in top:
+                print(f"      - {stat}")
+            return {
+                'kind': 'memory',
+                'current_mb': round(current / 1024 / 1024, 2),
+                'peak_mb': round(peak / 1024 / 1024, 2),
+                'top': [str(stat) for stat in top],
+            }
+        return None
@@ -0,0 +1,8 @@
+-- LogiTrack Pro - 迁移 001
+-- 为增量导入 (import_csv_pymysql.py --incremental) 增加内容哈希列
+-- 已有记录的 content_hash 为 NULL，首次增量导入时会被视为已变化并更新一次
+
+USE logitrack;
+
+ALTER TABLE enquiry_records
+    ADD COLUMN content_hash CHAR(32) COMMENT '导入内容 MD5' AFTER actual_reason;
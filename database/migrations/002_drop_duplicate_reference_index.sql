@@ -0,0 +1,11 @@
+-- LogiTrack Pro - 迁移 002
+-- reference_number 上已有 UNIQUE 约束，idx_reference_number 是一棵重复的 B 树，
+-- 每次写入都要多维护一次，删除之
+-- 旧版 create_table_pymysql.py 还额外建过 idx_enquiry_date / idx_created_at，
+-- 可用 python bulk_load.py --verify 核对后按需删除
+-- 若提示 1091 (Can't DROP)，说明索引已不存在，可忽略
+
+USE logitrack;
+
+ALTER TABLE enquiry_records
+    DROP INDEX idx_reference_number;
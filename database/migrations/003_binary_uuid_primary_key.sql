@@ -0,0 +1,19 @@
+-- LogiTrack Pro - 迁移 003
+-- 主键由 VARCHAR(36) 改为 BINARY(16)
+-- 聚簇索引和每个二级索引中的主键都从 36+ 字节缩小到 16 字节。
+-- 原有的 UUID 值不变，API 中的字符串形式保持一致；新导入的记录使用
+-- 时间有序的 UUIDv7（见 ids.py），旧记录可通过一次全量重载换成有序主键。
+-- 需与后端新版本（id 为 java.util.UUID）一起上线。
+
+USE logitrack;
+
+ALTER TABLE enquiry_records
+    ADD COLUMN id_bin BINARY(16) FIRST;
+
+UPDATE enquiry_records SET id_bin = UNHEX(REPLACE(id, '-', ''));
+
+ALTER TABLE enquiry_records
+    DROP PRIMARY KEY,
+    DROP COLUMN id,
+    CHANGE COLUMN id_bin id BINARY(16) NOT NULL COMMENT '主键 UUIDv7（时间有序，对外为 36 位字符串）',
+    ADD PRIMARY KEY (id);
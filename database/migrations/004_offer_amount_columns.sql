@@ -0,0 +1,30 @@
+-- LogiTrack Pro - 迁移 004
+-- 四个报价列是自由文本（如 "USD3.35 ALL IN"），按价格筛选只能全表扫描。
+-- 增加从原文提取的币种 / 金额 / 计费单位列和 (币种, 金额) 索引，原文列不变。
+-- 新导入的记录由导入程序填写（见 offer_parser.py）；已有记录执行完本迁移后运行
+--     python offer_parser.py --backfill
+-- 或做一次全量重载。
+
+USE logitrack;
+
+ALTER TABLE enquiry_records
+    ADD COLUMN first_offer_ocean_currency CHAR(3) COMMENT '首次报价-海运费币种' AFTER latest_offer_air_frg_kg,
+    ADD COLUMN first_offer_ocean_amount DECIMAL(12, 2) COMMENT '首次报价-海运费金额' AFTER first_offer_ocean_currency,
+    ADD COLUMN first_offer_ocean_basis VARCHAR(20) COMMENT '首次报价-海运费计费单位 (CBM/RT/40HC...)' AFTER first_offer_ocean_amount,
+    ADD COLUMN first_offer_air_currency CHAR(3) COMMENT '首次报价-空运费币种' AFTER first_offer_ocean_basis,
+    ADD COLUMN first_offer_air_amount DECIMAL(12, 2) COMMENT '首次报价-空运费金额/KG' AFTER first_offer_air_currency,
+    ADD COLUMN first_offer_air_basis VARCHAR(20) COMMENT '首次报价-空运费计费单位' AFTER first_offer_air_amount,
+    ADD COLUMN latest_offer_ocean_currency CHAR(3) COMMENT '最新报价-海运费币种' AFTER first_offer_air_basis,
+    ADD COLUMN latest_offer_ocean_amount DECIMAL(12, 2) COMMENT '最新报价-海运费金额' AFTER latest_offer_ocean_currency,
+    ADD COLUMN latest_offer_ocean_basis VARCHAR(20) COMMENT '最新报价-海运费计费单位 (CBM/RT/40HC...)' AFTER latest_offer_ocean_amount,
+    ADD COLUMN latest_offer_air_currency CHAR(3) COMMENT '最新报价-空运费币种' AFTER latest_offer_ocean_basis,
+    ADD COLUMN latest_offer_air_amount DECIMAL(12, 2) COMMENT '最新报价-空运费金额/KG' AFTER latest_offer_air_currency,
+    ADD COLUMN latest_offer_air_basis VARCHAR(20) COMMENT '最新报价-空运费计费单位' AFTER latest_offer_air_amount,
+    ADD INDEX idx_first_ocean_rate (first_offer_ocean_currency, first_offer_ocean_amount),
+    ADD INDEX idx_first_air_rate (first_offer_air_currency, first_offer_air_amount),
+    ADD INDEX idx_latest_ocean_rate (latest_offer_ocean_currency, latest_offer_ocean_amount),
+    ADD INDEX idx_latest_air_rate (latest_offer_air_currency, latest_offer_air_amount);
+
+-- 价格区间查询示例（走 idx_latest_ocean_rate）:
+-- SELECT reference_number, latest_offer_ocean_frg FROM enquiry_records
+--  WHERE latest_offer_ocean_currency = 'USD' AND latest_offer_ocean_amount BETWEEN 1000 AND 2000;
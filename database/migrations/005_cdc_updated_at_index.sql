@@ -0,0 +1,25 @@
+-- LogiTrack Pro - 迁移 005
+-- 增量同步 (cdc_sync.py) 按 (updated_at, id) 翻页取变更，没有索引时每轮都要全表扫描。
+-- 同时建立删除日志表和 AFTER DELETE 触发器，下游据此得知被删除的记录。
+-- 删除日志的 id 为 BINARY(16)，需先执行迁移 003；也可以不执行下半部分，改用
+--     python cdc_sync.py --install
+-- 注意: TRUNCATE TABLE 不触发触发器；全量重载请使用影子表（切换时会通知下游从头同步）。
+
+USE logitrack;
+
+ALTER TABLE enquiry_records
+    ADD INDEX idx_updated_at (updated_at, id);
+
+CREATE TABLE IF NOT EXISTS enquiry_records_deletes (
+    seq BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    op ENUM('delete', 'reset') NOT NULL DEFAULT 'delete' COMMENT 'reset: 整表被替换',
+    id BINARY(16) COMMENT '被删除记录的主键',
+    reference_number VARCHAR(50) COMMENT '被删除记录的参考编号',
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_deleted_at (deleted_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='enquiry_records 删除日志（增量同步）';
+
+DROP TRIGGER IF EXISTS trg_enquiry_records_delete;
+
+CREATE TRIGGER trg_enquiry_records_delete AFTER DELETE ON enquiry_records FOR EACH ROW
+    INSERT INTO enquiry_records_deletes (id, reference_number) VALUES (OLD.id, OLD.reference_number);
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 报价文本解析
+
+四个报价列（first/latest_offer_ocean_frg、first/latest_offer_air_frg_kg）
+是 VARCHAR(100) 自由文本:
+    USD3.35             → USD, 3.35, NULL
+    USD3.35 ALL IN      → USD, 3.35, ALL IN
+    US2,500/40'HC       → USD, 2500, 40HC
+    USD1200/20'         → USD, 1200, 20FT
+    O/F:USD35/CBM       → USD, 35, CBM
+    USD1200 + EXW USD80 → USD, 1200, NULL（取第一个金额，即运费）
+    As per tradetech    → NULL, NULL, NULL
+
+按价格筛选只能对整列做字符串函数全表扫描。导入时把每列拆成币种、金额、
+计费单位三个带索引的类型化列（原文保留），价格区间查询可以走
+(币种, 金额) 索引。
+
+同一个报价文本在文件中反复出现（约一半是重复值），与日期解析一样按原文
+缓存结果。已有数据在迁移 004 之后用 python offer_parser.py --backfill 补填。
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+
+from header_mapping import FIELD_NAMES
+
+# 缓存的不同取值上限，超过后清空
+DEFAULT_MAX_CACHE = 100000
+
+# 原文列 -> 提取列前缀（提取列为 前缀_currency / 前缀_amount / 前缀_basis）
+OFFER_FIELDS = (
+    ('first_offer_ocean_frg', 'first_offer_ocean'),
+    ('first_offer_air_frg_kg', 'first_offer_air'),
+    ('latest_offer_ocean_frg', 'latest_offer_ocean'),
+    ('latest_offer_air_frg_kg', 'latest_offer_air'),
+)
+
+# 提取列，顺序与 OfferParser.extract 返回的元组一致
+OFFER_COLUMNS = tuple(
+    f"{prefix}_{part}" for _, prefix in OFFER_FIELDS for part in ('currency', 'amount', 'basis')
+)
+
+# 原文列在 build_record 数据字段中的位置
+OFFER_POSITIONS = tuple(FIELD_NAMES.index(source) for source, _ in OFFER_FIELDS)
+
+# 币种写法 -> ISO 代码
+CURRENCIES = {
+    'USD': 'USD', 'US': 'USD', '$': 'USD',
+    'RMB': 'CNY', 'CNY': 'CNY',
+    'HKD': 'HKD', 'HK': 'HKD', 'GBP': 'GBP', 'EUR': 'EUR', 'JPY': 'JPY',
+    'SGD': 'SGD', 'AUD': 'AUD', 'CAD': 'CAD',
+}
+
+CODES = r'USD|US|RMB|CNY|HKD|HK|GBP|EUR|JPY|SGD|AUD|CAD'
+AMOUNT = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+
+# 币种在前，如 "USD3.35"、"US 2,500"、"HK$42"、"$35"；前面不能紧跟字母（PLUS 9）
+PRICE = re.compile(rf'(?<![A-Za-z])(?:({CODES})\s*\$?|(\$))\s*({AMOUNT})', re.IGNORECASE)
+
+# 币种在后，如 "6.18usd/kg"、"1675USD/20GP"
+PRICE_SUFFIX = re.compile(rf'(?<![\d.,])({AMOUNT})\s*({CODES})(?![A-Za-z])', re.IGNORECASE)
+
+# 紧跟金额的计费单位，如 "/CBM"、"/W/M"、"/40'HC"、"/ 20GP"；"/1200" 是第二个价格，不是单位
+BASIS = re.compile(r"\s*/\s*(W/M|\d{2}\s*['’]?\s*(?:GP|HC|HQ|DC|RF|FT)\b|\d{2}\s*['’]|[A-Za-z]{1,10}\b)")
+
+# 斜杠后的单位写法 -> 计费单位；不在表中的（"/MSC"、"/BY"……）不作为单位
+UNITS = {
+    'KG': 'KG', 'KGS': 'KG',
+    'CBM': 'CBM', 'RT': 'RT', 'WM': 'W/M', 'TON': 'TON',
+    'BILL': 'BILL', 'BL': 'BILL',
+    'SHPT': 'SHPT', 'SHPMT': 'SHPT', 'SHIPMENT': 'SHPT',
+    'CNTR': 'CNTR', 'CTNR': 'CNTR',
+}
+
+ALL_IN = re.compile(r'\bALL[\s-]*IN\b', re.IGNORECASE)
+
+# 金额列 DECIMAL(12, 2) 的上限
+MAX_AMOUNT = 10 ** 10
+
+def parse_uncached(text):
+    """
+    解析一个已去除首尾空白的报价文本
+
+    返回 (币种, 金额, 计费单位)，找不到金额时三者均为 None。
+    """
+    match = PRICE.search(text)
+    suffix = PRICE_SUFFIX.search(text)
+    if suffix and (not match or suffix.start() < match.start()):
+        number, code = suffix.groups()
+        match = suffix
+    elif match:
+        code, dollar, number = match.groups()
+        code = code or dollar
+    else:
+        return None, None, None
+    amount = float(number.replace(',', ''))
+    if amount >= MAX_AMOUNT:
+        return None, None, None
+    currency = CURRENCIES[code.upper()]
+
+    basis = None
+    unit = BASIS.match(text, match.end())
+    if unit:
+        token = re.sub(r"[\s'’/]", '', unit.group(1)).upper()
+        if token[0].isdigit():
+            # 柜型；20' / 40' 即 20 / 40 尺柜
+            basis = token + 'FT' if token.isdigit() else token
+        else:
+            basis = UNITS.get(token)
+    if basis is None and ALL_IN.search(text):
+        basis = 'ALL IN'
+    return currency, amount, basis
+
+class OfferParser:
+    """带缓存的报价文本解析器，同时统计各币种和无法识别的文本"""
+
+    def __init__(self, max_cache=DEFAULT_MAX_CACHE):
+        self.max_cache = max_cache
+        self.cache = {}
+        self.currency_counts = Counter()
+        self.unparsed_counts = Counter()
+
+    def parse(self, value):
+        """解析一个报价文本，返回 (币种, 金额, 计费单位)，空值返回三个 None"""
+        if not value:
+            return None, None, None
+        hit = self.cache.get(value)
+        if hit is None:
+            hit = parse_uncached(value.strip())
+            if len(self.cache) >= self.max_cache:
+                self.cache.clear()
+            self.cache[value] = hit
+
+        if hit[0] is None:
+            self.unparsed_counts[value.strip()] += 1
+        else:
+            self.currency_counts[hit[0]] += 1
+        return hit
+
+    def extract(self, fields):
+        """从 build_record 的数据字段中提取全部报价列，返回与 OFFER_COLUMNS 对应的元组"""
+        parse = self.parse
+        return tuple(part for pos in OFFER_POSITIONS for part in parse(fields[pos]))
+
+    def pop_counts(self):
+        """取出并清零统计（用于从子进程汇总到主进程）"""
+        counts = (self.currency_counts, self.unparsed_counts)
+        self.currency_counts = Counter()
+        self.unparsed_counts = Counter()
+        return counts
+
+    def merge_counts(self, counts):
+        """合并 pop_counts 的结果"""
+        currency_counts, unparsed_counts = counts
+        self.currency_counts.update(currency_counts)
+        self.unparsed_counts.update(unparsed_counts)
+
+    def print_report(self, top=10):
+        """打印各币种的报价数和最常见的无法提取金额的文本"""
+        if not self.currency_counts and not self.unparsed_counts:
+            return
+        print("\n   报价提取统计:")
+        for currency, count in self.currency_counts.most_common():
+            print(f"      - {currency}: {count}")
+        if self.unparsed_counts:
+            print(f"   无法提取金额的报价 (前 {top} 个，提取列为 NULL，原文保留):")
+            for text, count in self.unparsed_counts.most_common(top):
+                print(f"      - {text!r}: {count}")
+
+# 模块级默认实例
+OFFER_PARSER = OfferParser()
+
+# backfill 每批解析结果的临时表（会话级）
+BACKFILL_TABLE = 'offer_backfill'
+
+def backfill(conn, read_conn, table, batch_size):
+    """
+    按原文重新提取已有记录的报价列
+
+    read_conn 用服务器端游标流式读取。pymysql 只把 INSERT 的 executemany
+    改写为多行 VALUES，UPDATE 仍是逐行往返；因此每批先多行插入会话级临时表
+    (id, 提取列)，再用一条 UPDATE ... JOIN 写回并提交。返回更新的行数。
+    """
+    import pymysql
+
+    sources = ', '.join(source for source, _ in OFFER_FIELDS)
+    columns = ', '.join(OFFER_COLUMNS)
+    insert_sql = (
+        f"INSERT INTO {BACKFILL_TABLE} (id, {columns}) "
+        f"VALUES ({', '.join(['%s'] * (len(OFFER_COLUMNS) + 1))})"
+    )
+    assignments = ', '.join(f"t.{column} = b.{column}" for column in OFFER_COLUMNS)
+    update_sql = f"UPDATE {table} t JOIN {BACKFILL_TABLE} b ON b.id = t.id SET {assignments}"
+    reader = read_conn.cursor(pymysql.cursors.SSCursor)
+    cursor = conn.cursor()
+    updated = 0
+    start = time.perf_counter()
+
+    def flush(batch):
+        cursor.executemany(insert_sql, batch)
+        cursor.execute(update_sql)
+        cursor.execute(f"DELETE FROM {BACKFILL_TABLE}")
+        conn.commit()
+        return len(batch)
+
+    try:
+        # 列类型与目标表一致（包括 BINARY(16) / VARCHAR(36) 主键）
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {BACKFILL_TABLE} (PRIMARY KEY (id)) "
+            f"SELECT id, {columns} FROM {table} LIMIT 0"
+        )
+        reader.execute(f"SELECT id, {sources} FROM {table}")
+        batch = []
+        for row in reader:
+            values = tuple(part for text in row[1:] for part in OFFER_PARSER.parse(text))
+            batch.append((row[0],) + values)
+            if len(batch) >= batch_size:
+                updated += flush(batch)
+                batch = []
+                print(f"   ✅ 已更新 {updated} 条 ({updated / (time.perf_counter() - start):,.0f} 条/秒)")
+        if batch:
+            updated += flush(batch)
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {BACKFILL_TABLE}")
+    finally:
+        reader.close()
+        cursor.close()
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 报价文本解析')
+    parser.add_argument('text', nargs='*', help='要解析的报价文本（不带 --backfill 时）')
+    parser.add_argument('--backfill', action='store_true',
+                        help='按原文重新提取 enquiry_records 中已有记录的报价列（迁移 004 之后运行）')
+    parser.add_argument('--batch-size', type=int, default=1000, help='每批更新行数 (默认 1000)')
+    args = parser.parse_args()
+
+    if not args.backfill:
+        if not args.text:
+            parser.error('请提供报价文本，或使用 --backfill')
+        for text in args.text:
+            currency, amount, basis = OFFER_PARSER.parse(text)
+            print(f"{text!r}: 币种 {currency}, 金额 {amount}, 计费单位 {basis}")
+        return
+
+    import db
+    from schema_tools import TABLE_NAME
+
+    print(f"\n补填报价列 ({db.CONFIG['database']}.{TABLE_NAME})...")
+    try:
+        conn = db.connect('pymysql')
+        read_conn = db.connect('pymysql')
+    except Exception as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+    try:
+        updated = backfill(conn, read_conn, TABLE_NAME, args.batch_size)
+    finally:
+        read_conn.close()
+        conn.close()
+    print(f"   ✅ 共更新 {updated} 条")
+    OFFER_PARSER.print_report()
+
+if __name__ == '__main__':
+    main()
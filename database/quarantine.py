@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 导入错误隔离
+
+批量 INSERT 中只要有一行出错（重复的 reference_number、超长的 pol、
+无效的数值……），整条 executemany 就会失败。以前的做法是整批改为
+逐行重试，一个坏行就让这一批退化成逐行写入。
+
+现在失败的批次按二分法拆开重试: 每一半先设保存点再 executemany，成功
+就保留，失败就回滚到保存点继续拆，直到定位到单独的坏行。k 个坏行只需
+约 2k·log2(n/k) 条语句，其余行仍然成批写入。坏行连同源行号和数据库
+错误写入拒绝文件（CSV），可以修正后单独重新导入。
+"""
+
+import csv
+import os
+import threading
+
+import pymysql
+
+from db import is_disconnect
+
+# 拒绝文件的默认路径（import_csv_pymysql.py --reject-file）
+DEFAULT_REJECT_FILE = 'import_rejects.csv'
+
+SAVEPOINT = 'quarantine'
+
+def error_parts(error):
+    """
+    拆出错误码和信息
+
+    error 为 pymysql 异常（args 为 (错误码, 信息)）或 SHOW WARNINGS 的
+    (错误码, 信息)。
+    """
+    if isinstance(error, tuple):
+        return error
+    if isinstance(error, pymysql.Error) and len(error.args) == 2:
+        return error.args[0], error.args[1]
+    return '', str(error)
+
+def bisect_write(cursor, sql, batch):
+    """
+    二分写入一批记录，隔离出无法写入的行
+
+    batch 为 [(行号, 参数元组), ...]，调用方已回滚整批失败的事务。
+    每一半在保存点内 executemany，失败则回滚到保存点并继续拆分；
+    单行仍失败即为坏行。不提交，由调用方提交。
+    返回 (影响行数, 成功行数, [(行号, 参数元组, 错误), ...])。
+    """
+    affected = 0
+    written = 0
+    rejected = []
+    # 整批已知失败，直接从两半开始；显式栈代替递归，先左半后右半保持文件顺序
+    mid = len(batch) // 2
+    stack = [batch[mid:], batch[:mid]] if mid else [batch]
+    while stack:
+        part = stack.pop()
+        cursor.execute(f"SAVEPOINT {SAVEPOINT}")
+        try:
+            affected += cursor.executemany(sql, [data for _, data in part])
+            written += len(part)
+        except pymysql.Error as e:
+            # 连接断开不是数据问题，交给调用方（连接池换新连接重试）
+            if is_disconnect(e):
+                raise
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+            if len(part) == 1:
+                idx, data = part[0]
+                rejected.append((idx, data, e))
+            else:
+                mid = len(part) // 2
+                stack.append(part[mid:])
+                stack.append(part[:mid])
+    return affected, written, rejected
+
+class RejectFile:
+    """
+    拒绝文件: 每个坏行一行，含源行号、参考编号、错误码、错误信息和字段值
+
+    open() 之前 add() 只计数不写文件；第一次 add() 时才创建文件，没有
+    坏行就不会留下空文件。并行模式下多个写入线程共用，写入加锁。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.path = None
+        self.columns = ()
+        self.file = None
+        self.writer = None
+        self.count = 0
+        self.append = False
+
+    def open(self, path, columns, append=False):
+        """
+        指定路径和字段名（写入表头）
+
+        默认删除上次运行留下的同名文件；append 为 True 时（断点续传）
+        在原文件后追加。
+        """
+        self.close()
+        self.path = path
+        self.columns = tuple(columns)
+        self.count = 0
+        self.append = append and os.path.exists(path)
+        if not self.append and os.path.exists(path):
+            os.remove(path)
+
+    def add(self, line, reference, error, fields=None):
+        """记录一个坏行，fields 为字段值（LOAD DATA 的警告行没有字段值）"""
+        code, message = error_parts(error)
+        with self.lock:
+            self.count += 1
+            if self.path is None:
+                return
+            if self.file is None:
+                if self.append:
+                    self.file = open(self.path, 'a', encoding='utf-8', newline='')
+                    self.writer = csv.writer(self.file)
+                else:
+                    self.file = open(self.path, 'w', encoding='utf-8-sig', newline='')
+                    self.writer = csv.writer(self.file)
+                    self.writer.writerow(('line', 'reference_number', 'error_code', 'error') + self.columns)
+            self.writer.writerow((line, reference or '', code, message) + tuple(fields or ()))
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                self.writer = None
+
+    def print_report(self):
+        if not self.count:
+            return
+        if self.path is None:
+            print(f"\n   ⚠️  {self.count} 行被数据库拒绝")
+        else:
+            print(f"\n   ⚠️  {self.count} 行被数据库拒绝，已写入 {self.path}（含源行号和错误信息）")
+
+# 模块级实例，导入流水线各处共用
+REJECTS = RejectFile()
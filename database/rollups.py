@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 仪表盘汇总表
+
+仪表盘和 schema.sql 里的核对查询（GROUP BY status / sales_country）每次
+都扫描整个 enquiry_records，随历史数据增长越来越慢。汇总表预先按维度
+累计询价数、订舱数、体积和 TEU:
+
+    rollup_monthly   月份 × 状态 × 产品 × 销售国家
+    rollup_lane      起运港 × 目的港
+    rollup_booking   预订结果 × 产品 × 月份
+
+查询汇总表的代价只与维度组合数有关，与记录数无关；summary_status、
+summary_sales_country 视图即原来的两个核对查询。
+
+维护方式:
+    - 导入程序（batch / parallel / 增量模式）每批写入时，把这一批的增量
+      在同一事务中累加到汇总表（增量模式先减去被更新行的旧值）
+    - LOAD DATA、async、影子表重载之后整体重算
+    - 后端接口对单条记录的增删改不经过这里，定期用 --verify 核对，
+      有差异时 --rebuild
+
+用法:
+    python rollups.py --create     建立汇总表和视图并重算
+    python rollups.py --rebuild    从 enquiry_records 重算全部汇总表
+    python rollups.py --verify     与 enquiry_records 逐行核对
+"""
+
+import argparse
+import collections
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+import pymysql
+
+from header_mapping import FIELD_NAMES
+from instrumentation import METRICS
+from schema_tools import TABLE_NAME
+from validation import unique_key
+
+# 维度: (汇总表列名, 类型, 数据字段)；month 为 enquiry_received_date 的年月 YYYY-MM
+Rollup = collections.namedtuple('Rollup', 'table dimensions comment')
+
+MONTH = ('month', 'CHAR(7)', 'enquiry_received_date')
+STATUS = ('status', 'VARCHAR(50)', 'status')
+PRODUCT = ('product', 'VARCHAR(50)', 'product')
+SALES_COUNTRY = ('sales_country', 'VARCHAR(100)', 'sales_country')
+
+ROLLUP_TABLES = (
+    Rollup('rollup_monthly', (MONTH, STATUS, PRODUCT, SALES_COUNTRY), '按月 × 状态 × 产品 × 销售国家汇总'),
+    Rollup('rollup_lane', (('pol', 'VARCHAR(10)', 'pol'), ('pod', 'VARCHAR(10)', 'pod')), '按航线汇总'),
+    Rollup('rollup_booking', (('booking_confirmed', 'VARCHAR(20)', 'booking_confirmed'), PRODUCT, MONTH),
+           '按预订结果汇总'),
+)
+
+# 度量: (列名, 类型, 重算时的表达式)
+MEASURES = (
+    ('enquiries', 'INT NOT NULL DEFAULT 0', 'COUNT(*)'),
+    ('booked', 'INT NOT NULL DEFAULT 0', "COALESCE(SUM(booking_confirmed = 'Yes'), 0)"),
+    ('volume_cbm', 'DECIMAL(16, 3) NOT NULL DEFAULT 0', 'COALESCE(SUM(volume_cbm), 0)'),
+    ('quantity_teu', 'DECIMAL(16, 2) NOT NULL DEFAULT 0', 'COALESCE(SUM(quantity_teu), 0)'),
+)
+
+# 汇总视图（即 schema.sql 中的核对查询）
+SUMMARY_VIEWS = {
+    'summary_status': 'status',
+    'summary_sales_country': 'sales_country',
+}
+
+# 参数元组中的位置（FIELD_NAMES 的位置加 1，第 0 位为主键）
+POS = {name: FIELD_NAMES.index(name) + 1 for name in FIELD_NAMES}
+
+# DECIMAL 列的小数位，与 schema.sql 一致
+VOLUME_SCALE = Decimal('0.001')
+TEU_SCALE = Decimal('0.01')
+
+def dimension_expr(field):
+    """重算时维度的 SQL 表达式（NULL 记为空串，主键列不能为 NULL）"""
+    if field == 'enquiry_received_date':
+        return "COALESCE(DATE_FORMAT(enquiry_received_date, '%Y-%m'), '')"
+    return f"COALESCE({field}, '')"
+
+def create_table_sql(rollup):
+    columns = [f"    {name} {kind} NOT NULL DEFAULT ''" for name, kind, _ in rollup.dimensions]
+    columns += [f"    {name} {kind}" for name, kind, _ in MEASURES]
+    key = ', '.join(name for name, _, _ in rollup.dimensions)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {rollup.table} (\n" + ',\n'.join(columns)
+        + f",\n    PRIMARY KEY ({key})\n"
+        f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='{rollup.comment}'"
+    )
+
+def summary_view_sql(view, dimension):
+    return (
+        f"CREATE OR REPLACE VIEW {view} AS "
+        f"SELECT {dimension}, SUM(enquiries) AS enquiries, SUM(booked) AS booked "
+        f"FROM rollup_monthly GROUP BY {dimension}"
+    )
+
+def aggregate_sql(rollup, table=TABLE_NAME):
+    """从基表聚合出汇总表全部行的查询"""
+    dims = ', '.join(dimension_expr(field) for _, _, field in rollup.dimensions)
+    measures = ', '.join(expr for _, _, expr in MEASURES)
+    group = ', '.join(str(i) for i in range(1, len(rollup.dimensions) + 1))
+    return f"SELECT {dims}, {measures} FROM {table} GROUP BY {group}"
+
+def upsert_sql(rollup):
+    columns = [name for name, _, _ in rollup.dimensions] + [name for name, _, _ in MEASURES]
+    updates = ', '.join(f"{name} = {name} + VALUES({name})" for name, _, _ in MEASURES)
+    return (
+        f"INSERT INTO {rollup.table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+def to_decimal(value, scale):
+    """
+    与写入 DECIMAL 列时的舍入一致（pymysql 以 repr 发送浮点数，MySQL 四舍五入）
+
+    导入的新值是浮点数；upsert 前读出的旧值是 pymysql 返回的 Decimal，直接舍入:
+        >>> to_decimal(2.675, Decimal('0.01')), to_decimal(Decimal('12.345'), Decimal('0.01'))
+        (Decimal('2.68'), Decimal('12.35'))
+    """
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value.quantize(scale, rounding=ROUND_HALF_UP)
+    return Decimal(repr(value)).quantize(scale, rounding=ROUND_HALF_UP)
+
+def dimension_value(data, field):
+    value = data[POS[field]]
+    if value is None:
+        return ''
+    if field == 'enquiry_received_date':
+        return str(value)[:7]
+    return value
+
+def row_measures(data, sign=1):
+    booked = (data[POS['booking_confirmed']] or '').lower() == 'yes'
+    return (
+        sign,
+        sign if booked else 0,
+        sign * to_decimal(data[POS['volume_cbm']], VOLUME_SCALE),
+        sign * to_decimal(data[POS['quantity_teu']], TEU_SCALE),
+    )
+
+def tables_exist(cursor):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() "
+        f"AND TABLE_NAME IN ({', '.join(['%s'] * len(ROLLUP_TABLES))})",
+        tuple(rollup.table for rollup in ROLLUP_TABLES),
+    )
+    return cursor.fetchone()[0] == len(ROLLUP_TABLES)
+
+def create(conn):
+    """建立汇总表和视图（已存在的保留）"""
+    cursor = conn.cursor()
+    for rollup in ROLLUP_TABLES:
+        cursor.execute(create_table_sql(rollup))
+    for view, dimension in SUMMARY_VIEWS.items():
+        cursor.execute(summary_view_sql(view, dimension))
+    cursor.close()
+    conn.commit()
+
+def rebuild(conn, table=TABLE_NAME):
+    """在一个事务中清空并重算全部汇总表，返回 {汇总表: 行数}"""
+    cursor = conn.cursor()
+    counts = {}
+    try:
+        for rollup in ROLLUP_TABLES:
+            columns = [name for name, _, _ in rollup.dimensions] + [name for name, _, _ in MEASURES]
+            cursor.execute(f"DELETE FROM {rollup.table}")
+            counts[rollup.table] = cursor.execute(
+                f"INSERT INTO {rollup.table} ({', '.join(columns)}) {aggregate_sql(rollup, table)}"
+            )
+        conn.commit()
+    except pymysql.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return counts
+
+def rows_by_key(rows, width):
+    """{维度键（不区分大小写）: 度量元组}，询价数为 0 的行（增量相减后留下的）忽略"""
+    result = {}
+    for row in rows:
+        if not row[width]:
+            continue
+        key = tuple(unique_key(value) for value in row[:width])
+        result[key] = tuple(row[width:])
+    return result
+
+def verify(conn, table=TABLE_NAME, show=10):
+    """逐行核对汇总表与基表，打印差异，返回差异行数"""
+    cursor = conn.cursor()
+    problems = 0
+    try:
+        for rollup in ROLLUP_TABLES:
+            width = len(rollup.dimensions)
+            columns = [name for name, _, _ in rollup.dimensions] + [name for name, _, _ in MEASURES]
+            cursor.execute(aggregate_sql(rollup, table))
+            expected = rows_by_key(cursor.fetchall(), width)
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {rollup.table}")
+            actual = rows_by_key(cursor.fetchall(), width)
+            diff = [key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)]
+            problems += len(diff)
+            if not diff:
+                print(f"   ✅ {rollup.table}: {len(actual)} 行一致")
+                continue
+            print(f"   ❌ {rollup.table}: {len(diff)} 行不一致")
+            for key in sorted(diff)[:show]:
+                print(f"      - {key}: 基表 {expected.get(key)}，汇总表 {actual.get(key)}")
+    finally:
+        cursor.close()
+    return problems
+
+class RollupMaintainer:
+    """
+    导入时按批累加汇总表
+
+    open() 时汇总表存在才启用，否则 apply() 等均不起作用。apply() 在调用方
+    的事务中执行，与这一批数据一起提交或回滚。并行模式下多个写入线程同时
+    调用；汇总行按固定顺序加锁，写入线程之间只会等待，不会死锁。
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def open(self, conn):
+        cursor = conn.cursor()
+        try:
+            self.enabled = tables_exist(cursor)
+        finally:
+            cursor.close()
+        return self.enabled
+
+    def close(self):
+        self.enabled = False
+
+    def clear(self, cursor):
+        """全量重载清空基表时一并清空（同一事务）"""
+        if not self.enabled:
+            return
+        for rollup in ROLLUP_TABLES:
+            cursor.execute(f"DELETE FROM {rollup.table}")
+
+    def snapshot(self, cursor, batch):
+        """
+        upsert 之前读取这一批中已存在记录的旧参数（按参考编号），
+        返回 {参考编号键: 参数元组}；未启用时返回 None
+        """
+        if not self.enabled:
+            return None
+        references = list({data[3] for _, data in batch})
+        fields = ', '.join(('id',) + FIELD_NAMES)
+        cursor.execute(
+            f"SELECT {fields} FROM {TABLE_NAME} WHERE reference_number IN ({', '.join(['%s'] * len(references))})",
+            references,
+        )
+        return {unique_key(row[3]): row for row in cursor.fetchall()}
+
+    def apply(self, cursor, rows, old=None):
+        """
+        把已写入的 [(行号, 参数元组), ...] 累加到汇总表
+
+        old 为 snapshot() 的结果（增量 upsert）: 同一参考编号以最后一次写入
+        为准，先减去旧值再加上新值。
+        """
+        if not self.enabled or not rows:
+            return
+        with METRICS.stage('rollups'):
+            if old is not None:
+                latest = {unique_key(data[3]): data for _, data in rows}
+                changes = [(data, 1) for data in latest.values()]
+                changes += [(old[key], -1) for key in latest if key in old]
+            else:
+                changes = [(data, 1) for _, data in rows]
+
+            for rollup in ROLLUP_TABLES:
+                deltas = {}
+                for data, sign in changes:
+                    key = tuple(dimension_value(data, field) for _, _, field in rollup.dimensions)
+                    measures = row_measures(data, sign)
+                    total = deltas.get(key)
+                    deltas[key] = measures if total is None else tuple(a + b for a, b in zip(total, measures))
+                # 固定的加锁顺序
+                params = [key + deltas[key] for key in sorted(deltas) if any(deltas[key])]
+                if params:
+                    cursor.executemany(upsert_sql(rollup), params)
+
+# 模块级实例，导入流水线各处共用
+ROLLUPS = RollupMaintainer()
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 仪表盘汇总表')
+    parser.add_argument('--create', action='store_true', help='建立汇总表和视图，并从 enquiry_records 重算')
+    parser.add_argument('--rebuild', action='store_true', help='从 enquiry_records 重算全部汇总表')
+    parser.add_argument('--verify', action='store_true', help='与 enquiry_records 逐行核对，不一致时退出码为 1')
+    args = parser.parse_args()
+    if not (args.create or args.rebuild or args.verify):
+        parser.error('请指定 --create、--rebuild 或 --verify')
+
+    import db
+
+    try:
+        conn = db.connect('pymysql')
+    except pymysql.Error as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+    problems = 0
+    try:
+        if args.create:
+            create(conn)
+            print(f"   ✅ 已建立 {len(ROLLUP_TABLES)} 个汇总表和 {len(SUMMARY_VIEWS)} 个视图")
+        if args.create or args.rebuild:
+            start = time.perf_counter()
+            counts = rebuild(conn)
+            for table, count in counts.items():
+                print(f"   ✅ {table}: {count} 行")
+            print(f"   ✅ 重算完成 ({time.perf_counter() - start:.1f} 秒)")
+        if args.verify:
+            problems = verify(conn)
+    except pymysql.Error as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    if problems:
+        print(f"\n❌ 汇总表与基表有 {problems} 行不一致，请运行: python rollups.py --rebuild")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
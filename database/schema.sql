@@ -14,7 +14,7 @@ DROP TABLE IF EXISTS enquiry_records;
 
 CREATE TABLE enquiry_records (
     -- 主键
-    id VARCHAR(36) PRIMARY KEY COMMENT '主键 UUID',
+    id BINARY(16) PRIMARY KEY COMMENT '主键 UUIDv7（时间有序，对外为 36 位字符串）',
     
     -- 日期字段
     enquiry_received_date DATE COMMENT '询价接收日期',
@@ -61,25 +61,46 @@ CREATE TABLE enquiry_records (
     first_offer_air_frg_kg VARCHAR(100) COMMENT '首次报价-空运费/KG',
     latest_offer_ocean_frg VARCHAR(100) COMMENT '最新报价-海运费',
     latest_offer_air_frg_kg VARCHAR(100) COMMENT '最新报价-空运费/KG',
+
+    -- 从报价文本提取的币种 / 金额 / 计费单位（见 offer_parser.py，无法提取时为 NULL）
+    first_offer_ocean_currency CHAR(3) COMMENT '首次报价-海运费币种',
+    first_offer_ocean_amount DECIMAL(12, 2) COMMENT '首次报价-海运费金额',
+    first_offer_ocean_basis VARCHAR(20) COMMENT '首次报价-海运费计费单位 (CBM/RT/40HC...)',
+    first_offer_air_currency CHAR(3) COMMENT '首次报价-空运费币种',
+    first_offer_air_amount DECIMAL(12, 2) COMMENT '首次报价-空运费金额/KG',
+    first_offer_air_basis VARCHAR(20) COMMENT '首次报价-空运费计费单位',
+    latest_offer_ocean_currency CHAR(3) COMMENT '最新报价-海运费币种',
+    latest_offer_ocean_amount DECIMAL(12, 2) COMMENT '最新报价-海运费金额',
+    latest_offer_ocean_basis VARCHAR(20) COMMENT '最新报价-海运费计费单位 (CBM/RT/40HC...)',
+    latest_offer_air_currency CHAR(3) COMMENT '最新报价-空运费币种',
+    latest_offer_air_amount DECIMAL(12, 2) COMMENT '最新报价-空运费金额/KG',
+    latest_offer_air_basis VARCHAR(20) COMMENT '最新报价-空运费计费单位',
     
     -- 预订状态
     booking_confirmed VARCHAR(20) COMMENT '预订确认 (Yes/Rejected/Pending)',
     rejected_reason TEXT COMMENT '拒绝原因',
     actual_reason TEXT COMMENT '实际原因',
     
+    -- 导入内容哈希（增量导入时判断记录是否变化）
+    content_hash CHAR(32) COMMENT '导入内容 MD5',
+    
     -- 时间戳
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     
     -- 索引
-    INDEX idx_reference_number (reference_number),
     INDEX idx_status (status),
     INDEX idx_sales_country (sales_country),
     INDEX idx_product (product),
     INDEX idx_booking_confirmed (booking_confirmed),
     INDEX idx_enquiry_received_date (enquiry_received_date),
     INDEX idx_sales_office (sales_office),
-    INDEX idx_pol_pod (pol, pod)
+    INDEX idx_pol_pod (pol, pod),
+    INDEX idx_first_ocean_rate (first_offer_ocean_currency, first_offer_ocean_amount),
+    INDEX idx_first_air_rate (first_offer_air_currency, first_offer_air_amount),
+    INDEX idx_latest_ocean_rate (latest_offer_ocean_currency, latest_offer_ocean_amount),
+    INDEX idx_latest_air_rate (latest_offer_air_currency, latest_offer_air_amount),
+    INDEX idx_updated_at (updated_at, id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='询价记录表';
 
 -- 查看表结构
@@ -89,3 +110,6 @@ DESCRIBE enquiry_records;
 -- SELECT COUNT(*) as total_records FROM enquiry_records;
 -- SELECT status, COUNT(*) as count FROM enquiry_records GROUP BY status;
 -- SELECT sales_country, COUNT(*) as count FROM enquiry_records GROUP BY sales_country;
+-- 建立汇总表后（python rollups.py --create）同样的统计不必扫描全表:
+-- SELECT * FROM summary_status;
+-- SELECT * FROM summary_sales_country;
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - schema.sql 解析工具
+
+从 schema.sql 中取出 enquiry_records 的 CREATE TABLE 语句，并把二级索引
+单独拆出来，供影子表重建、延迟建索引等场景使用。
+"""
+
+import os
+import re
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+TABLE_NAME = 'enquiry_records'
+
+# 表定义中的二级索引行，如 "INDEX idx_status (status),"
+INDEX_LINE = re.compile(r'^\s*(?:INDEX|KEY)\s+(\w+)\s*\(([^)]*)\)\s*,?\s*$', re.IGNORECASE)
+
+def read_create_table(schema_file=SCHEMA_FILE):
+    """读取 schema.sql 中的 CREATE TABLE 语句（不含结尾分号）"""
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        sql_script = f.read()
+    start = sql_script.find("CREATE TABLE")
+    end = sql_script.find(";", start)
+    if start < 0 or end < 0:
+        raise ValueError(f"{schema_file} 中找不到 CREATE TABLE 语句")
+    return sql_script[start:end]
+
+def split_indexes(create_sql):
+    """
+    拆出二级索引
+
+    返回 (去掉二级索引后的 CREATE TABLE, [(索引名, 列定义), ...])。
+    主键和列上的 UNIQUE 约束保留在表定义里。
+    """
+    lines = []
+    indexes = []
+    for line in create_sql.splitlines():
+        match = INDEX_LINE.match(line)
+        if match:
+            indexes.append((match.group(1), match.group(2).strip()))
+        else:
+            lines.append(line)
+    body = '\n'.join(lines)
+    # 去掉索引后，最后一列定义后面可能残留逗号（中间可能夹着注释行）
+    body = re.sub(r',(\s*(?:--[^\n]*\n\s*)*)\)(\s*ENGINE)', r'\1)\2', body)
+    return body, indexes
+
+def create_table_sql(table=TABLE_NAME, defer_indexes=False, schema_file=SCHEMA_FILE):
+    """
+    生成建表语句，表名可替换（影子表）
+
+    defer_indexes 为 True 时返回不含二级索引的语句，索引列表一并返回，
+    以便数据装载后再一次性建立。返回 (建表语句, 索引列表)。
+    """
+    create_sql = read_create_table(schema_file)
+    create_sql = re.sub(r'CREATE TABLE\s+\w+', f'CREATE TABLE {table}', create_sql, count=1)
+    if defer_indexes:
+        return split_indexes(create_sql)
+    return create_sql, []
+
+def add_indexes_sql(table, indexes):
+    """一条 ALTER TABLE 同时建立多个索引，只需扫描一次表"""
+    clauses = ', '.join(f"ADD INDEX {name} ({columns})" for name, columns in indexes)
+    return f"ALTER TABLE {table} {clauses}"
+
+def expected_indexes(schema_file=SCHEMA_FILE):
+    """schema.sql 中定义的二级索引 {索引名: 列定义}"""
+    _, indexes = split_indexes(read_create_table(schema_file))
+    return dict(indexes)
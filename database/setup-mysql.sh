@@ -41,7 +41,7 @@ echo -e "${GREEN}✅ Python3 已安装${NC}"
 # 安装必要的 Python 包
 echo ""
 echo "2️⃣  安装 Python 依赖..."
-pip install -q mysql-connector-python pandas 2>/dev/null || {
+pip install -q mysql-connector-python pymysql pandas 2>/dev/null || {
     echo -e "${YELLOW}⚠️  部分包可能已安装${NC}"
 }
 echo -e "${GREEN}✅ Python 依赖已就绪${NC}"
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 影子表重载
+
+全量重载不再直接清空线上的 enquiry_records:
+    1. 按 schema.sql 建立影子表 enquiry_records_new（二级索引延后建立）
+    2. 数据装载到影子表
+    3. 一条 ALTER TABLE 建立全部二级索引
+    4. 校验行数
+    5. 一条 RENAME TABLE 原子切换，旧表保留为 enquiry_records_old 以便回滚
+
+切换前后端读到的始终是完整的一代数据。切换和回滚之后通知增量同步
+（cdc_sync.py）下游从头同步。
+
+用法（回滚到上一代）:
+    python shadow_table.py --rollback
+"""
+
+import argparse
+import pymysql
+import sys
+
+import cdc_sync
+from schema_tools import TABLE_NAME, create_table_sql
+
+SHADOW_TABLE = TABLE_NAME + '_new'
+OLD_TABLE = TABLE_NAME + '_old'
+SWAP_TABLE = TABLE_NAME + '_swap'
+
+# 新一代行数低于线上多少比例时拒绝切换
+DEFAULT_MIN_RATIO = 0.5
+
+def table_exists(cursor, table):
+    cursor.execute("SHOW TABLES LIKE %s", (table,))
+    return cursor.fetchone() is not None
+
+def count_rows(cursor, table):
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+def prepare_shadow(conn):
+    """
+    重建影子表（不含二级索引）
+
+    返回延后建立的索引列表 [(索引名, 列定义), ...]。
+    """
+    create_sql, indexes = create_table_sql(SHADOW_TABLE, defer_indexes=True)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {SHADOW_TABLE}")
+    cursor.execute(create_sql)
+    cursor.close()
+    conn.commit()
+    print(f"   ✅ 已创建影子表 {SHADOW_TABLE}（{len(indexes)} 个二级索引延后建立）")
+    return indexes
+
+def validate_shadow(conn, expected, min_ratio=DEFAULT_MIN_RATIO):
+    """
+    校验影子表
+
+    影子表行数必须等于本次成功写入数；线上表存在时，新一代行数不能低于
+    线上的 min_ratio（防止用截断的文件覆盖全部数据）。校验失败抛出
+    ValueError，影子表保留以便排查。
+    """
+    cursor = conn.cursor()
+    try:
+        shadow_count = count_rows(cursor, SHADOW_TABLE)
+        if shadow_count != expected:
+            raise ValueError(f"影子表有 {shadow_count} 条记录，与成功写入的 {expected} 条不一致")
+        if table_exists(cursor, TABLE_NAME):
+            live_count = count_rows(cursor, TABLE_NAME)
+            if live_count and shadow_count < live_count * min_ratio:
+                raise ValueError(
+                    f"新数据只有 {shadow_count} 条，不到线上 {live_count} 条的 {min_ratio:.0%}，"
+                    f"已取消切换（确认无误可使用 --min-ratio 0）"
+                )
+            print(f"   ✅ 行数校验通过: 线上 {live_count} 条 → 新 {shadow_count} 条")
+        else:
+            print(f"   ✅ 行数校验通过: {shadow_count} 条")
+    finally:
+        cursor.close()
+
+def swap_tables(conn):
+    """
+    原子切换影子表和线上表
+
+    删除上上一代后，用一条 RENAME TABLE 同时完成 线上 → _old、影子 → 线上。
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {OLD_TABLE}")
+        if table_exists(cursor, TABLE_NAME):
+            cursor.execute(
+                f"RENAME TABLE {TABLE_NAME} TO {OLD_TABLE}, {SHADOW_TABLE} TO {TABLE_NAME}"
+            )
+            print(f"   ✅ 已切换到新数据，上一代保留为 {OLD_TABLE}")
+        else:
+            cursor.execute(f"RENAME TABLE {SHADOW_TABLE} TO {TABLE_NAME}")
+            print(f"   ✅ 已切换到新数据")
+    finally:
+        cursor.close()
+    cdc_sync.mark_reload(conn)
+
+def rollback(conn):
+    """用一条 RENAME TABLE 交换线上表和上一代"""
+    cursor = conn.cursor()
+    try:
+        if not table_exists(cursor, OLD_TABLE):
+            raise ValueError(f"没有可回滚的上一代数据 ({OLD_TABLE} 不存在)")
+        cursor.execute(
+            f"RENAME TABLE {TABLE_NAME} TO {SWAP_TABLE}, "
+            f"{OLD_TABLE} TO {TABLE_NAME}, "
+            f"{SWAP_TABLE} TO {OLD_TABLE}"
+        )
+    finally:
+        cursor.close()
+    cdc_sync.mark_reload(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 影子表管理')
+    parser.add_argument('--rollback', action='store_true', help='切换回上一代数据')
+    args = parser.parse_args()
+
+    if not args.rollback:
+        parser.print_help()
+        return
+
+    # 延迟导入，避免与 import_csv_pymysql 循环引用
+    from import_csv_pymysql import connect
+
+    print("\n" + "="*60)
+    print("LogiTrack Pro - 回滚到上一代数据")
+    print("="*60)
+    try:
+        conn = connect()
+        rollback(conn)
+        conn.close()
+        print(f"\n✅ 已回滚: 线上表恢复为上一代，当前数据保留为 {OLD_TABLE}")
+    except (pymysql.Error, ValueError) as err:
+        print(f"\n❌ 回滚失败: {err}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
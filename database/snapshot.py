@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 本地列式快照
+
+分析脚本每次都连 MySQL 重新拉整张表。快照把 enquiry_records 落成一个
+目录，每列一个 NumPy .npy 文件，加载时内存映射（np.load(mmap_mode='r')），
+不复制、不解析，启动只需读清单:
+
+    id          S16       BINARY(16) 主键（迁移 003 之前的字符串主键换算为 16 字节）
+    日期列      int32     距 1970-01-01 的天数，NULL 为 NULL_DATE
+    时间戳列    int64     距 1970-01-01 00:00:00 的秒数（不做时区换算），NULL 为 NULL_TIMESTAMP
+    数值列      float64   NULL 为 NaN
+    字符串列    int32     字典编号，NULL 为 -1；取值表 <列名>.values.json
+
+manifest.json 记录行数、各列类型和 updated_at 水位。刷新时只拉取
+updated_at 不早于水位的记录（同一秒内之后的修改也能取到），按主键替换或
+追加；另取一遍全部主键（每行 16 字节）剔除已删除的记录。字典只追加，
+已有编号不变。新快照写在临时目录中再整体换入，正在读旧快照的进程不受影响。
+
+用法:
+    python snapshot.py                 建立或刷新快照（默认目录 enquiry_snapshot）
+    python snapshot.py --full          重新全量拉取
+    python snapshot.py --info          显示快照信息（不连接数据库）
+
+在分析脚本中:
+    from snapshot import Snapshot
+    snap = Snapshot.open('enquiry_snapshot')
+    snap['volume_cbm']                 # 内存映射的 float64 数组
+    snap.strings('status')             # 还原为字符串的数组
+"""
+
+import argparse
+import array
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import date, datetime
+
+import pymysql
+
+from export import stream_rows
+from header_mapping import FIELD_NAMES
+from offer_parser import OFFER_COLUMNS
+from schema_tools import TABLE_NAME
+from validation import rules_from_table
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("请先安装依赖: pip install numpy") from None
+
+# 快照格式改变时递增，旧版本的快照刷新时全量重建
+SNAPSHOT_VERSION = 1
+
+DEFAULT_SNAPSHOT_DIR = 'enquiry_snapshot'
+MANIFEST_FILE = 'manifest.json'
+
+# 快照的列（不含 content_hash）
+SNAPSHOT_COLUMNS = ('id',) + FIELD_NAMES + OFFER_COLUMNS + ('created_at', 'updated_at')
+
+NULL_DATE = int(np.iinfo(np.int32).min)
+NULL_TIMESTAMP = int(np.iinfo(np.int64).min)
+NULL_CODE = -1
+
+EPOCH_DAY = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1)
+
+# 列类别 -> (NumPy dtype, array 模块的类型码)
+STORAGE = {
+    'id': ('S16', None),
+    'date': ('int32', 'i'),
+    'timestamp': ('int64', 'q'),
+    'number': ('float64', 'd'),
+    'string': ('int32', 'i'),
+}
+
+NUMBER_TYPES = {'decimal', 'float', 'double', 'tinyint', 'smallint', 'int', 'integer', 'bigint'}
+
+def column_kind(rule):
+    """由 DESCRIBE 的规则得到列类别"""
+    if rule.name == 'id':
+        return 'id'
+    if rule.type == 'date':
+        return 'date'
+    if rule.type in ('datetime', 'timestamp'):
+        return 'timestamp'
+    if rule.type in NUMBER_TYPES:
+        return 'number'
+    return 'string'
+
+def id_bytes(value):
+    """主键的 16 字节形式"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return uuid.UUID(value).bytes
+
+class ColumnBuffer:
+    """拉取时一列的追加缓冲；字符串列在这里完成字典编码"""
+
+    def __init__(self, kind, values=()):
+        self.kind = kind
+        typecode = STORAGE[kind][1]
+        self.data = bytearray() if typecode is None else array.array(typecode)
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def append(self, value):
+        kind = self.kind
+        if kind == 'id':
+            self.data += id_bytes(value)
+        elif kind == 'string':
+            if value is None:
+                self.data.append(NULL_CODE)
+                return
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            self.data.append(code)
+        elif kind == 'date':
+            self.data.append(NULL_DATE if value is None else value.toordinal() - EPOCH_DAY)
+        elif kind == 'timestamp':
+            self.data.append(NULL_TIMESTAMP if value is None else int((value - EPOCH).total_seconds()))
+        else:
+            self.data.append(float('nan') if value is None else float(value))
+
+    def __len__(self):
+        return len(self.data) // 16 if self.kind == 'id' else len(self.data)
+
+    def to_numpy(self):
+        return np.frombuffer(self.data, dtype=STORAGE[self.kind][0])
+
+class Snapshot:
+    """只读打开的快照，列数组按需内存映射"""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = {}
+        self.value_lists = {}
+
+    @classmethod
+    def open(cls, path=DEFAULT_SNAPSHOT_DIR):
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    @property
+    def columns(self):
+        return tuple(self.manifest['columns'])
+
+    @property
+    def watermark(self):
+        value = self.manifest['watermark']
+        return datetime.fromisoformat(value) if value else None
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def kind(self, name):
+        return self.manifest['columns'][name]
+
+    def __getitem__(self, name):
+        """列的存储数组（内存映射，只读）"""
+        if name not in self.arrays:
+            if name not in self.manifest['columns']:
+                raise KeyError(f"快照中没有列 {name}")
+            self.arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+        return self.arrays[name]
+
+    def values(self, name):
+        """字符串列的取值表，下标即编号"""
+        if name not in self.value_lists:
+            with open(os.path.join(self.path, f"{name}.values.json"), encoding='utf-8') as f:
+                self.value_lists[name] = json.load(f)
+        return self.value_lists[name]
+
+    def strings(self, name):
+        """字符串列还原为 object 数组，NULL 为 None"""
+        table = np.array(self.values(name) + [None], dtype=object)
+        # NULL_CODE (-1) 正好取到末尾的 None
+        return table[self[name]]
+
+    def dates(self, name):
+        """日期列转为 datetime64[D]，NULL 为 NaT"""
+        days = self[name]
+        result = days.astype('datetime64[D]')
+        result[days == NULL_DATE] = np.datetime64('NaT')
+        return result
+
+    def ids(self):
+        """主键的 36 位字符串形式"""
+        return [str(uuid.UUID(bytes=value.ljust(16, b'\0'))) for value in self['id']]
+
+def pull(conn, columns, kinds, dictionaries, watermark=None, progress=None):
+    """
+    拉取 updated_at 不早于 watermark 的记录（watermark 为空时全部）
+
+    返回 ({列名: ColumnBuffer}, 拉到的最大 updated_at)。
+    """
+    buffers = {name: ColumnBuffer(kinds[name], dictionaries.get(name, ())) for name in columns}
+    appenders = [buffers[name].append for name in columns]
+    updated_pos = columns.index('updated_at')
+    newest = watermark
+    count = 0
+    for row in stream_rows(conn, columns, date_column='updated_at', since=watermark):
+        for append, value in zip(appenders, row):
+            append(value)
+        updated = row[updated_pos]
+        if updated is not None and (newest is None or updated > newest):
+            newest = updated
+        count += 1
+        if progress and count % 100000 == 0:
+            progress(count)
+    return buffers, newest
+
+def live_ids(conn, table=TABLE_NAME):
+    """表中当前的全部主键（S16 数组，流式读取）"""
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    data = bytearray()
+    try:
+        cursor.execute(f"SELECT id FROM {table}")
+        for value, in cursor:
+            data += id_bytes(value)
+    finally:
+        cursor.close()
+    return np.frombuffer(data, dtype='S16')
+
+def write_snapshot(path, columns, kinds, arrays, dictionaries, watermark, created):
+    """写入临时目录后整体替换 path"""
+    tmp = path + '.tmp'
+    old = path + '.old'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in columns:
+        np.save(os.path.join(tmp, f"{name}.npy"), arrays[name])
+        if kinds[name] == 'string':
+            with open(os.path.join(tmp, f"{name}.values.json"), 'w', encoding='utf-8') as f:
+                json.dump(dictionaries[name], f, ensure_ascii=False)
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'table': TABLE_NAME,
+        'rows': int(len(arrays['id'])),
+        'watermark': watermark.isoformat() if watermark else None,
+        'created': created,
+        'refreshed': datetime.now().isoformat(timespec='seconds'),
+        'columns': {name: kinds[name] for name in columns},
+    }
+    with open(os.path.join(tmp, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+def load_current(path, kinds):
+    """path 处已有、且格式版本和列与 kinds 一致的快照，否则返回 None"""
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return None
+    current = Snapshot.open(path)
+    if current.manifest.get('version') != SNAPSHOT_VERSION or current.manifest['columns'] != kinds:
+        return None
+    return current
+
+def current_dictionaries(current, kinds):
+    """已有快照的字符串取值表（新拉取的行接着编号）"""
+    if current is None:
+        return {}
+    return {name: current.values(name) for name, kind in kinds.items() if kind == 'string'}
+
+def merge(path, current, columns, kinds, buffers, watermark, live=None, removed=None):
+    """
+    把拉取的行（{列名: ColumnBuffer}）并入快照并写出，返回清单
+
+    current 为 None 时只写拉取的行。旧行中主键与拉取的行相同的被替换；
+    live 不为空时只保留其中的主键，removed 中的主键删除（均为 S16 数组）。
+    拉取的行可以是任意顺序，写出的快照按主键排序。
+    """
+    created = datetime.now().isoformat(timespec='seconds')
+    dictionaries = {name: buffers[name].values for name in columns if kinds[name] == 'string'}
+    changed = buffers['id'].to_numpy()
+    if current is None:
+        order = np.argsort(changed, kind='stable')
+        arrays = {name: buffers[name].to_numpy()[order] for name in columns}
+        return write_snapshot(path, columns, kinds, arrays, dictionaries, watermark, created)
+
+    # 保留没有重新拉取（且仍在表中、没有被删除）的旧行，再接上拉到的行，按主键排序
+    old_ids = current['id']
+    keep = ~np.isin(old_ids, changed)
+    if live is not None:
+        keep &= np.isin(old_ids, live)
+    if removed is not None:
+        keep &= ~np.isin(old_ids, removed)
+    order = np.argsort(np.concatenate([old_ids[keep], changed]), kind='stable')
+    arrays = {
+        name: np.concatenate([current[name][keep], buffers[name].to_numpy()])[order]
+        for name in columns
+    }
+    # 先释放旧文件的内存映射（Windows 上映射中的文件不能移动或删除）
+    current.arrays.clear()
+    return write_snapshot(path, columns, kinds, arrays, dictionaries, watermark or current.watermark,
+                          current.manifest['created'])
+
+def snapshot_columns(rules):
+    """按表结构得到 (快照列, {列名: 类别})"""
+    columns = tuple(name for name in SNAPSHOT_COLUMNS if name in rules)
+    return columns, {name: column_kind(rules[name]) for name in columns}
+
+def refresh(conn, path=DEFAULT_SNAPSHOT_DIR, full=False, progress=None):
+    """
+    建立或刷新快照，返回 (清单, 拉取的行数)
+
+    快照不存在、格式版本或列与表结构不一致、或 full 为 True 时全量拉取。
+    """
+    cursor = conn.cursor()
+    try:
+        rules = rules_from_table(cursor, TABLE_NAME)
+    finally:
+        cursor.close()
+    columns, kinds = snapshot_columns(rules)
+    current = None if full else load_current(path, kinds)
+    watermark = current.watermark if current else None
+    buffers, watermark = pull(conn, columns, kinds, current_dictionaries(current, kinds), watermark, progress)
+    live = live_ids(conn) if current else None
+    return merge(path, current, columns, kinds, buffers, watermark, live=live), len(buffers['id'])
+
+def print_info(snap):
+    manifest = snap.manifest
+    print(f"   快照: {os.path.abspath(snap.path)}")
+    print(f"   行数: {len(snap)}，水位 updated_at = {manifest['watermark']}")
+    print(f"   建立于 {manifest['created']}，刷新于 {manifest['refreshed']}")
+    size = sum(entry.stat().st_size for entry in os.scandir(snap.path))
+    print(f"   {len(snap.columns)} 列，共 {size / 1048576:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description='LogiTrack Pro - 本地列式快照')
+    parser.add_argument('path', nargs='?', default=DEFAULT_SNAPSHOT_DIR,
+                        help=f'快照目录 (默认 {DEFAULT_SNAPSHOT_DIR})')
+    parser.add_argument('--full', action='store_true', help='重新全量拉取')
+    parser.add_argument('--info', action='store_true', help='显示快照信息（不连接数据库）')
+    args = parser.parse_args()
+
+    if args.info:
+        try:
+            snap = Snapshot.open(args.path)
+        except FileNotFoundError:
+            print(f"\n❌ 找不到快照: {args.path}")
+            sys.exit(1)
+        print_info(snap)
+        return
+
+    import db
+
+    print(f"\n刷新快照 {db.CONFIG['database']}.{TABLE_NAME} -> {args.path}...")
+    try:
+        conn = db.connect('pymysql', autocommit=True)
+    except pymysql.Error as e:
+        print(f"\n❌ 连接失败: {e}")
+        sys.exit(1)
+    start = time.perf_counter()
+    try:
+        manifest, pulled = refresh(conn, args.path, args.full,
+                                   progress=lambda count: print(f"   ✅ [{count}] 已拉取"))
+    except pymysql.Error as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    print(f"   ✅ 拉取 {pulled} 条，快照共 {manifest['rows']} 条 ({time.perf_counter() - start:.1f} 秒)")
+    print(f"   ✅ 水位 updated_at = {manifest['watermark']}")
+
+if __name__ == '__main__':
+    main()
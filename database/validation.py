@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+LogiTrack Pro - 导入预校验
+
+很多导入失败来自违反表约束: VARCHAR(10) 的 pol / pod 超长、DECIMAL(10,3)
+超出范围、参考编号重复……每一个都要一次往返服务器再抛一次异常。
+
+预校验在写入之前、在内存里检查每一行。规则不手写，而是从目标表的
+DESCRIBE 结果（没有数据库连接时从 schema.sql）推导:
+    VARCHAR(n) / CHAR(n)   字符数不超过 n
+    TEXT                   UTF-8 字节数不超过 65535
+    DECIMAL(p, s)          按 s 位小数舍入后整数部分不超过 p - s 位
+    NOT NULL               不能为空
+    UNIQUE / PRIMARY KEY   文件内不重复，也不与表中已有的值重复
+                           （已有值一次性批量取出，放在内存集合里）
+
+只校验从 CSV 转换来的数据字段；id、content_hash 由导入程序生成，时间戳取数据库默认值。
+"""
+
+import collections
+import math
+import re
+
+import pymysql
+
+from header_mapping import FIELD_NAMES
+from schema_tools import SCHEMA_FILE, read_create_table
+
+# TEXT 列的最大字节数
+TEXT_MAX_BYTES = 65535
+
+# 列类型，如 "varchar(10)"、"DECIMAL(10, 3)"、"text"
+COLUMN_TYPE = re.compile(r'^(\w+)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?', re.IGNORECASE)
+
+# schema.sql 中的列定义行，如 "pol VARCHAR(10) COMMENT '起运港代码',"
+COLUMN_LINE = re.compile(r'^\s*(\w+)\s+(\w+\s*(?:\([^)]*\))?)(.*)$')
+
+# 以这些关键字开头的行不是列定义
+NOT_COLUMNS = {'CREATE', 'INDEX', 'KEY', 'PRIMARY', 'UNIQUE', 'CONSTRAINT', 'FOREIGN', 'FULLTEXT'}
+
+ColumnRule = collections.namedtuple('ColumnRule', 'name type length scale nullable unique')
+
+def column_rule(name, type_text, nullable=True, unique=False):
+    """由列类型文本生成一条规则，length 为字符数 / DECIMAL 精度，scale 为小数位数"""
+    match = COLUMN_TYPE.match(type_text.strip())
+    if not match:
+        raise ValueError(f"无法识别列 {name} 的类型: {type_text}")
+    kind, length, scale = match.groups()
+    return ColumnRule(
+        name,
+        kind.lower(),
+        int(length) if length else None,
+        int(scale) if scale else 0,
+        nullable,
+        unique,
+    )
+
+def rules_from_schema(schema_file=SCHEMA_FILE):
+    """从 schema.sql 的 CREATE TABLE 推导规则 {列名: ColumnRule}"""
+    rules = {}
+    for line in read_create_table(schema_file).splitlines():
+        line = line.strip()
+        if not line or line.startswith('--'):
+            continue
+        match = COLUMN_LINE.match(line)
+        if not match or match.group(1).upper() in NOT_COLUMNS:
+            continue
+        name, type_text, rest = match.groups()
+        rest = rest.upper()
+        rules[name] = column_rule(
+            name,
+            type_text,
+            nullable='NOT NULL' not in rest and 'PRIMARY KEY' not in rest,
+            unique='UNIQUE' in rest or 'PRIMARY KEY' in rest,
+        )
+    return rules
+
+def rules_from_table(cursor, table):
+    """从 DESCRIBE 推导规则 {列名: ColumnRule}（迁移之后以数据库为准）"""
+    cursor.execute(f"DESCRIBE {table}")
+    rules = {}
+    for field, type_text, null, key, *_ in cursor.fetchall():
+        if isinstance(type_text, bytes):
+            type_text = type_text.decode('utf-8')
+        rules[field] = column_rule(field, type_text, nullable=(null == 'YES'), unique=key in ('PRI', 'UNI'))
+    return rules
+
+def unique_key(value):
+    """唯一性比较用的键: 表的排序规则 utf8mb4_unicode_ci 不区分大小写"""
+    return value.lower() if isinstance(value, str) else value
+
+def fetch_existing(conn, table, column):
+    """一次性取出表中某个唯一列的全部值（流式游标，不在驱动里缓存整个结果集）"""
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(f"SELECT {column} FROM {table}")
+        return {unique_key(value) for value, in cursor}
+    finally:
+        cursor.close()
+
+class Validator:
+    """
+    按规则逐行检查 build_record 生成的参数元组
+
+    参数元组为 (id, 数据字段..., 报价列..., content_hash)，
+    数据字段的位置即 FIELD_NAMES 的顺序加 1。existing 为 {列名: 已有值集合}，
+    只对其中的唯一列做重复检查；check_unique 为 False 时（增量导入的
+    upsert）不检查重复。
+    """
+
+    def __init__(self, rules, existing=None, check_unique=True, source='schema.sql'):
+        self.source = source
+        self.lengths = []
+        self.texts = []
+        self.decimals = []
+        self.not_null = []
+        self.unique = []
+        existing = existing or {}
+        for pos, name in enumerate(FIELD_NAMES, 1):
+            rule = rules.get(name)
+            if rule is None:
+                continue
+            if rule.type in ('varchar', 'char') and rule.length:
+                self.lengths.append((pos, name, rule.length, f"{rule.type.upper()}({rule.length})"))
+            elif rule.type == 'text':
+                self.texts.append((pos, name))
+            elif rule.type == 'decimal' and rule.length:
+                limit = 10 ** (rule.length - rule.scale)
+                self.decimals.append((pos, name, limit, rule.scale, f"DECIMAL({rule.length},{rule.scale})"))
+            if not rule.nullable:
+                self.not_null.append((pos, name))
+            if rule.unique and check_unique:
+                self.unique.append((pos, name, existing.get(name) or set()))
+
+    @property
+    def rule_count(self):
+        return len(self.lengths) + len(self.texts) + len(self.decimals) + len(self.not_null) + len(self.unique)
+
+    def check(self, data):
+        """返回问题描述列表，通过时为空列表；通过的行的唯一值记入集合"""
+        problems = []
+        for pos, name, length, type_name in self.lengths:
+            value = data[pos]
+            if value is not None and len(value) > length:
+                problems.append(f"{name} 长度 {len(value)} 超过 {type_name}")
+        for pos, name in self.texts:
+            value = data[pos]
+            # 每个字符最多 4 字节，短文本不必编码
+            if value is not None and len(value) * 4 > TEXT_MAX_BYTES \
+                    and len(value.encode('utf-8')) > TEXT_MAX_BYTES:
+                problems.append(f"{name} 超过 TEXT 的 {TEXT_MAX_BYTES} 字节")
+        for pos, name, limit, scale, type_name in self.decimals:
+            value = data[pos]
+            if value is not None and (not math.isfinite(value) or abs(round(value, scale)) >= limit):
+                problems.append(f"{name} = {value} 超出 {type_name} 的范围")
+        for pos, name in self.not_null:
+            if data[pos] is None:
+                problems.append(f"{name} 不能为空")
+        if problems:
+            return problems
+        keys = []
+        for pos, name, seen in self.unique:
+            value = data[pos]
+            if value is None:
+                continue
+            key = unique_key(value)
+            if key in seen:
+                problems.append(f"{name} = {value} 重复")
+            keys.append((seen, key))
+        if not problems:
+            for seen, key in keys:
+                seen.add(key)
+        return problems
+
+def build_validator(conn, table, check_unique=True):
+    """
+    按目标表的 DESCRIBE 生成校验器，需要时一次性取出唯一列的已有值
+
+    DESCRIBE 失败时退回 schema.sql 的定义；表中没有的数据字段（字典编码表
+    的低基数列存的是编号，见 dictionary.py）同样按 schema.sql 校验原值。
+    """
+    cursor = conn.cursor()
+    try:
+        rules = rules_from_table(cursor, table)
+        source = f"DESCRIBE {table}"
+        for name, rule in rules_from_schema().items():
+            if name in FIELD_NAMES and name not in rules:
+                rules[name] = rule
+    except pymysql.Error:
+        rules = rules_from_schema()
+        source = 'schema.sql'
+    finally:
+        cursor.close()
+    existing = {}
+    if check_unique:
+        for name in FIELD_NAMES:
+            rule = rules.get(name)
+            if rule is not None and rule.unique:
+                existing[name] = fetch_existing(conn, table, name)
+    return Validator(rules, existing, check_unique, source)